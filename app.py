@@ -5,26 +5,26 @@ AI-Powered Farming Assistant for Kerala Farmers
 
 import streamlit as st
 import requests
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 from datetime import datetime, timedelta
-from PIL import Image
 import io
 import base64
 import json
-import random
-from voice_assistant import VoiceAssistant
+import hashlib
+import html
+import re
+import functools
+from collections import OrderedDict, deque
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 try:
-    import speech_recognition as sr  # STT
-    STT_AVAILABLE = True
-except Exception:
-    STT_AVAILABLE = False
-try:
-    from streamlit_mic_recorder import mic_recorder
-    MIC_AVAILABLE = True
-except Exception:
-    MIC_AVAILABLE = False
+    import ahocorasick  # pyahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # Page configuration
 st.set_page_config(
@@ -34,8 +34,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for Kerala theme
-st.markdown("""
+# Custom CSS for Kerala theme. Streamlit drops elements a rerun doesn't
+# re-emit, so this has to be sent on every run to keep the styles applied.
+_THEME_CSS = """
 <style>
     .main-header {
         background: linear-gradient(90deg, #2E7D32, #FFC107);
@@ -73,7 +74,8 @@ st.markdown("""
         background: linear-gradient(180deg, #E8F5E8, #FFF8E1);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_THEME_CSS, unsafe_allow_html=True)
 
 # Initialize session state
 if 'authenticated' not in st.session_state:
@@ -86,16 +88,103 @@ if 'language' not in st.session_state:
     st.session_state.language = "en"
 if 'farmer_data' not in st.session_state:
     st.session_state.farmer_data = None
-if 'voice_assistant' not in st.session_state:
-    st.session_state.voice_assistant = VoiceAssistant()
 
 # API base URL
 API_BASE = "http://localhost:8000/api"
+# (connect, read) seconds to wait on the backend before giving up
+API_TIMEOUT = (1.0, 5.0)
+
+# Keep-alive connections to the backend, shared across reruns
+_SESSION = requests.Session()
+# Idempotent calls are retried briefly when a gateway error says the backend is busy
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=(502, 503, 504),
+                      allowed_methods=("GET", "PUT"), raise_on_status=False)
+))
+_SESSION.headers.update({"Accept": "application/json"})
+# Registration form validation: Indian mobile numbers and plain email addresses
+_PHONE_RE = re.compile(r"^\+91[6-9]\d{9}$")
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Generator for mock data
+_NPRNG = np.random.default_rng()
+# Icons for mock forecast days
+_WEATHER_ICONS = np.array(["☀️", "⛅", "🌦️", "🌧️"])
+
+# Selectbox options, shared by every rerun
+_KERALA_DISTRICTS = (
+    "Thiruvananthapuram", "Kollam", "Pathanamthitta", "Alappuzha",
+    "Kottayam", "Idukki", "Ernakulam", "Thrissur", "Palakkad",
+    "Malappuram", "Kozhikode", "Wayanad", "Kannur", "Kasaragod"
+)
+_SOIL_TYPES = ("Loamy", "Clay", "Sandy", "Red Soil", "Alluvial")
+_IRRIGATION_TYPES = ("Drip", "Sprinkler", "Flood", "Rain-fed")
+_CROP_TYPES = ("Rice", "Coconut", "Pepper", "Cardamom", "Rubber", "Tea", "Coffee", "Banana")
+_ACTIVITY_TYPES = (
+    "Sowing", "Transplanting", "Watering", "Fertilizing",
+    "Weeding", "Pest Control", "Harvesting", "Pruning"
+)
+# Disease detection crops: backend names and the labels shown per language, in the same order
+_DETECTION_CROPS = ("Rice", "Coconut", "Pepper", "Cardamom", "Rubber", "Banana")
+_DETECTION_CROP_OPTIONS = {
+    "en": _DETECTION_CROPS,
+    "ml": ("നെല്ല്", "തെങ്ങ്", "കുരുമുളക്", "ഏലം", "റബ്ബർ", "വാഴ")
+}
+
+# Mock data used when the backend is unavailable
+_MOCK_DISEASES = {
+    "Rice": ("Blast Disease", "Brown Spot", "Bacterial Blight"),
+    "Coconut": ("Leaf Rot", "Crown Rot", "Bud Rot"),
+    "Pepper": ("Anthracnose", "Bacterial Wilt", "Root Rot")
+}
+_MOCK_CURRENT_WEATHER = {
+    "temperature": 28,
+    "humidity": 75,
+    "rainfall": 2.5,
+    "wind_speed": 12,
+    "description": "Partly cloudy",
+    "icon": "⛅"
+}
+_WEATHER_CARD_TPL = """
+        <div class="weather-card">
+            <h2>{icon} {location}</h2>
+            <h1>{temperature}°C</h1>
+            <p>{description}</p>
+            <div style="display: flex; justify-content: space-around; margin-top: 1rem;">
+                <div>💧 {humidity}%</div>
+                <div>🌧️ {rainfall}mm</div>
+                <div>💨 {wind_speed} km/h</div>
+            </div>
+        </div>
+        """
+
+# Worker threads for fetching independent endpoints concurrently
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api-fetch")
 
 # Helper functions
+class _APIError(Exception):
+    """Non-200 response from the backend; raised so failures are never cached"""
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_cached(endpoint, token):
+    """GET an endpoint, caching the JSON per endpoint and access token"""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    response = _SESSION.get(f"{API_BASE}{endpoint}", headers=headers, timeout=API_TIMEOUT)
+    if response.status_code != 200:
+        raise _APIError(response.text)
+    return response.json()
+
+def bust_cache():
+    """Drop cached GET responses after the backend data changes"""
+    _get_cached.clear()
+
 def make_api_request(endpoint, method="GET", data=None, headers=None):
     """Make API request with error handling"""
     try:
+        if method == "GET" and headers is None:
+            return _get_cached(endpoint, st.session_state.access_token)
+        
         url = f"{API_BASE}{endpoint}"
         if headers is None:
             headers = {}
@@ -104,202 +193,340 @@ def make_api_request(endpoint, method="GET", data=None, headers=None):
             headers["Authorization"] = f"Bearer {st.session_state.access_token}"
         
         if method == "GET":
-            response = requests.get(url, headers=headers)
+            response = _SESSION.get(url, headers=headers, timeout=API_TIMEOUT)
         elif method == "POST":
-            response = requests.post(url, json=data, headers=headers)
+            response = _SESSION.post(url, json=data, headers=headers, timeout=API_TIMEOUT)
         elif method == "PUT":
-            response = requests.put(url, json=data, headers=headers)
+            response = _SESSION.put(url, json=data, headers=headers, timeout=API_TIMEOUT)
         
         if response.status_code == 200:
+            if method != "GET":
+                bust_cache()
             return response.json()
         else:
             st.error(f"API Error: {response.text}")
             return None
+    except _APIError as e:
+        st.error(f"API Error: {str(e)}")
+        return None
+    except requests.Timeout:
+        st.error("Backend slow to respond, please try again")
+        return None
     except Exception as e:
         st.error(f"Connection error: {str(e)}")
         return None
 
+def _parallel_fetch(endpoints):
+    """GET several endpoints concurrently; failed endpoints map to None"""
+    # Worker threads have no Streamlit context, so read the token here
+    # and report errors back on the script thread
+    token = st.session_state.access_token
+    futures = {_FETCH_EXECUTOR.submit(_get_cached, endpoint, token): endpoint for endpoint in endpoints}
+    results = {}
+    for future in as_completed(futures):
+        endpoint = futures[future]
+        try:
+            results[endpoint] = future.result()
+        except _APIError as e:
+            st.error(f"API Error: {str(e)}")
+            results[endpoint] = None
+        except requests.Timeout:
+            st.error("Backend slow to respond, please try again")
+            results[endpoint] = None
+        except Exception as e:
+            st.error(f"Connection error: {str(e)}")
+            results[endpoint] = None
+    return results
+
+# UI strings per language, built once at import
+_TRANSLATIONS = {
+    "en": {
+        "dashboard": "Dashboard",
+        "my_farms": "My Farms",
+        "activities": "Activities",
+        "disease_detection": "Disease Detection",
+        "weather": "Weather",
+        "ai_chat": "AI Assistant",
+        "knowledge_base": "Knowledge Base",
+        "community": "Community",
+        "reports": "Reports",
+        "welcome": "Welcome to Krishi Sakhi",
+        "login": "Login",
+        "register": "Register",
+        "logout": "Logout",
+        "create_account": "Create New Account",
+        "full_name": "Full Name",
+        "phone_number": "Phone Number",
+        "email_address": "Email Address",
+        "location": "Location",
+        "preferred_language": "Preferred Language",
+        "password": "Password",
+        "confirm_password": "Confirm Password",
+        "registration_successful": "Registration successful! Welcome to Krishi Sakhi!",
+        "registration_failed": "Registration failed. Phone number or email may already be registered.",
+        "fill_all_fields": "Please fill in all fields",
+        "passwords_dont_match": "Passwords do not match",
+        "password_too_short": "Password must be at least 6 characters long",
+        "invalid_phone": "Please enter a valid Indian phone number (+91XXXXXXXXXX)",
+        "invalid_email": "Please enter a valid email address",
+        "choose_language": "Choose your preferred language:",
+        "language_selected": "Language Selected",
+        "weather_advisory": "Weather Advisory",
+        "select_location": "Select Location",
+        "five_day_forecast": "5-Day Forecast",
+        "farming_advisory": "Farming Advisory",
+        "good_for_planting": "Good for planting",
+        "avoid_activities": "Avoid outdoor activities",
+        "harvest_time": "Harvest time",
+        "fertilizer_time": "Apply fertilizer",
+        "irrigation_needed": "Irrigation needed",
+        "detection_results": "Detection Results",
+        "disease_label": "Disease",
+        "confidence_label": "Confidence",
+        "severity_label": "Severity",
+        "symptoms_label": "Symptoms",
+        "treatment_label": "Treatment",
+        "prevention_label": "Prevention",
+        "analyzing_image": "Analyzing image with AI...",
+        "speak_replies": "Speak replies",
+        "voice_chat": "Voice Chat",
+        "add_new_farm": "Add New Farm",
+        "farm_name": "Farm Name",
+        "land_size_hectares": "Land Size (hectares)",
+        "soil_type": "Soil Type",
+        "irrigation_type": "Irrigation Type",
+        "crop_types": "Crop Types",
+        "add_farm": "Add Farm",
+        "farm_added_success": "Farm added successfully!",
+        "filter_by_activity": "Filter by Activity",
+        "filter_by_crop": "Filter by Crop",
+        "filter_by_farm": "Filter by Farm",
+        "no_activities_found": "No activities found for the selected filters.",
+        "record_new_activity": "Record New Activity",
+        "select_farm": "Select Farm",
+        "activity_type": "Activity Type",
+        "date_label": "Date",
+        "crop_name_opt": "Crop Name (optional)",
+        "quantity_opt": "Quantity (optional)",
+        "cost_opt": "Cost (₹, optional)",
+        "description": "Description",
+        "notes_opt": "Notes (optional)",
+        "record_activity": "Record Activity",
+        "activity_recorded_success": "Activity recorded successfully!",
+        "activity_queued": "Activity added to the batch",
+        "pending_activities": "Pending activities",
+        "save_all_now": "Save all now",
+        "activities_not_saved": "Activities not saved",
+        "label_farm": "Farm",
+        "label_crop": "Crop",
+        "label_qty": "Qty",
+        "label_cost": "Cost",
+        "community_dashboard": "Community Dashboard",
+        "community_alerts": "Community Alerts",
+        "affected_farms": "Affected Farms",
+        "regional_stats": "Regional Statistics",
+        "disease_reports_title": "Disease Reports (Last 30 Days)",
+        "farmers_by_crop": "Farmers by Crop Type",
+        "discussion_forum": "Discussion Forum",
+        "forum_placeholder": "Community discussion forum coming soon! Connect with fellow farmers, share experiences, and get expert advice.",
+        "date": "Date",
+        "read_full_guide": "Read Full Guide",
+        "preparing_audio": "Preparing audio..."
+    },
+    "ml": {
+        "dashboard": "ഡാഷ്ബോർഡ്",
+        "my_farms": "എന്റെ കൃഷിയിടങ്ങൾ",
+        "activities": "പ്രവർത്തനങ്ങൾ",
+        "disease_detection": "രോഗ നിർണയം",
+        "weather": "കാലാവസ്ഥ",
+        "ai_chat": "AI സഹായി",
+        "knowledge_base": "അറിവ് ശേഖരം",
+        "community": "കമ്മ്യൂണിറ്റി",
+        "reports": "റിപ്പോർട്ടുകൾ",
+        "welcome": "കൃഷി സഖിയിലേക്ക് സ്വാഗതം",
+        "login": "ലോഗിൻ",
+        "register": "രജിസ്റ്റർ",
+        "logout": "ലോഗ് ഔട്ട്",
+        "create_account": "പുതിയ അക്കൗണ്ട് സൃഷ്ടിക്കുക",
+        "full_name": "പൂർണ്ണ നാമം",
+        "phone_number": "ഫോൺ നമ്പർ",
+        "email_address": "ഇമെയിൽ വിലാസം",
+        "location": "സ്ഥലം",
+        "preferred_language": "ഇഷ്ടപ്പെട്ട ഭാഷ",
+        "password": "പാസ്‌വേഡ്",
+        "confirm_password": "പാസ്‌വേഡ് സ്ഥിരീകരിക്കുക",
+        "registration_successful": "രജിസ്ട്രേഷൻ വിജയകരമാണ്! കൃഷി സഖിയിലേക്ക് സ്വാഗതം!",
+        "registration_failed": "രജിസ്ട്രേഷൻ പരാജയപ്പെട്ടു. ഫോൺ നമ്പർ അല്ലെങ്കിൽ ഇമെയിൽ ഇതിനകം രജിസ്റ്റർ ചെയ്തിരിക്കാം.",
+        "fill_all_fields": "ദയവായി എല്ലാ ഫീൽഡുകളും പൂരിപ്പിക്കുക",
+        "passwords_dont_match": "പാസ്‌വേഡുകൾ പൊരുത്തപ്പെടുന്നില്ല",
+        "password_too_short": "പാസ്‌വേഡ് കുറഞ്ഞത് 6 അക്ഷരങ്ങൾ ഉണ്ടായിരിക്കണം",
+        "invalid_phone": "ദയവായി സാധുവായ ഇന്ത്യൻ ഫോൺ നമ്പർ നൽകുക (+91XXXXXXXXXX)",
+        "invalid_email": "ദയവായി സാധുവായ ഇമെയിൽ വിലാസം നൽകുക",
+        "choose_language": "നിങ്ങളുടെ ഇഷ്ടപ്പെട്ട ഭാഷ തിരഞ്ഞെടുക്കുക:",
+        "language_selected": "ഭാഷ തിരഞ്ഞെടുത്തു",
+        "weather_advisory": "കാലാവസ്ഥ ഉപദേശം",
+        "select_location": "സ്ഥലം തിരഞ്ഞെടുക്കുക",
+        "five_day_forecast": "5 ദിവസത്തെ കാലാവസ്ഥ പ്രവചനം",
+        "farming_advisory": "കൃഷി ഉപദേശം",
+        "good_for_planting": "നടീലിന് നല്ലത്",
+        "avoid_activities": "പുറത്തെ പ്രവർത്തനങ്ങൾ ഒഴിവാക്കുക",
+        "harvest_time": "വിളവെടുപ്പ് സമയം",
+        "fertilizer_time": "വളം ചേർക്കുക",
+        "irrigation_needed": "ജലസേചനം ആവശ്യം",
+        "detection_results": "നിർണയ ഫലം",
+        "disease_label": "രോഗം",
+        "confidence_label": "വിശ്വാസ്യത",
+        "severity_label": "തീവ്രത",
+        "symptoms_label": "ലക്ഷണങ്ങൾ",
+        "treatment_label": "ചികിത്സ",
+        "prevention_label": "പ്രതിരോധം",
+        "analyzing_image": "AI ഉപയോഗിച്ച് ചിത്രം വിശകലനം ചെയ്യുന്നു...",
+        "speak_replies": "മറുപടികൾ ശബ്ദമായി സംസാരിക്കുക",
+        "voice_chat": "വോയ്സ് ചാറ്റ്",
+        "add_new_farm": "പുതിയ കൃഷിയിടം ചേർക്കുക",
+        "farm_name": "ഫാം പേര്",
+        "land_size_hectares": "ഭൂമിയുടെ വലിപ്പം (ഹെക്ടർ)",
+        "soil_type": "മണ്ണിന്റെ തരം",
+        "irrigation_type": "ജലസേചന രീതി",
+        "crop_types": "വിളകളുടെ തരം",
+        "add_farm": "ഫാം ചേർക്കുക",
+        "farm_added_success": "ഫാം വിജയകരമായി ചേർത്തു!",
+        "filter_by_activity": "പ്രവർത്തനം അനുസരിച്ച് ഫിൽറ്റർ",
+        "filter_by_crop": "വിള അനുസരിച്ച് ഫിൽറ്റർ",
+        "filter_by_farm": "ഫാം അനുസരിച്ച് ഫിൽറ്റർ",
+        "no_activities_found": "തിരഞ്ഞെടുത്ത ഫിൽറ്ററുകൾക്ക് പ്രവർത്തനങ്ങൾ കണ്ടെത്തിയില്ല.",
+        "record_new_activity": "പുതിയ പ്രവർത്തനം രേഖപ്പെടുത്തുക",
+        "select_farm": "ഫാം തിരഞ്ഞെടുക്കുക",
+        "activity_type": "പ്രവർത്തനത്തിന്റെ തരം",
+        "date_label": "തീയതി",
+        "crop_name_opt": "വിളയുടെ പേര് (ഐച്ഛികം)",
+        "quantity_opt": "അളവ് (ഐച്ഛികം)",
+        "cost_opt": "ചെലവ് (₹, ഐച്ഛികം)",
+        "description": "വിവരണം",
+        "notes_opt": "കുറിപ്പുകൾ (ഐച്ഛികം)",
+        "record_activity": "പ്രവർത്തനം രേഖപ്പെടുത്തുക",
+        "activity_recorded_success": "പ്രവർത്തനം വിജയകരമായി രേഖപ്പെടുത്തി!",
+        "activity_queued": "പ്രവർത്തനം ബാച്ചിൽ ചേർത്തു",
+        "pending_activities": "സേവ് ചെയ്യാനുള്ള പ്രവർത്തനങ്ങൾ",
+        "save_all_now": "എല്ലാം ഇപ്പോൾ സേവ് ചെയ്യുക",
+        "activities_not_saved": "സേവ് ചെയ്യാത്ത പ്രവർത്തനങ്ങൾ",
+        "label_farm": "ഫാം",
+        "label_crop": "വിള",
+        "label_qty": "അളവ്",
+        "label_cost": "ചെലവ്",
+        "community_dashboard": "കമ്മ്യൂണിറ്റി ഡാഷ്ബോർഡ്",
+        "community_alerts": "കമ്മ്യൂണിറ്റി അലർട്ടുകൾ",
+        "affected_farms": "ബാധിത ഫാമുകൾ",
+        "regional_stats": "പ്രാദേശിക സ്ഥിതിവിവരക്കണക്കുകൾ",
+        "disease_reports_title": "രോഗ റിപ്പോർട്ടുകൾ (കഴിഞ്ഞ 30 ദിവസം)",
+        "farmers_by_crop": "വിളപ്രകാരം കർഷകരുടെ എണ്ണം",
+        "discussion_forum": "ചർച്ചാ ഫോറം",
+        "forum_placeholder": "കമ്മ്യൂണിറ്റി ചർച്ചാ ഫോറം വരുന്നു! സഹകർഷകരുമായി ബന്ധപ്പെടുക, അനുഭവങ്ങൾ പങ്കിടുക, വിദഗ്ധ സഹായം നേടുക.",
+        "date": "തീയതി",
+        "read_full_guide": "പൂർണ്ണ ഗൈഡ് വായിക്കുക",
+        "preparing_audio": "ഓഡിയോ തയ്യാറാക്കുന്നു..."
+    }
+}
+
+# Per-page headings and labels, looked up once per render via _page_labels
+_PAGE_LABELS = {
+    "en": {
+        "dashboard_title": "🌾 Krishi Sakhi Dashboard",
+        "welcome_back": "Welcome back",
+        "metric_farms": "🏡 My Farms",
+        "metric_activities": "📅 Activities (30d)",
+        "metric_cost": "💰 Monthly Cost",
+        "metric_alerts": "⚠️ Alerts",
+        "monthly_activities": "📊 Monthly Activities",
+        "activity_names": ("Sowing", "Watering", "Fertilizing", "Pest Control", "Harvesting"),
+        "cost_trends": "💸 Cost Trends",
+        "farms_header": "🏡 My Farms",
+        "activities_header": "📅 Farm Activities",
+        "disease_header": "🔬 AI Disease Detection",
+        "disease_intro": "Upload an image of your crop to detect diseases using AI",
+        "disease_uploader": "Choose crop image",
+        "disease_caption": "Uploaded Image",
+        "disease_crop_select": "Select Crop Type",
+        "disease_analyze": "🔍 Analyze Image",
+        "weather_recommended": "**✅ Recommended Activities:**",
+        "weather_recommended_items": ("Land preparation", "Fertilizer application", "Pest monitoring", "Nursery management"),
+        "weather_avoid": "**❌ Avoid These Activities:**",
+        "weather_avoid_items": ("Heavy machinery operations", "Pesticide spraying", "Harvesting operations"),
+        "chat_header": "🤖 AI Farming Assistant",
+        "chat_welcome": "Hello! I'm your AI farming assistant. How can I help you today?",
+        "chat_placeholder": "Type your farming question here...",
+        "chat_quick_questions": (
+            "What is the best time to plant rice?",
+            "How to control pests in coconut?",
+            "Fertilizer schedule for pepper?",
+            "Weather suitable for harvesting?",
+            "How to prevent diseases in crops?",
+            "Best irrigation methods for Kerala?"
+        ),
+        "kb_header": "📚 Knowledge Base",
+        "kb_search_placeholder": "Search for crops, diseases, schemes...",
+        "kb_crops": "🌾 Crops",
+        "kb_diseases": "🐛 Diseases & Pests",
+        "kb_schemes": "🏛️ Government Schemes"
+    },
+    "ml": {
+        "dashboard_title": "🌾 കൃഷി സഖി ഡാഷ്ബോർഡ്",
+        "welcome_back": "വീണ്ടും സ്വാഗതം",
+        "metric_farms": "🏡 എന്റെ കൃഷിയിടങ്ങൾ",
+        "metric_activities": "📅 പ്രവർത്തനങ്ങൾ (30d)",
+        "metric_cost": "💰 മാസിക ചെലവ്",
+        "metric_alerts": "⚠️ അലേർട്ടുകൾ",
+        "monthly_activities": "📊 മാസിക പ്രവർത്തനങ്ങൾ",
+        "activity_names": ("നടീൽ", "ജലസേചനം", "വളം", "കീടനിയന്ത്രണം", "വിളവെടുപ്പ്"),
+        "cost_trends": "💸 ചെലവ് പ്രവണതകൾ",
+        "farms_header": "🏡 എന്റെ കൃഷിയിടങ്ങൾ",
+        "activities_header": "📅 കൃഷി പ്രവർത്തനങ്ങൾ",
+        "disease_header": "🔬 AI രോഗ നിർണയം",
+        "disease_intro": "AI ഉപയോഗിച്ച് രോഗങ്ങൾ കണ്ടെത്താൻ നിങ്ങളുടെ വിളയുടെ ഒരു ചിത്രം അപ്‌ലോഡ് ചെയ്യുക",
+        "disease_uploader": "വിളയുടെ ചിത്രം തിരഞ്ഞെടുക്കുക",
+        "disease_caption": "അപ്‌ലോഡ് ചെയ്ത ചിത്രം",
+        "disease_crop_select": "വിളയുടെ തരം തിരഞ്ഞെടുക്കുക",
+        "disease_analyze": "🔍 ചിത്രം വിശകലനം ചെയ്യുക",
+        "weather_recommended": "**✅ ശുപാർശ ചെയ്യുന്ന പ്രവർത്തനങ്ങൾ:**",
+        "weather_recommended_items": ("ഭൂമി തയ്യാറാക്കൽ", "വളം പ്രയോഗം", "കീട നിരീക്ഷണം", "നേഴ്സറി മാനേജ്മെന്റ്"),
+        "weather_avoid": "**❌ ഈ പ്രവർത്തനങ്ങൾ ഒഴിവാക്കുക:**",
+        "weather_avoid_items": ("കനത്ത യന്ത്ര പ്രവർത്തനങ്ങൾ", "കീടനാശിനി തളിക്കൽ", "വിളവെടുപ്പ് പ്രവർത്തനങ്ങൾ"),
+        "chat_header": "🤖 AI കൃഷി സഹായി",
+        "chat_welcome": "ഹലോ! ഞാൻ നിങ്ങളുടെ AI കൃഷി അസിസ്റ്റന്റ്. ഇന്ന് എങ്ങനെ സഹായിക്കാം?",
+        "chat_placeholder": "നിങ്ങളുടെ കൃഷി ചോദ്യം ഇവിടെ ടൈപ്പ് ചെയ്യുക...",
+        "chat_quick_questions": (
+            "നെല്ല് നടുന്നതിന് ഏറ്റവും നല്ല സമയം?",
+            "തെങ്ങിലെ കീടങ്ങളെ എങ്ങനെ നിയന്ത്രിക്കാം?",
+            "കുരുമുളകിന് വളം എപ്പോൾ ചേർക്കാം?",
+            "വിളവെടുപ്പിന് അനുകൂലമായ കാലാവസ്ഥ?",
+            "വിളകളിലെ രോഗങ്ങൾ എങ്ങനെ തടയാം?",
+            "കേരളത്തിന് ഏറ്റവും നല്ല ജലസേചന മാർഗ്ഗങ്ങൾ?"
+        ),
+        "kb_header": "📚 അറിവ് ശേഖരം",
+        "kb_search_placeholder": "വിളകൾ, രോഗങ്ങൾ, സ്കീമുകൾ തിരയുക...",
+        "kb_crops": "🌾 വിളകൾ",
+        "kb_diseases": "🐛 രോഗങ്ങൾ & കീടങ്ങൾ",
+        "kb_schemes": "🏛️ സർക്കാർ സ്കീമുകൾ"
+    }
+}
+
+def _page_labels(language):
+    """Get the page label set for a language, falling back to English"""
+    return _PAGE_LABELS.get(language, _PAGE_LABELS["en"])
+
+# Each language's table with English filled in for missing keys, so a
+# lookup is a single dict probe
+_RESOLVED_TRANSLATIONS = {
+    language: {**_TRANSLATIONS["en"], **table} for language, table in _TRANSLATIONS.items()
+}
+
+def translations_for(language):
+    """Get the full UI string table for a language, for pages that look up many keys"""
+    return _RESOLVED_TRANSLATIONS.get(language, _RESOLVED_TRANSLATIONS["en"])
+
 def get_translation(key, language="en"):
     """Get translation for UI text"""
-    translations = {
-        "en": {
-            "dashboard": "Dashboard",
-            "my_farms": "My Farms",
-            "activities": "Activities",
-            "disease_detection": "Disease Detection",
-            "weather": "Weather",
-            "ai_chat": "AI Assistant",
-            "knowledge_base": "Knowledge Base",
-            "community": "Community",
-            "reports": "Reports",
-            "welcome": "Welcome to Krishi Sakhi",
-            "login": "Login",
-            "register": "Register",
-            "logout": "Logout",
-            "create_account": "Create New Account",
-            "full_name": "Full Name",
-            "phone_number": "Phone Number",
-            "email_address": "Email Address",
-            "location": "Location",
-            "preferred_language": "Preferred Language",
-            "password": "Password",
-            "confirm_password": "Confirm Password",
-            "registration_successful": "Registration successful! Welcome to Krishi Sakhi!",
-            "registration_failed": "Registration failed. Phone number or email may already be registered.",
-            "fill_all_fields": "Please fill in all fields",
-            "passwords_dont_match": "Passwords do not match",
-            "password_too_short": "Password must be at least 6 characters long",
-            "invalid_phone": "Please enter a valid Indian phone number (+91XXXXXXXXXX)",
-            "invalid_email": "Please enter a valid email address",
-            "choose_language": "Choose your preferred language:",
-            "language_selected": "Language Selected",
-            "weather_advisory": "Weather Advisory",
-            "select_location": "Select Location",
-            "five_day_forecast": "5-Day Forecast",
-            "farming_advisory": "Farming Advisory",
-            "good_for_planting": "Good for planting",
-            "avoid_activities": "Avoid outdoor activities",
-            "harvest_time": "Harvest time",
-            "fertilizer_time": "Apply fertilizer",
-            "irrigation_needed": "Irrigation needed",
-            "detection_results": "Detection Results",
-            "disease_label": "Disease",
-            "confidence_label": "Confidence",
-            "severity_label": "Severity",
-            "symptoms_label": "Symptoms",
-            "treatment_label": "Treatment",
-            "prevention_label": "Prevention",
-            "analyzing_image": "Analyzing image with AI...",
-            "speak_replies": "Speak replies",
-            "voice_chat": "Voice Chat",
-            "add_new_farm": "Add New Farm",
-            "farm_name": "Farm Name",
-            "land_size_hectares": "Land Size (hectares)",
-            "soil_type": "Soil Type",
-            "irrigation_type": "Irrigation Type",
-            "crop_types": "Crop Types",
-            "add_farm": "Add Farm",
-            "farm_added_success": "Farm added successfully!",
-            "filter_by_activity": "Filter by Activity",
-            "filter_by_crop": "Filter by Crop",
-            "filter_by_farm": "Filter by Farm",
-            "no_activities_found": "No activities found for the selected filters.",
-            "record_new_activity": "Record New Activity",
-            "select_farm": "Select Farm",
-            "activity_type": "Activity Type",
-            "date_label": "Date",
-            "crop_name_opt": "Crop Name (optional)",
-            "quantity_opt": "Quantity (optional)",
-            "cost_opt": "Cost (₹, optional)",
-            "description": "Description",
-            "notes_opt": "Notes (optional)",
-            "record_activity": "Record Activity",
-            "activity_recorded_success": "Activity recorded successfully!",
-            "label_farm": "Farm",
-            "label_crop": "Crop",
-            "label_qty": "Qty",
-            "label_cost": "Cost",
-            "community_dashboard": "Community Dashboard",
-            "community_alerts": "Community Alerts",
-            "affected_farms": "Affected Farms",
-            "regional_stats": "Regional Statistics",
-            "disease_reports_title": "Disease Reports (Last 30 Days)",
-            "farmers_by_crop": "Farmers by Crop Type",
-            "discussion_forum": "Discussion Forum",
-            "forum_placeholder": "Community discussion forum coming soon! Connect with fellow farmers, share experiences, and get expert advice.",
-            "date": "Date",
-            "read_full_guide": "Read Full Guide"
-        },
-        "ml": {
-            "dashboard": "ഡാഷ്ബോർഡ്",
-            "my_farms": "എന്റെ കൃഷിയിടങ്ങൾ",
-            "activities": "പ്രവർത്തനങ്ങൾ",
-            "disease_detection": "രോഗ നിർണയം",
-            "weather": "കാലാവസ്ഥ",
-            "ai_chat": "AI സഹായി",
-            "knowledge_base": "അറിവ് ശേഖരം",
-            "community": "കമ്മ്യൂണിറ്റി",
-            "reports": "റിപ്പോർട്ടുകൾ",
-            "welcome": "കൃഷി സഖിയിലേക്ക് സ്വാഗതം",
-            "login": "ലോഗിൻ",
-            "register": "രജിസ്റ്റർ",
-            "logout": "ലോഗ് ഔട്ട്",
-            "create_account": "പുതിയ അക്കൗണ്ട് സൃഷ്ടിക്കുക",
-            "full_name": "പൂർണ്ണ നാമം",
-            "phone_number": "ഫോൺ നമ്പർ",
-            "email_address": "ഇമെയിൽ വിലാസം",
-            "location": "സ്ഥലം",
-            "preferred_language": "ഇഷ്ടപ്പെട്ട ഭാഷ",
-            "password": "പാസ്‌വേഡ്",
-            "confirm_password": "പാസ്‌വേഡ് സ്ഥിരീകരിക്കുക",
-            "registration_successful": "രജിസ്ട്രേഷൻ വിജയകരമാണ്! കൃഷി സഖിയിലേക്ക് സ്വാഗതം!",
-            "registration_failed": "രജിസ്ട്രേഷൻ പരാജയപ്പെട്ടു. ഫോൺ നമ്പർ അല്ലെങ്കിൽ ഇമെയിൽ ഇതിനകം രജിസ്റ്റർ ചെയ്തിരിക്കാം.",
-            "fill_all_fields": "ദയവായി എല്ലാ ഫീൽഡുകളും പൂരിപ്പിക്കുക",
-            "passwords_dont_match": "പാസ്‌വേഡുകൾ പൊരുത്തപ്പെടുന്നില്ല",
-            "password_too_short": "പാസ്‌വേഡ് കുറഞ്ഞത് 6 അക്ഷരങ്ങൾ ഉണ്ടായിരിക്കണം",
-            "invalid_phone": "ദയവായി സാധുവായ ഇന്ത്യൻ ഫോൺ നമ്പർ നൽകുക (+91XXXXXXXXXX)",
-            "invalid_email": "ദയവായി സാധുവായ ഇമെയിൽ വിലാസം നൽകുക",
-            "choose_language": "നിങ്ങളുടെ ഇഷ്ടപ്പെട്ട ഭാഷ തിരഞ്ഞെടുക്കുക:",
-            "language_selected": "ഭാഷ തിരഞ്ഞെടുത്തു",
-            "weather_advisory": "കാലാവസ്ഥ ഉപദേശം",
-            "select_location": "സ്ഥലം തിരഞ്ഞെടുക്കുക",
-            "five_day_forecast": "5 ദിവസത്തെ കാലാവസ്ഥ പ്രവചനം",
-            "farming_advisory": "കൃഷി ഉപദേശം",
-            "good_for_planting": "നടീലിന് നല്ലത്",
-            "avoid_activities": "പുറത്തെ പ്രവർത്തനങ്ങൾ ഒഴിവാക്കുക",
-            "harvest_time": "വിളവെടുപ്പ് സമയം",
-            "fertilizer_time": "വളം ചേർക്കുക",
-            "irrigation_needed": "ജലസേചനം ആവശ്യം",
-            "detection_results": "നിർണയ ഫലം",
-            "disease_label": "രോഗം",
-            "confidence_label": "വിശ്വാസ്യത",
-            "severity_label": "തീവ്രത",
-            "symptoms_label": "ലക്ഷണങ്ങൾ",
-            "treatment_label": "ചികിത്സ",
-            "prevention_label": "പ്രതിരോധം",
-            "analyzing_image": "AI ഉപയോഗിച്ച് ചിത്രം വിശകലനം ചെയ്യുന്നു...",
-            "speak_replies": "മറുപടികൾ ശബ്ദമായി സംസാരിക്കുക",
-            "voice_chat": "വോയ്സ് ചാറ്റ്",
-            "add_new_farm": "പുതിയ കൃഷിയിടം ചേർക്കുക",
-            "farm_name": "ഫാം പേര്",
-            "land_size_hectares": "ഭൂമിയുടെ വലിപ്പം (ഹെക്ടർ)",
-            "soil_type": "മണ്ണിന്റെ തരം",
-            "irrigation_type": "ജലസേചന രീതി",
-            "crop_types": "വിളകളുടെ തരം",
-            "add_farm": "ഫാം ചേർക്കുക",
-            "farm_added_success": "ഫാം വിജയകരമായി ചേർത്തു!",
-            "filter_by_activity": "പ്രവർത്തനം അനുസരിച്ച് ഫിൽറ്റർ",
-            "filter_by_crop": "വിള അനുസരിച്ച് ഫിൽറ്റർ",
-            "filter_by_farm": "ഫാം അനുസരിച്ച് ഫിൽറ്റർ",
-            "no_activities_found": "തിരഞ്ഞെടുത്ത ഫിൽറ്ററുകൾക്ക് പ്രവർത്തനങ്ങൾ കണ്ടെത്തിയില്ല.",
-            "record_new_activity": "പുതിയ പ്രവർത്തനം രേഖപ്പെടുത്തുക",
-            "select_farm": "ഫാം തിരഞ്ഞെടുക്കുക",
-            "activity_type": "പ്രവർത്തനത്തിന്റെ തരം",
-            "date_label": "തീയതി",
-            "crop_name_opt": "വിളയുടെ പേര് (ഐച്ഛികം)",
-            "quantity_opt": "അളവ് (ഐച്ഛികം)",
-            "cost_opt": "ചെലവ് (₹, ഐച്ഛികം)",
-            "description": "വിവരണം",
-            "notes_opt": "കുറിപ്പുകൾ (ഐച്ഛികം)",
-            "record_activity": "പ്രവർത്തനം രേഖപ്പെടുത്തുക",
-            "activity_recorded_success": "പ്രവർത്തനം വിജയകരമായി രേഖപ്പെടുത്തി!",
-            "label_farm": "ഫാം",
-            "label_crop": "വിള",
-            "label_qty": "അളവ്",
-            "label_cost": "ചെലവ്",
-            "community_dashboard": "കമ്മ്യൂണിറ്റി ഡാഷ്ബോർഡ്",
-            "community_alerts": "കമ്മ്യൂണിറ്റി അലർട്ടുകൾ",
-            "affected_farms": "ബാധിത ഫാമുകൾ",
-            "regional_stats": "പ്രാദേശിക സ്ഥിതിവിവരക്കണക്കുകൾ",
-            "disease_reports_title": "രോഗ റിപ്പോർട്ടുകൾ (കഴിഞ്ഞ 30 ദിവസം)",
-            "farmers_by_crop": "വിളപ്രകാരം കർഷകരുടെ എണ്ണം",
-            "discussion_forum": "ചർച്ചാ ഫോറം",
-            "forum_placeholder": "കമ്മ്യൂണിറ്റി ചർച്ചാ ഫോറം വരുന്നു! സഹകർഷകരുമായി ബന്ധപ്പെടുക, അനുഭവങ്ങൾ പങ്കിടുക, വിദഗ്ധ സഹായം നേടുക.",
-            "date": "തീയതി",
-            "read_full_guide": "പൂർണ്ണ ഗൈഡ് വായിക്കുക"
-        }
-    }
-    return translations.get(language, {}).get(key, translations["en"].get(key, key))
+    return translations_for(language).get(key, key)
 
 # Authentication functions
 def login_user(phone, password):
@@ -344,6 +571,89 @@ def demo_login():
         return True
     return False
 
+def upload_image(endpoint, image_bytes, filename, mime="image/jpeg", data=None):
+    """POST an image as multipart form data; returns the JSON response or None"""
+    headers = {}
+    if st.session_state.access_token:
+        headers["Authorization"] = f"Bearer {st.session_state.access_token}"
+    try:
+        response = _SESSION.post(f"{API_BASE}{endpoint}", files={"file": (filename, image_bytes, mime)},
+                                 data=data, headers=headers, timeout=API_TIMEOUT)
+    except requests.RequestException:
+        return None
+    return response.json() if response.status_code == 200 else None
+
+def _voice():
+    """Get the session's VoiceAssistant, creating it on first use"""
+    if 'voice_assistant' not in st.session_state:
+        from voice_assistant import VoiceAssistant
+        st.session_state.voice_assistant = VoiceAssistant()
+    return st.session_state.voice_assistant
+
+@functools.lru_cache(maxsize=None)
+def _tts_voice():
+    """VoiceAssistant shared by speech synthesis, which may run off the script thread"""
+    from voice_assistant import VoiceAssistant
+    return VoiceAssistant()
+
+def _tts_audio(text, language):
+    """Synthesize speech for a reply, raising on failure; voice_assistant caches the audio"""
+    ok, audio_bytes, mime = _tts_voice().speak_text(text, language=language)
+    if not ok or not audio_bytes:
+        raise RuntimeError("Speech synthesis failed")
+    return audio_bytes, mime
+
+def speak(text, language):
+    """Text-to-speech for a reply, reusing cached audio for text spoken before"""
+    from voice_assistant import GTTS_AVAILABLE
+    if not GTTS_AVAILABLE:
+        # The mock voice shows the text instead; nothing worth caching
+        return _voice().speak_text(text, language=language)
+    try:
+        audio_bytes, mime = _tts_audio(text, language)
+    except RuntimeError:
+        return False, None, None
+    return True, audio_bytes, mime
+
+# Worker threads for reading knowledge-base guides aloud
+_TTS_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts")
+# How often a pending guide checks whether its audio is ready, in seconds
+TTS_POLL_INTERVAL = 0.5
+
+def _guide_audio_button(label, key, text, lang_code):
+    """Button that reads a guide aloud, synthesizing the audio in the background"""
+    from voice_assistant import GTTS_AVAILABLE
+    pending_key, audio_key = f"tts_pending_{key}", f"tts_audio_{key}"
+    if st.button(label, key=key):
+        st.session_state.pop(audio_key, None)
+        if GTTS_AVAILABLE:
+            st.session_state[pending_key] = _TTS_POOL.submit(_tts_audio, text, lang_code)
+        else:
+            # The mock voice writes to the page, so it has to run here
+            speak(text, lang_code)
+    
+    if pending_key in st.session_state:
+        _poll_guide_audio(pending_key, audio_key)
+    elif audio_key in st.session_state:
+        audio_bytes, mime = st.session_state[audio_key]
+        st.audio(audio_bytes, format=mime)
+
+@st.fragment(run_every=TTS_POLL_INTERVAL)
+def _poll_guide_audio(pending_key, audio_key):
+    """Wait for a guide's audio without blocking the page, then rerun to play it"""
+    future = st.session_state.get(pending_key)
+    if future is None:
+        return
+    if not future.done():
+        st.caption(f"🔊 {get_translation('preparing_audio', st.session_state.language)}")
+        return
+    del st.session_state[pending_key]
+    try:
+        st.session_state[audio_key] = future.result()
+    except RuntimeError:
+        pass  # Synthesis failed; there is nothing to play
+    st.rerun()
+
 def get_farmer_profile():
     """Get farmer profile"""
     if not st.session_state.farmer_data:
@@ -352,6 +662,14 @@ def get_farmer_profile():
             st.session_state.farmer_data = response
     return st.session_state.farmer_data
 
+def _metric_card(label, value, delta):
+    """Render a metric as one self-contained metric-card HTML block"""
+    return (
+        f'<div class="metric-card"><div>{label}</div>'
+        f'<div style="font-size: 1.8rem;">{value}</div>'
+        f'<div style="color: green;">{delta}</div></div>'
+    )
+
 # Page components
 def show_login_page():
     """Show login page"""
@@ -409,11 +727,7 @@ def show_login_page():
                     email = st.text_input(get_translation("email_address", current_lang), placeholder="your.email@example.com")
                 
                 with col2:
-                    location = st.selectbox(get_translation("location", current_lang), [
-                        "Thiruvananthapuram", "Kollam", "Pathanamthitta", "Alappuzha",
-                        "Kottayam", "Idukki", "Ernakulam", "Thrissur", "Palakkad",
-                        "Malappuram", "Kozhikode", "Wayanad", "Kannur", "Kasaragod"
-                    ])
+                    location = st.selectbox(get_translation("location", current_lang), _KERALA_DISTRICTS)
                     password = st.text_input(get_translation("password", current_lang), type="password", placeholder="Create a strong password")
                     confirm_password = st.text_input(get_translation("confirm_password", current_lang), type="password", placeholder="Confirm your password")
                 
@@ -428,9 +742,9 @@ def show_login_page():
                         st.error(get_translation("passwords_dont_match", current_lang))
                     elif len(password) < 6:
                         st.error(get_translation("password_too_short", current_lang))
-                    elif not phone.startswith("+91") or len(phone) != 13:
+                    elif not _PHONE_RE.match(phone):
                         st.error(get_translation("invalid_phone", current_lang))
-                    elif "@" not in email or "." not in email:
+                    elif not _EMAIL_RE.match(email):
                         st.error(get_translation("invalid_email", current_lang))
                     else:
                         lang_code = "ml" if selected_language == "മലയാളം" else "en"
@@ -451,56 +765,53 @@ def show_login_page():
                     st.success("Welcome to Krishi Sakhi Demo!")
                     st.rerun()
 
+@st.cache_data(show_spinner=False)
+def _activities_bar(language):
+    """Build the dashboard's monthly activities bar chart"""
+    import plotly.express as px
+    activities_data = {
+        "Activity": list(_page_labels(language)["activity_names"]),
+        "Count": [4, 8, 3, 2, 3]
+    }
+    return px.bar(activities_data, x="Activity", y="Count", 
+                  color="Count", color_continuous_scale="Greens")
+
+@st.cache_data(show_spinner=False)
+def _cost_line(day):
+    """Build the dashboard's cost trend line chart ending on the given day"""
+    import plotly.graph_objects as go
+    # Mock data for cost trends
+    dates = np.datetime64(day, 'D') - np.arange(30, 0, -5).astype('timedelta64[D]')
+    costs = np.array([1200, 1500, 800, 2000, 1800, 2200], dtype=np.int32)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=costs, mode='lines+markers',
+                           line=dict(color='#4CAF50', width=3),
+                           marker=dict(size=8)))
+    fig.update_layout(title="Daily Costs (₹)", xaxis_title="Date", yaxis_title="Amount")
+    return fig
+
+@st.fragment
 def show_dashboard():
     """Show dashboard"""
-    if st.session_state.language == "ml":
-        dashboard_title = "🌾 കൃഷി സഖി ഡാഷ്ബോർഡ്"
-        welcome_text = "വീണ്ടും സ്വാഗതം"
-    else:
-        dashboard_title = "🌾 Krishi Sakhi Dashboard"
-        welcome_text = "Welcome back"
+    L = _page_labels(st.session_state.language)
     
-    st.markdown(f'<div class="main-header"><h1>{dashboard_title}</h1></div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="main-header"><h1>{L["dashboard_title"]}</h1></div>', unsafe_allow_html=True)
     
     # Get farmer profile
     farmer = get_farmer_profile()
     if farmer:
-        st.write(f"{welcome_text}, {farmer['name']}! 🙏")
+        st.write(f"{L['welcome_back']}, {farmer['name']}! 🙏")
     
     # Metrics row
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        if st.session_state.language == "ml":
-            st.metric("🏡 എന്റെ കൃഷിയിടങ്ങൾ", "2", "+1")
-        else:
-            st.metric("🏡 My Farms", "2", "+1")
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        if st.session_state.language == "ml":
-            st.metric("📅 പ്രവർത്തനങ്ങൾ (30d)", "15", "+5")
-        else:
-            st.metric("📅 Activities (30d)", "15", "+5")
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        if st.session_state.language == "ml":
-            st.metric("💰 മാസിക ചെലവ്", "₹8,500", "+12%")
-        else:
-            st.metric("💰 Monthly Cost", "₹8,500", "+12%")
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        if st.session_state.language == "ml":
-            st.metric("⚠️ അലേർട്ടുകൾ", "3", "+2")
-        else:
-            st.metric("⚠️ Alerts", "3", "+2")
-        st.markdown('</div>', unsafe_allow_html=True)
+    metrics = [
+        (L["metric_farms"], "2", "+1"),
+        (L["metric_activities"], "15", "+5"),
+        (L["metric_cost"], "₹8,500", "+12%"),
+        (L["metric_alerts"], "3", "+2")
+    ]
+    for col, (label, value, delta) in zip(st.columns(4), metrics):
+        col.markdown(_metric_card(label, value, delta), unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -508,37 +819,12 @@ def show_dashboard():
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.session_state.language == "ml":
-            st.subheader("📊 മാസിക പ്രവർത്തനങ്ങൾ")
-            activities_data = {
-                "Activity": ["നടീൽ", "ജലസേചനം", "വളം", "കീടനിയന്ത്രണം", "വിളവെടുപ്പ്"],
-                "Count": [4, 8, 3, 2, 3]
-            }
-        else:
-            st.subheader("📊 Monthly Activities")
-            activities_data = {
-                "Activity": ["Sowing", "Watering", "Fertilizing", "Pest Control", "Harvesting"],
-                "Count": [4, 8, 3, 2, 3]
-            }
-        fig = px.bar(activities_data, x="Activity", y="Count", 
-                    color="Count", color_continuous_scale="Greens")
-        st.plotly_chart(fig, width='stretch')
+        st.subheader(L["monthly_activities"])
+        st.plotly_chart(_activities_bar(st.session_state.language), width='stretch')
     
     with col2:
-        if st.session_state.language == "ml":
-            st.subheader("💸 ചെലവ് പ്രവണതകൾ")
-        else:
-            st.subheader("💸 Cost Trends")
-        # Mock data for cost trends
-        dates = [datetime.now() - timedelta(days=30-i) for i in range(0, 30, 5)]
-        costs = [1200, 1500, 800, 2000, 1800, 2200]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=dates, y=costs, mode='lines+markers',
-                               line=dict(color='#4CAF50', width=3),
-                               marker=dict(size=8)))
-        fig.update_layout(title="Daily Costs (₹)", xaxis_title="Date", yaxis_title="Amount")
-        st.plotly_chart(fig, width='stretch')
+        st.subheader(L["cost_trends"])
+        st.plotly_chart(_cost_line(datetime.now().date()), width='stretch')
     
     # Weather and alerts
     col1, col2 = st.columns(2)
@@ -549,28 +835,35 @@ def show_dashboard():
     with col2:
         st.markdown('<div class="disease-alert"><h4>⚠️ Community Alert</h4><p>Blast disease reported in Rice crops near Kottayam area. Monitor your crops closely.</p></div>', unsafe_allow_html=True)
 
+@st.fragment
 def show_farms_page():
     """Show farms management page"""
-    if st.session_state.language == "ml":
-        st.header("🏡 എന്റെ കൃഷിയിടങ്ങൾ")
-    else:
-        st.header("🏡 My Farms")
+    import pandas as pd
+    L = _page_labels(st.session_state.language)
+    st.header(L["farms_header"])
     
     # Get farms data
     farms_data = make_api_request("/farms")
     
     if farms_data:
-        for farm in farms_data:
-            with st.expander(f"📍 {farm['name']} - {farm['location']}"):
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.write(f"**Land Size:** {farm['land_size']} hectares")
-                    st.write(f"**Soil Type:** {farm['soil_type']}")
-                with col2:
-                    st.write(f"**Irrigation:** {farm['irrigation_type']}")
-                    st.write(f"**Crops:** {', '.join(farm['crop_types'])}")
-                with col3:
-                    st.write(f"**Created:** {farm['created_at'][:10]}")
+        # One table for all farms, full details only for the selected one
+        farms_df = pd.DataFrame(farms_data, columns=["name", "location", "land_size", "soil_type", "irrigation_type"])
+        st.dataframe(farms_df, hide_index=True, width='stretch')
+        
+        farms_by_id = {farm['id']: farm for farm in farms_data}
+        farm_names = {farm['id']: farm['name'] for farm in farms_data}
+        selected = st.selectbox("Details for:", list(farms_by_id), format_func=farm_names.__getitem__)
+        farm = farms_by_id[selected]
+        st.markdown(f"**📍 {farm['name']} - {farm['location']}**")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.write(f"**Land Size:** {farm['land_size']} hectares")
+            st.write(f"**Soil Type:** {farm['soil_type']}")
+        with col2:
+            st.write(f"**Irrigation:** {farm['irrigation_type']}")
+            st.write(f"**Crops:** {', '.join(farm['crop_types'])}")
+        with col3:
+            st.write(f"**Created:** {farm['created_at'][:10]}")
     
     st.markdown("---")
     
@@ -585,10 +878,9 @@ def show_farms_page():
                 land_size = st.number_input(get_translation('land_size_hectares', st.session_state.language), min_value=0.1, value=1.0)
             
             with col2:
-                soil_type = st.selectbox(get_translation('soil_type', st.session_state.language), ["Loamy", "Clay", "Sandy", "Red Soil", "Alluvial"])
-                irrigation_type = st.selectbox(get_translation('irrigation_type', st.session_state.language), ["Drip", "Sprinkler", "Flood", "Rain-fed"])
-                crop_types = st.multiselect(get_translation('crop_types', st.session_state.language), 
-                    ["Rice", "Coconut", "Pepper", "Cardamom", "Rubber", "Tea", "Coffee", "Banana"])
+                soil_type = st.selectbox(get_translation('soil_type', st.session_state.language), _SOIL_TYPES)
+                irrigation_type = st.selectbox(get_translation('irrigation_type', st.session_state.language), _IRRIGATION_TYPES)
+                crop_types = st.multiselect(get_translation('crop_types', st.session_state.language), _CROP_TYPES)
             
             if st.form_submit_button(get_translation('add_farm', st.session_state.language)):
                 data = {
@@ -605,76 +897,138 @@ def show_farms_page():
                     st.success(get_translation('farm_added_success', st.session_state.language))
                     st.rerun()
 
+class ActivityBuffer:
+    """Queues new activities per session and posts them in one bulk request.
+
+    Streamlit has no timers, so the age limit is checked when the activities
+    fragment reruns, and every full script run flushes whatever is left.
+    """
+
+    def __init__(self, max_batch=16, max_wait_s=2.0):
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.pending = []
+        # Activities from batches the server refused in the last flush
+        self.rejected = []
+        self._first_added = None
+
+    def __len__(self):
+        return len(self.pending)
+
+    def add(self, activity):
+        if not self.pending:
+            self._first_added = time.monotonic()
+        self.pending.append(activity)
+
+    def due(self):
+        return bool(self.pending) and (
+            len(self.pending) >= self.max_batch
+            or time.monotonic() - self._first_added >= self.max_wait_s
+        )
+
+    def flush(self):
+        """POST the queued activities in batches; returns False if any batch failed.
+
+        A failed batch is moved to rejected rather than retried, so one batch the
+        server keeps refusing cannot hold up every activity queued after it.
+        """
+        self.rejected = []
+        while self.pending:
+            batch = self.pending[:self.max_batch]
+            del self.pending[:len(batch)]
+            if make_api_request("/activities/bulk", "POST", batch) is None:
+                self.rejected.extend(batch)
+        self._first_added = None
+        if self.rejected:
+            st.warning(f"{get_translation('activities_not_saved', st.session_state.language)}: "
+                       f"{len(self.rejected)}")
+            return False
+        return True
+
+def flush_pending_activities():
+    """Send queued activities before leaving the activities page or logging out"""
+    activity_buffer = st.session_state.get('activity_buffer')
+    if activity_buffer and st.session_state.access_token:
+        activity_buffer.flush()
+
+# Activity record field -> translation key of its table column header
+_ACTIVITY_COLUMN_KEYS = {
+    "activity_type": "activity_type",
+    "description": "description",
+    "farm_name": "label_farm",
+    "date": "date_label",
+    "crop_name": "label_crop",
+    "quantity": "label_qty",
+    "cost": "label_cost"
+}
+# Column headers per language, resolved once at import
+_ACTIVITY_COLUMNS = {
+    language: {field: table[key] for field, key in _ACTIVITY_COLUMN_KEYS.items()}
+    for language, table in _RESOLVED_TRANSLATIONS.items()
+}
+
+@st.fragment
 def show_activities_page():
     """Show activities page"""
-    if st.session_state.language == "ml":
-        st.header("📅 കൃഷി പ്രവർത്തനങ്ങൾ")
-    else:
-        st.header("📅 Farm Activities")
+    import pandas as pd
+    now = datetime.now()
+    L = _page_labels(st.session_state.language)
+    st.header(L["activities_header"])
     
-    # Get activities data
-    activities_data = make_api_request("/activities")
+    # Activities and the farm list for the add form, fetched together
+    fetched = _parallel_fetch(["/activities", "/farms"])
+    activities_data = fetched["/activities"]
     
     if activities_data:
-        # Create DataFrame for better display
-        df = pd.DataFrame(activities_data)
+        # Filter options in first-seen order
+        activity_types = list(dict.fromkeys(a['activity_type'] for a in activities_data))
+        crop_names = list(dict.fromkeys(a['crop_name'] for a in activities_data if a.get('crop_name')))
         
         # Filters
         col1, col2, col3 = st.columns(3)
         with col1:
             activity_filter = st.selectbox(get_translation('filter_by_activity', st.session_state.language), 
-                ["All"] + list(df['activity_type'].unique()) if len(df) > 0 else ["All"])
+                ["All"] + activity_types)
         with col2:
             crop_filter = st.selectbox(get_translation('filter_by_crop', st.session_state.language), 
-                ["All"] + list(df['crop_name'].dropna().unique()) if len(df) > 0 else ["All"])
+                ["All"] + crop_names)
         with col3:
-            date_range = st.date_input(get_translation('date_label', st.session_state.language), [datetime.now() - timedelta(days=30), datetime.now()])
+            date_range = st.date_input(get_translation('date_label', st.session_state.language), [now - timedelta(days=30), now])
         
-        # Apply filters
-        filtered_df = df.copy()
-        if activity_filter != "All":
-            filtered_df = filtered_df[filtered_df['activity_type'] == activity_filter]
-        if crop_filter != "All":
-            filtered_df = filtered_df[filtered_df['crop_name'] == crop_filter]
+        # Apply filters on the raw records; a DataFrame is only built for display
+        filtered = [
+            a for a in activities_data
+            if (activity_filter == "All" or a['activity_type'] == activity_filter)
+            and (crop_filter == "All" or a.get('crop_name') == crop_filter)
+        ]
         
-        # Display activities
-        if len(filtered_df) > 0:
-            for _, activity in filtered_df.iterrows():
-                with st.container():
-                    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
-                    with col1:
-                        st.write(f"**{activity['activity_type']}** - {activity['description']}")
-                        st.write(f"{get_translation('label_farm', st.session_state.language)}: {activity['farm_name']}")
-                    with col2:
-                        st.write(f"{get_translation('date_label', st.session_state.language)}: {activity['date']}")
-                        if activity['crop_name']:
-                            st.write(f"{get_translation('label_crop', st.session_state.language)}: {activity['crop_name']}")
-                    with col3:
-                        if activity['quantity']:
-                            st.write(f"{get_translation('label_qty', st.session_state.language)}: {activity['quantity']}")
-                    with col4:
-                        if activity['cost']:
-                            st.write(f"{get_translation('label_cost', st.session_state.language)}: ₹{activity['cost']}")
-                    st.markdown("---")
+        # Display activities as one table
+        if filtered:
+            columns = _ACTIVITY_COLUMNS.get(st.session_state.language, _ACTIVITY_COLUMNS["en"])
+            display_df = pd.DataFrame(filtered, columns=list(columns)).rename(columns=columns)
+            st.dataframe(display_df, hide_index=True, width='stretch')
         else:
             st.info(get_translation('no_activities_found', st.session_state.language))
     
+    if 'activity_buffer' not in st.session_state:
+        st.session_state.activity_buffer = ActivityBuffer()
+    activity_buffer = st.session_state.activity_buffer
+    
     # Add new activity
     with st.expander(f"➕ {get_translation('record_new_activity', st.session_state.language)}"):
-        farms_data = make_api_request("/farms")
+        farms_data = fetched["/farms"]
         
         if farms_data:
+            farm_ids = [farm['id'] for farm in farms_data]
+            farm_names = {farm['id']: farm['name'] for farm in farms_data}
             with st.form("add_activity"):
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     farm_id = st.selectbox(get_translation('select_farm', st.session_state.language), 
-                        [(farm['id'], farm['name']) for farm in farms_data], 
-                        format_func=lambda x: x[1])
-                    activity_type = st.selectbox(get_translation('activity_type', st.session_state.language), 
-                        ["Sowing", "Transplanting", "Watering", "Fertilizing", 
-                         "Weeding", "Pest Control", "Harvesting", "Pruning"])
-                    date = st.date_input(get_translation('date_label', st.session_state.language), datetime.now())
+                        farm_ids, format_func=farm_names.__getitem__)
+                    activity_type = st.selectbox(get_translation('activity_type', st.session_state.language), _ACTIVITY_TYPES)
+                    date = st.date_input(get_translation('date_label', st.session_state.language), now)
                 
                 with col2:
                     crop_name = st.text_input(get_translation('crop_name_opt', st.session_state.language))
@@ -686,7 +1040,7 @@ def show_activities_page():
                 
                 if st.form_submit_button(get_translation('record_activity', st.session_state.language)):
                     data = {
-                        "farm_id": farm_id[0],
+                        "farm_id": farm_id,
                         "activity_type": activity_type,
                         "description": description,
                         "date": date.isoformat(),
@@ -696,65 +1050,198 @@ def show_activities_page():
                         "notes": notes if notes else None
                     }
                     
-                    response = make_api_request("/activities", "POST", data)
-                    if response:
-                        st.success(get_translation('activity_recorded_success', st.session_state.language))
-                        st.rerun()
+                    activity_buffer.add(data)
+                    if activity_buffer.due():
+                        if activity_buffer.flush():
+                            st.success(get_translation('activity_recorded_success', st.session_state.language))
+                            st.rerun()
+                    else:
+                        st.info(get_translation('activity_queued', st.session_state.language))
+        
+        # Activities waiting to be sent with the next batch
+        if activity_buffer:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.caption(f"⏳ {get_translation('pending_activities', st.session_state.language)}: {len(activity_buffer)}")
+            with col2:
+                flush_now = st.button(get_translation('save_all_now', st.session_state.language))
+            if flush_now or activity_buffer.due():
+                if activity_buffer.flush():
+                    st.success(get_translation('activity_recorded_success', st.session_state.language))
+                    st.rerun()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _decode_image(file_bytes):
+    """Decode uploaded image bytes once; reruns with the same upload reuse the result"""
+    from PIL import Image
+    image = Image.open(io.BytesIO(file_bytes))
+    image.load()
+    return image
+
+# Leaf features: mean R, G, B, a hue histogram, and Sobel edge density
+FEATURE_IMAGE_SIZE = 96
+HUE_BINS = 8
+LEAF_FEATURE_SIZE = 3 + HUE_BINS + 1
+MIN_HUE_SATURATION = 0.2
+EDGE_THRESHOLD = 0.25
+# Share of hued pixels in the red-brown/yellow bins above which damage is "High"
+HIGH_SEVERITY_LESION_FRACTION = 0.3
+
+def _leaf_disease_features(rgb):
+    """Feature vector for an HxWx3 uint8 leaf image.
+
+    Written as plain loops so numba can compile it; without numba it runs as
+    Python on the downscaled image.
+    """
+    h, w = rgb.shape[0], rgb.shape[1]
+    features = np.zeros(LEAF_FEATURE_SIZE)
+    gray = np.empty((h, w))
+    hued = 0
+    for y in range(h):
+        for x in range(w):
+            r = rgb[y, x, 0] / 255.0
+            g = rgb[y, x, 1] / 255.0
+            b = rgb[y, x, 2] / 255.0
+            features[0] += r
+            features[1] += g
+            features[2] += b
+            gray[y, x] = 0.299 * r + 0.587 * g + 0.114 * b
+            
+            hi = max(r, g, b)
+            delta = hi - min(r, g, b)
+            if delta > 0 and delta / hi > MIN_HUE_SATURATION:
+                if hi == r:
+                    hue = ((g - b) / delta) % 6.0
+                elif hi == g:
+                    hue = (b - r) / delta + 2.0
+                else:
+                    hue = (r - g) / delta + 4.0
+                features[3 + min(int(hue / 6.0 * HUE_BINS), HUE_BINS - 1)] += 1
+                hued += 1
+    
+    edges = 0
+    for y in range(1, h - 1):
+        for x in range(1, w - 1):
+            gx = (gray[y - 1, x + 1] + 2 * gray[y, x + 1] + gray[y + 1, x + 1]
+                  - gray[y - 1, x - 1] - 2 * gray[y, x - 1] - gray[y + 1, x - 1])
+            gy = (gray[y + 1, x - 1] + 2 * gray[y + 1, x] + gray[y + 1, x + 1]
+                  - gray[y - 1, x - 1] - 2 * gray[y - 1, x] - gray[y - 1, x + 1])
+            if gx * gx + gy * gy > EDGE_THRESHOLD * EDGE_THRESHOLD:
+                edges += 1
+    
+    features[0:3] /= h * w
+    if hued:
+        features[3:3 + HUE_BINS] /= hued
+    features[3 + HUE_BINS] = edges / max((h - 2) * (w - 2), 1)
+    return features
+
+@functools.lru_cache(maxsize=None)
+def _leaf_feature_extractor():
+    """_leaf_disease_features compiled with numba when it's installed.
+
+    numba is imported on the first analysis, not at startup, since only the
+    disease page needs it.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return _leaf_disease_features
+    return njit(cache=True, fastmath=True)(_leaf_disease_features)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _image_features(file_bytes):
+    """Leaf features of an uploaded image, computed on a small thumbnail"""
+    image = _decode_image(file_bytes).convert("RGB").resize((FEATURE_IMAGE_SIZE, FEATURE_IMAGE_SIZE))
+    return _leaf_feature_extractor()(np.asarray(image, dtype=np.uint8))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _mock_detection(image_digest, crop_name, lesion_fraction):
+    """Mock disease detection result, stable for a given image and crop"""
+    diseases = _MOCK_DISEASES.get(crop_name, _MOCK_DISEASES["Rice"])
+    disease = diseases[_NPRNG.integers(len(diseases))]
+    confidence = float(_NPRNG.uniform(0.7, 0.95))
+    
+    return {
+        "disease": disease,
+        "confidence": confidence * 100,
+        "severity": "High" if lesion_fraction > HIGH_SEVERITY_LESION_FRACTION else "Medium",
+        "symptoms": ["Leaf spots", "Discoloration", "Wilting"],
+        "treatment": ["Apply fungicide", "Remove affected parts", "Improve drainage"],
+        "prevention": ["Use resistant varieties", "Maintain hygiene", "Monitor regularly"]
+    }
+
+# Recent backend detections kept across pages and sessions
+DETECTION_STORE_SIZE = 256
 
+class _DetectionStore:
+    """Thread-safe LRU of detection results keyed by (farmer, image digest, crop)"""
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            if len(self._results) > self._maxsize:
+                self._results.popitem(last=False)
+
+@st.cache_resource
+def _detection_store():
+    return _DetectionStore(DETECTION_STORE_SIZE)
+
+@st.fragment
 def show_disease_detection():
     """Show disease detection page"""
-    if st.session_state.language == "ml":
-        st.header("🔬 AI രോഗ നിർണയം")
-        st.write("AI ഉപയോഗിച്ച് രോഗങ്ങൾ കണ്ടെത്താൻ നിങ്ങളുടെ വിളയുടെ ഒരു ചിത്രം അപ്‌ലോഡ് ചെയ്യുക")
-    else:
-        st.header("🔬 AI Disease Detection")
-        st.write("Upload an image of your crop to detect diseases using AI")
+    t = translations_for(st.session_state.language)
+    L = _page_labels(st.session_state.language)
+    st.header(L["disease_header"])
+    st.write(L["disease_intro"])
     
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.session_state.language == "ml":
-            uploader_text = "വിളയുടെ ചിത്രം തിരഞ്ഞെടുക്കുക"
-            caption_text = "അപ്‌ലോഡ് ചെയ്ത ചിത്രം"
-            crop_select_text = "വിളയുടെ തരം തിരഞ്ഞെടുക്കുക"
-            crop_options = ["നെല്ല്", "തെങ്ങ്", "കുരുമുളക്", "ഏലം", "റബ്ബർ", "വാഴ"]
-            analyze_text = "🔍 ചിത്രം വിശകലനം ചെയ്യുക"
-        else:
-            uploader_text = "Choose crop image"
-            caption_text = "Uploaded Image"
-            crop_select_text = "Select Crop Type"
-            crop_options = ["Rice", "Coconut", "Pepper", "Cardamom", "Rubber", "Banana"]
-            analyze_text = "🔍 Analyze Image"
+        crop_options = _DETECTION_CROP_OPTIONS.get(st.session_state.language, _DETECTION_CROPS)
         
-        uploaded_file = st.file_uploader(uploader_text, type=['png', 'jpg', 'jpeg'])
+        uploaded_file = st.file_uploader(L["disease_uploader"], type=['png', 'jpg', 'jpeg'])
         
         if uploaded_file:
-            image = Image.open(uploaded_file)
-            st.image(image, caption=caption_text, use_column_width=True)
+            image_bytes = uploaded_file.getvalue()
+            image = _decode_image(image_bytes)
+            st.image(image, caption=L["disease_caption"], use_column_width=True)
             
-            crop_name = st.selectbox(crop_select_text, crop_options)
+            crop_name = st.selectbox(L["disease_crop_select"], crop_options)
+            crop_key = _DETECTION_CROPS[crop_options.index(crop_name)]
             
-            if st.button(analyze_text, use_container_width=True):
-                with st.spinner(get_translation("analyzing_image", st.session_state.language)):
-                    # Mock disease detection result
-                    import random
-                    diseases = {
-                        "Rice": ["Blast Disease", "Brown Spot", "Bacterial Blight"],
-                        "Coconut": ["Leaf Rot", "Crown Rot", "Bud Rot"],
-                        "Pepper": ["Anthracnose", "Bacterial Wilt", "Root Rot"]
-                    }
+            if st.button(L["disease_analyze"], use_container_width=True):
+                with st.spinner(t["analyzing_image"]):
+                    image_digest = hashlib.sha1(image_bytes).hexdigest()
+                    store_key = (st.session_state.get('farmer_id'), image_digest, crop_key)
+                    store = _detection_store()
+                    result = store.get(store_key)
                     
-                    disease = random.choice(diseases.get(crop_name, diseases["Rice"]))
-                    confidence = random.uniform(0.7, 0.95)
+                    if result is None:
+                        # Send the raw image bytes to the backend as a multipart upload
+                        result = upload_image("/ai/detect-disease/upload", image_bytes,
+                                              uploaded_file.name, uploaded_file.type, {"crop_name": crop_key})
+                        if result is not None:
+                            store.put(store_key, result)
                     
-                    result = {
-                        "disease": disease,
-                        "confidence": confidence * 100,
-                        "severity": "High" if confidence > 0.8 else "Medium",
-                        "symptoms": ["Leaf spots", "Discoloration", "Wilting"],
-                        "treatment": ["Apply fungicide", "Remove affected parts", "Improve drainage"],
-                        "prevention": ["Use resistant varieties", "Maintain hygiene", "Monitor regularly"]
-                    }
+                    if result is None:
+                        # Mock disease detection result when the backend is unavailable,
+                        # with severity from how much of the leaf is yellow/brown
+                        features = _image_features(image_bytes)
+                        lesion_fraction = round(float(features[3] + features[4]), 2)
+                        result = _mock_detection(image_digest, crop_key, lesion_fraction)
                     
                     st.session_state.detection_result = result
     
@@ -762,34 +1249,56 @@ def show_disease_detection():
         if 'detection_result' in st.session_state:
             result = st.session_state.detection_result
             
-            st.subheader(f"🎯 {get_translation('detection_results', st.session_state.language)}")
+            st.subheader(f"🎯 {t['detection_results']}")
             
             # Disease info
-            disease_label = get_translation('disease_label', st.session_state.language)
-            confidence_label = get_translation('confidence_label', st.session_state.language)
-            severity_label = get_translation('severity_label', st.session_state.language)
-            st.markdown(f"**{disease_label}:** {result['disease']}")
-            st.markdown(f"**{confidence_label}:** {result['confidence']:.1f}%")
-            st.markdown(f"**{severity_label}:** {result['severity']}")
+            st.markdown(f"**{t['disease_label']}:** {result['disease']}")
+            st.markdown(f"**{t['confidence_label']}:** {result['confidence']:.1f}%")
+            st.markdown(f"**{t['severity_label']}:** {result['severity']}")
             
             # Progress bar for confidence
             st.progress(result['confidence'] / 100)
             
             # Symptoms
-            st.subheader(f"🔍 {get_translation('symptoms_label', st.session_state.language)}")
+            st.subheader(f"🔍 {t['symptoms_label']}")
             for symptom in result['symptoms']:
                 st.write(f"• {symptom}")
             
             # Treatment
-            st.subheader(f"💊 {get_translation('treatment_label', st.session_state.language)}")
+            st.subheader(f"💊 {t['treatment_label']}")
             for treatment in result['treatment']:
                 st.write(f"• {treatment}")
             
             # Prevention
-            st.subheader(f"🛡️ {get_translation('prevention_label', st.session_state.language)}")
+            st.subheader(f"🛡️ {t['prevention_label']}")
             for prevention in result['prevention']:
                 st.write(f"• {prevention}")
 
+@st.cache_data(ttl=600, show_spinner=False)
+def get_current_weather(location):
+    """Current conditions for a district (mock data until a weather API is wired in)"""
+    return dict(_MOCK_CURRENT_WEATHER)
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def get_forecast(location, seed_date):
+    """5-day forecast for a district starting at seed_date.
+
+    The mock is seeded by location and date so it stays the same across reruns.
+    """
+    import pandas as pd
+    seed = int.from_bytes(hashlib.sha1(f"{location}|{seed_date.isoformat()}".encode()).digest()[:8], "big")
+    rng = np.random.default_rng(seed)
+    dates = [seed_date + timedelta(days=i) for i in range(5)]
+    return pd.DataFrame({
+        "Date": [date.strftime("%m/%d") for date in dates],
+        "Day": [date.strftime("%A") for date in dates],
+        "High": rng.integers(26, 33, 5),
+        "Low": rng.integers(20, 26, 5),
+        "Rain": rng.integers(0, 11, 5),
+        "Icon": _WEATHER_ICONS[rng.integers(0, len(_WEATHER_ICONS), 5)]
+    })
+
+@st.fragment
 def show_weather_page():
     """Show weather page"""
     st.header(f"🌤️ {get_translation('weather_advisory', st.session_state.language)}")
@@ -797,131 +1306,182 @@ def show_weather_page():
     col1, col2 = st.columns([2, 1])
     
     with col2:
-        location = st.selectbox(get_translation("select_location", st.session_state.language), [
-            "Thiruvananthapuram", "Kollam", "Pathanamthitta", "Alappuzha",
-            "Kottayam", "Idukki", "Ernakulam", "Thrissur", "Palakkad",
-            "Malappuram", "Kozhikode", "Wayanad", "Kannur", "Kasaragod"
-        ])
-    
-    # Mock weather data
-    current_weather = {
-        "temperature": 28,
-        "humidity": 75,
-        "rainfall": 2.5,
-        "wind_speed": 12,
-        "description": "Partly cloudy",
-        "icon": "⛅"
-    }
+        location = st.selectbox(get_translation("select_location", st.session_state.language), _KERALA_DISTRICTS)
+    
+    current_weather = get_current_weather(location)
     
     with col1:
-        st.markdown(f"""
-        <div class="weather-card">
-            <h2>{current_weather['icon']} {location}</h2>
-            <h1>{current_weather['temperature']}°C</h1>
-            <p>{current_weather['description']}</p>
-            <div style="display: flex; justify-content: space-around; margin-top: 1rem;">
-                <div>💧 {current_weather['humidity']}%</div>
-                <div>🌧️ {current_weather['rainfall']}mm</div>
-                <div>💨 {current_weather['wind_speed']} km/h</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_WEATHER_CARD_TPL.format_map({**current_weather, "location": location}), unsafe_allow_html=True)
     
     st.markdown("---")
     
     # 5-day forecast
     st.subheader(f"📅 {get_translation('five_day_forecast', st.session_state.language)}")
     
-    forecast_data = []
-    for i in range(5):
-        date = datetime.now() + timedelta(days=i)
-        forecast_data.append({
-            "Date": date.strftime("%m/%d"),
-            "Day": date.strftime("%A"),
-            "High": random.randint(26, 32),
-            "Low": random.randint(20, 25),
-            "Rain": random.randint(0, 10),
-            "Icon": random.choice(["☀️", "⛅", "🌦️", "🌧️"])
-        })
-    
-    df_forecast = pd.DataFrame(forecast_data)
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-    for i, (_, day) in enumerate(df_forecast.iterrows()):
-        with [col1, col2, col3, col4, col5][i]:
-            st.markdown(f"""
-            <div style="text-align: center; padding: 1rem; border: 1px solid #ddd; border-radius: 8px;">
-                <h4>{day['Day'][:3]}</h4>
-                <div style="font-size: 2rem;">{day['Icon']}</div>
-                <p>{day['High']}° / {day['Low']}°</p>
-                <p>🌧️ {day['Rain']}mm</p>
-            </div>
-            """, unsafe_allow_html=True)
+    df_forecast = get_forecast(location, datetime.now().date())
+    
+    # One table instead of a markdown card per day
+    forecast_table = df_forecast[["Day", "Date", "Icon", "High", "Low", "Rain"]].style.set_properties(
+        **{"text-align": "center"}
+    ).format({"High": "{}°", "Low": "{}°", "Rain": "🌧️ {}mm"})
+    st.dataframe(forecast_table, hide_index=True, use_container_width=True)
     
     st.markdown("---")
     
     # Farming advisory
     st.subheader(f"🌾 {get_translation('farming_advisory', st.session_state.language)}")
     
+    L = _page_labels(st.session_state.language)
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.session_state.language == "ml":
-            st.markdown("**✅ ശുപാർശ ചെയ്യുന്ന പ്രവർത്തനങ്ങൾ:**")
-            st.write("• ഭൂമി തയ്യാറാക്കൽ")
-            st.write("• വളം പ്രയോഗം")
-            st.write("• കീട നിരീക്ഷണം")
-            st.write("• നേഴ്സറി മാനേജ്മെന്റ്")
-        else:
-            st.markdown("**✅ Recommended Activities:**")
-            st.write("• Land preparation")
-            st.write("• Fertilizer application")
-            st.write("• Pest monitoring")
-            st.write("• Nursery management")
+        st.markdown(L["weather_recommended"])
+        for item in L["weather_recommended_items"]:
+            st.write(f"• {item}")
     
     with col2:
-        if st.session_state.language == "ml":
-            st.markdown("**❌ ഈ പ്രവർത്തനങ്ങൾ ഒഴിവാക്കുക:**")
-            st.write("• കനത്ത യന്ത്ര പ്രവർത്തനങ്ങൾ")
-            st.write("• കീടനാശിനി തളിക്കൽ")
-            st.write("• വിളവെടുപ്പ് പ്രവർത്തനങ്ങൾ")
-        else:
-            st.markdown("**❌ Avoid These Activities:**")
-            st.write("• Heavy machinery operations")
-            st.write("• Pesticide spraying")
-            st.write("• Harvesting operations")
+        st.markdown(L["weather_avoid"])
+        for item in L["weather_avoid_items"]:
+            st.write(f"• {item}")
+
+# Rule-based chat replies. Intents are checked in this order and the first
+# one with a keyword anywhere in the message wins.
+_CHAT_INTENT_KEYWORDS = {
+    "rice": frozenset({'rice', 'paddy', 'നെല്ല്', 'വിത്ത്'}),
+    "coconut": frozenset({'coconut', 'തെങ്ങ്', 'നാളികേരം'}),
+    "pepper": frozenset({'pepper', 'കുരുമുളക്', 'മരിച്ച'}),
+    "disease": frozenset({'disease', 'pest', 'രോഗം', 'കീടം'}),
+    "weather": frozenset({'weather', 'rain', 'monsoon', 'കാലാവസ്ഥ', 'മഴ'}),
+    "schemes": frozenset({
+        'scheme', 'schemes', 'subsidy', 'government', 'pm-kisan', 'pm kisan', 'pmkisan',
+        'pm-fasal', 'pm fasal', 'kisan credit', 'കേന്ദ്ര', 'സർക്കാർ', 'സബ്സിഡി', 'സ്കീം'
+    })
+}
+_CHAT_REPLIES = {
+    ("rice", "ml"): "നെല്ല് കൃഷിക്ക് ജൂൺ-ജൂലൈ മാസങ്ങളാണ് ഏറ്റവും നല്ല സമയം. നല്ല വിത്ത് ഉപയോഗിച്ച് 20x15 സെ.മീ അകലത്തിൽ നടുക. വളം ആവശ്യത്തിന് ചേർക്കുക. ജലനിർമാണം ശ്രദ്ധിക്കുക.",
+    ("rice", "en"): "For rice cultivation in Kerala, the best planting time is June-July. Use quality seeds with 20x15 cm spacing. Apply balanced fertilizer as per soil test recommendations. Maintain proper water management.",
+    ("coconut", "ml"): "തെങ്ങ് കൃഷിക്ക് മഴക്കാലമാണ് നല്ല സമയം. ഏഴ് മീറ്റർ അകലത്തിൽ നടുക. വാർഷികം 50 കിലോ ജൈവവളം ചേർക്കുക. ശരിയായ വാരിനീക്കൽ ഉറപ്പാക്കുക.",
+    ("coconut", "en"): "For coconut farming, monsoon season is ideal. Plant with 7-meter spacing. Apply 50kg organic manure annually. Ensure proper drainage and regular weeding.",
+    ("pepper", "ml"): "കുരുമുളക് കൃഷിക്ക് മേയ്-ജൂൺ മാസങ്ങളാണ് നല്ല സമയം. ജീവിത സ്റ്റാൻഡേർഡ് ഉപയോഗിക്കുക. വാർഷികം 10 കിലോ ജൈവവളം ചേർക്കുക. നല്ല വാരിനീക്കലും നിഴൽ മാനേജ്മെന്റും ഉറപ്പാക്കുക.",
+    ("pepper", "en"): "For pepper cultivation, May-June is the best season. Use live standards like silver oak. Apply 10kg organic manure per vine annually. Ensure good drainage and shade management (50-60%).",
+    ("disease", "ml"): "രോഗങ്ങൾ തടയാൻ വയലിൽ വൃത്തിയും ശുചിത്വവും പാലിക്കുക. രോഗബാധിത ചെടികൾ നീക്കം ചെയ്യുക. സംയോജിത കീടനിയന്ത്രണം പാലിക്കുക. ആവശ്യമെങ്കിൽ കാർഷിക വിദഗ്ധനെ സമീപിക്കുക.",
+    ("disease", "en"): "To prevent diseases, maintain field hygiene and remove infected plants. Use integrated pest management practices. Regular monitoring is essential. Consult agricultural experts when needed.",
+    ("weather", "ml"): "കേരള കർഷകർക്കുള്ള കാലാവസ്ഥ ഉപദേശം: ദൈനംദിന കാലാവസ്ഥ പ്രവചനം നിരീക്ഷിക്കുക. മഴ പ്രവചനത്തെ അടിസ്ഥാനമാക്കി പ്രവർത്തനങ്ങൾ ആസൂത്രണം ചെയ്യുക. മഴക്കാലത്ത് ഇൻപുട്ടുകൾക്ക് മൂടിയ സംഭരണം ഉപയോഗിക്കുക.",
+    ("weather", "en"): "Weather advisory for Kerala farmers: Monitor daily weather forecasts. Plan activities based on rainfall predictions. Use covered storage for inputs during monsoon. Ensure proper field drainage during heavy rains.",
+    ("schemes", "ml"): (
+        "സർക്കാർ സ്കീമുകളുടെ ചുരുക്കം:\n"
+        "• PM-KISAN: വർഷത്തിൽ ₹6,000 നേരിട്ട് കർഷകരുടെ അക്കൗണ്ടിൽ.\n"
+        "• PM Fasal Bima Yojana: വിള ഇൻഷുറൻസ് കുറഞ്ഞ പ്രീമിയത്തിൽ.\n"
+        "• Kisan Credit Card (KCC): കുറഞ്ഞ പലിശയിൽ പ്രവർത്തി വായ്പ.\n"
+        "• കേരള സർക്കാരിന്റെ സബ്സിഡികൾ: ഡ്രിപ്പ്, പോളിഹൗസ്, യന്ത്രങ്ങൾ മുതലായവ.\n"
+        "അപേക്ഷ: Krishi Office / https://pmkisan.gov.in/ / https://keralaagriculture.gov.in/"
+    ),
+    ("schemes", "en"): (
+        "Key government schemes:\n"
+        "• PM-KISAN: ₹6,000 per year (DBT).\n"
+        "• PM Fasal Bima Yojana: Low premium crop insurance.\n"
+        "• Kisan Credit Card (KCC): Subsidized working capital.\n"
+        "• Kerala subsidies: Drip irrigation, polyhouse, machinery support.\n"
+        "Apply: Local Krishi office / https://pmkisan.gov.in/ / https://keralaagriculture.gov.in/"
+    ),
+    ("general", "ml"): "നിങ്ങളുടെ ചോദ്യം മനസ്സിലായി. കൃഷിയുമായി ബന്ധപ്പെട്ട കൂടുതൽ വിവരങ്ങൾക്ക് പ്രാദേശിക കാർഷിക ഓഫീസറെ സമീപിക്കുക. കൃഷി സഖി എപ്പോഴും നിങ്ങളുടെ സഹായത്തിന് ഉണ്ട്!",
+    ("general", "en"): "I understand your question. For specific farming advice in your area, I recommend consulting with local agricultural extension officers or experts. Krishi Sakhi is always here to help you!"
+}
+# Keyword -> intent, matched with one scan of the message. Substring matching
+# (not word tokens) keeps plurals like "diseases", multi-word keywords, and
+# Malayalam, which \w cannot tokenize because it skips vowel signs and virama.
+_CHAT_KEYWORD_INTENTS = {
+    keyword: intent for intent, keywords in _CHAT_INTENT_KEYWORDS.items() for keyword in keywords
+}
+if AHOCORASICK_AVAILABLE:
+    _CHAT_AUTOMATON = ahocorasick.Automaton()
+    for _keyword, _intent in _CHAT_KEYWORD_INTENTS.items():
+        _CHAT_AUTOMATON.add_word(_keyword, _intent)
+    _CHAT_AUTOMATON.make_automaton()
+
+    def _chat_intents_in(text):
+        return {intent for _, intent in _CHAT_AUTOMATON.iter(text)}
+else:
+    # Lookahead so overlapping keywords are all reported
+    _CHAT_KEYWORD_RE = re.compile(
+        "(?=(" + "|".join(map(re.escape, sorted(_CHAT_KEYWORD_INTENTS, key=len, reverse=True))) + "))"
+    )
+
+    def _chat_intents_in(text):
+        return {_CHAT_KEYWORD_INTENTS[m.group(1)] for m in _CHAT_KEYWORD_RE.finditer(text)}
+
+# Farmers repeat the same questions a lot, so remember recent answers
+@functools.lru_cache(maxsize=256)
+def classify_and_reply(text, lang_code):
+    """Get the rule-based assistant reply for a chat message"""
+    found = _chat_intents_in(text.lower())
+    for intent in _CHAT_INTENT_KEYWORDS:
+        if intent in found:
+            return _CHAT_REPLIES[intent, lang_code]
+    return _CHAT_REPLIES["general", lang_code]
+
+# Older turns are dropped past this so a long session doesn't re-render forever
+CHAT_HISTORY_LIMIT = 50
+
+_CHAT_BUBBLE_STYLES = {
+    "user": ("#E3F2FD", "👤"),
+    "assistant": ("#E8F5E8", "🤖"),
+}
+
+@functools.lru_cache(maxsize=None)
+def _speech_modules():
+    """Import the speech libraries on first use of the chat page.
+
+    Returns (speech_recognition module, mic_recorder component), either of which
+    is None when the library isn't installed.
+    """
+    try:
+        import speech_recognition as sr  # STT
+    except Exception:
+        sr = None
+    try:
+        from streamlit_mic_recorder import mic_recorder
+    except Exception:
+        mic_recorder = None
+    return sr, mic_recorder
+
+def _chat_message(role, content):
+    """Chat history entry with its bubble HTML escaped and rendered once, up front"""
+    bg, icon = _CHAT_BUBBLE_STYLES.get(role, _CHAT_BUBBLE_STYLES["assistant"])
+    bubble = f'<div style="background: {bg}; padding: 1rem; margin: 0.5rem 0; border-radius: 10px;">{icon} {html.escape(content)}</div>'
+    return {"role": role, "content": content, "html": bubble}
 
+@st.fragment
 def show_ai_chat():
     """Show AI chat assistant"""
-    if st.session_state.language == "ml":
-        st.header("🤖 AI കൃഷി സഹായി")
-    else:
-        st.header("🤖 AI Farming Assistant")
+    L = _page_labels(st.session_state.language)
+    st.header(L["chat_header"])
     
     # Initialize chat history early
     if 'chat_history' not in st.session_state:
-        if st.session_state.language == "ml":
-            welcome_msg = "ഹലോ! ഞാൻ നിങ്ങളുടെ AI കൃഷി അസിസ്റ്റന്റ്. ഇന്ന് എങ്ങനെ സഹായിക്കാം?"
-        else:
-            welcome_msg = "Hello! I'm your AI farming assistant. How can I help you today?"
-        st.session_state.chat_history = [
-            {"role": "assistant", "content": welcome_msg}
-        ]
+        st.session_state.chat_history = deque(
+            [_chat_message("assistant", L["chat_welcome"])],
+            maxlen=CHAT_HISTORY_LIMIT
+        )
 
     # Use session language
     chat_language = "മലയാളം" if st.session_state.language == "ml" else "English"
     
     # Voice controls
+    sr, mic_recorder = _speech_modules()
     col1, col2, col3 = st.columns([2, 1, 1])
     with col3:
         voice_label = get_translation('voice_chat', st.session_state.language)
-        if MIC_AVAILABLE:
+        if mic_recorder is not None:
             audio = mic_recorder(start_prompt=f"🎤 {voice_label}", stop_prompt="⏹️ Stop", key="mic")
             if audio and 'bytes' in audio:
                 transcript = None
-                if STT_AVAILABLE:
+                if sr is not None:
                     try:
-                        recognizer = sr.Recognizer()
+                        # One recognizer per session instead of one per recording
+                        if 'sr_recognizer' not in st.session_state:
+                            st.session_state.sr_recognizer = sr.Recognizer()
+                        recognizer = st.session_state.sr_recognizer
                         with sr.AudioFile(io.BytesIO(audio['bytes'])) as source:
                             audio_data = recognizer.record(source)
                         # Prefer Malayalam if UI is Malayalam; fallback to English
@@ -933,51 +1493,19 @@ def show_ai_chat():
                     transcript = "[voice message]"
 
                 # Add user message
-                st.session_state.chat_history.append({"role": "user", "content": transcript})
+                st.session_state.chat_history.append(_chat_message("user", transcript))
                 st.caption(f"🎙️ Voice captured: {transcript}")
 
                 # Generate AI response immediately for voice input
                 lang_code = 'ml' if st.session_state.language == 'ml' else 'en'
-                user_lower = transcript.lower()
-                if any(word in user_lower for word in ['rice', 'paddy', 'നെല്ല്', 'വിത്ത്']):
-                    response = "നെല്ല് കൃഷിക്ക് ജൂൺ-ജൂലൈ മാസങ്ങളാണ് ഏറ്റവും നല്ല സമയം. നല്ല വിത്ത് ഉപയോഗിച്ച് 20x15 സെ.മീ അകലത്തിൽ നടുക. വളം ആവശ്യത്തിന് ചേർക്കുക. ജലനിർമാണം ശ്രദ്ധിക്കുക." if lang_code == 'ml' else "For rice cultivation in Kerala, the best planting time is June-July. Use quality seeds with 20x15 cm spacing. Apply balanced fertilizer as per soil test recommendations. Maintain proper water management."
-                elif any(word in user_lower for word in ['coconut', 'തെങ്ങ്', 'നാളികേരം']):
-                    response = "തെങ്ങ് കൃഷിക്ക് മഴക്കാലമാണ് നല്ല സമയം. ഏഴ് മീറ്റർ അകലത്തിൽ നടുക. വാർഷികം 50 കിലോ ജൈവവളം ചേർക്കുക. ശരിയായ വാരിനീക്കൽ ഉറപ്പാക്കുക." if lang_code == 'ml' else "For coconut farming, monsoon season is ideal. Plant with 7-meter spacing. Apply 50kg organic manure annually. Ensure proper drainage and regular weeding."
-                elif any(word in user_lower for word in ['pepper', 'കുരുമുളക്']):
-                    response = "കുരുമുളക് കൃഷിക്ക് മേയ്-ജൂൺ മാസങ്ങളാണ് നല്ല സമയം. ജീവിത സ്റ്റാൻഡേർഡ് ഉപയോഗിക്കുക. വാർഷികം 10 കിലോ ജൈവവളം ചേർക്കുക. നല്ല വാരിനീക്കലും നിഴൽ മാനേജ്മെന്റും ഉറപ്പാക്കുക." if lang_code == 'ml' else "For pepper cultivation, May-June is the best season. Use live standards like silver oak. Apply 10kg organic manure per vine annually. Ensure good drainage and shade management (50-60%)."
-                elif any(word in user_lower for word in ['disease', 'pest', 'രോഗം', 'കീടം']):
-                    response = "രോഗങ്ങൾ തടയാൻ വയലിൽ വൃത്തിയും ശുചിത്വവും പാലിക്കുക. രോഗബാധിത ചെടികൾ നീക്കം ചെയ്യുക. സംയോജിത കീടനിയന്ത്രണം പാലിക്കുക. ആവശ്യമെങ്കിൽ കാർഷിക വിദഗ്ധനെ സമീപിക്കുക." if lang_code == 'ml' else "To prevent diseases, maintain field hygiene and remove infected plants. Use integrated pest management practices. Regular monitoring is essential. Consult agricultural experts when needed."
-                elif any(word in user_lower for word in ['weather', 'rain', 'monsoon', 'കാലാവസ്ഥ', 'മഴ']):
-                    response = "കേരള കർഷകർക്കുള്ള കാലാവസ്ഥ ഉപദേശം: ദൈനംദിന കാലാവസ്ഥ പ്രവചനം നിരീക്ഷിക്കുക. മഴ പ്രവചനത്തെ അടിസ്ഥാനമാക്കി പ്രവർത്തനങ്ങൾ ആസൂത്രണം ചെയ്യുക. മഴക്കാലത്ത് ഇൻപുട്ടുകൾക്ക് മൂടിയ സംഭരണം ഉപയോഗിക്കുക." if lang_code == 'ml' else "Weather advisory for Kerala farmers: Monitor daily weather forecasts. Plan activities based on rainfall predictions. Use covered storage for inputs during monsoon. Ensure proper field drainage during heavy rains."
-                # Government schemes responses
-                elif any(word in user_lower for word in ['scheme', 'schemes', 'subsidy', 'government', 'pm-kisan', 'pm kisan', 'pmkisan', 'pm-fasal', 'pm fasal', 'kisan credit', 'കേന്ദ്ര', 'സർക്കാർ', 'സബ്സിഡി', 'സ്കീം']):
-                    if lang_code == 'ml':
-                        response = (
-                            "സർക്കാർ സ്കീമുകളുടെ ചുരുക്കം:\n"
-                            "• PM-KISAN: വർഷത്തിൽ ₹6,000 നേരിട്ട് കർഷകരുടെ അക്കൗണ്ടിൽ.\n"
-                            "• PM Fasal Bima Yojana: വിള ഇൻഷുറൻസ് കുറഞ്ഞ പ്രീമിയത്തിൽ.\n"
-                            "• Kisan Credit Card (KCC): കുറഞ്ഞ പലിശയിൽ പ്രവർത്തി വായ്പ.\n"
-                            "• Kerala State Farming Subsidies: ജലസേചനം, ഡ്രിപ്പ്, പോളിഹൗസ്, യന്ത്രങ്ങൾ എന്നിവയ്ക്ക് സബ്സിഡികൾ.\n"
-                            "അപേക്ഷിക്കാനുള്ള മാർഗ്ഗം: Krishi Officer/അക്കർക്കൾ ഓഫീസിലോ https://pmkisan.gov.in/ / https://keralaagriculture.gov.in/ വഴി."
-                        )
-                    else:
-                        response = (
-                            "Summary of key government schemes:\n"
-                            "• PM-KISAN: ₹6,000 per year to eligible farmers (DBT).\n"
-                            "• PM Fasal Bima Yojana: Crop insurance with low premium.\n"
-                            "• Kisan Credit Card (KCC): Working capital at subsidized interest.\n"
-                            "• Kerala State Subsidies: Support for drip irrigation, polyhouse, farm machinery, etc.\n"
-                            "How to apply: Visit local Krishi office or portals https://pmkisan.gov.in/ and https://keralaagriculture.gov.in/."
-                        )
-                else:
-                    response = "നിങ്ങളുടെ ചോദ്യം മനസ്സിലായി. കൃഷിയുമായി ബന്ധപ്പെട്ട കൂടുതൽ വിവരങ്ങൾക്ക് പ്രാദേശിക കാർഷിക ഓഫീസറെ സമീപിക്കുക. കൃഷി സഖി എപ്പോഴും നിങ്ങളുടെ സഹായത്തിന് ഉണ്ട്!" if lang_code == 'ml' else "I understand your question. For specific farming advice in your area, consult local agricultural extension officers. Krishi Sakhi is always here to help!"
+                response = classify_and_reply(transcript, lang_code)
 
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
+                st.session_state.chat_history.append(_chat_message("assistant", response))
 
                 # Speak reply if enabled
                 try:
-                    if 'voice_assistant' in st.session_state and st.session_state.get('speak_replies'):
-                        ok, audio_bytes, mime = st.session_state.voice_assistant.speak_text(response, language=lang_code)
+                    if st.session_state.get('speak_replies'):
+                        ok, audio_bytes, mime = speak(response, lang_code)
                         if ok and audio_bytes:
                             st.session_state['pending_audio'] = {'bytes': audio_bytes, 'mime': mime}
                 except Exception:
@@ -987,9 +1515,9 @@ def show_ai_chat():
         else:
             if st.button(f"🎤 {voice_label}"):
                 try:
-                    recognized = st.session_state.voice_assistant.listen_for_speech()
+                    recognized = _voice().listen_for_speech()
                     if recognized:
-                        st.session_state.chat_history.append({"role": "user", "content": recognized})
+                        st.session_state.chat_history.append(_chat_message("user", recognized))
                         st.success(recognized)
                         st.rerun()
                 except Exception:
@@ -1002,183 +1530,93 @@ def show_ai_chat():
         speak_label = get_translation('speak_replies', st.session_state.language)
         speak_replies = st.toggle(speak_label, key="speak_replies")
     
-    # Display chat history
-    for message in st.session_state.chat_history:
-        if message["role"] == "user":
-            st.markdown(f'<div style="background: #E3F2FD; padding: 1rem; margin: 0.5rem 0; border-radius: 10px;">👤 {message["content"]}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div style="background: #E8F5E8; padding: 1rem; margin: 0.5rem 0; border-radius: 10px;">🤖 {message["content"]}</div>', unsafe_allow_html=True)
+    if len(st.session_state.chat_history) == CHAT_HISTORY_LIMIT:
+        st.caption("… earlier messages truncated …")
+
+    # Display chat history as one markdown element rather than one per message.
+    # Turns typed during this run are added to the same container below.
+    chat_container = st.container()
+    with chat_container:
+        st.markdown("".join(message["html"] for message in st.session_state.chat_history), unsafe_allow_html=True)
 
-    # If there is pending audio to play, render it once
-    if st.session_state.get('pending_audio'):
-        audio_payload = st.session_state.pop('pending_audio')
-        try:
-            st.audio(audio_payload.get('bytes'), format=audio_payload.get('mime'))
-        except Exception:
-            pass
-    
     # Chat input
-    if st.session_state.language == "ml":
-        placeholder = "നിങ്ങളുടെ കൃഷി ചോദ്യം ഇവിടെ ടൈപ്പ് ചെയ്യുക..."
-    else:
-        placeholder = "Type your farming question here..."
-    user_input = st.chat_input(placeholder)
+    user_input = st.chat_input(L["chat_placeholder"])
     
     if user_input:
         # Add user message
-        st.session_state.chat_history.append({"role": "user", "content": user_input})
+        user_message = _chat_message("user", user_input)
+        st.session_state.chat_history.append(user_message)
         
         # Get AI response
         lang_code = "ml" if chat_language == "മലയാളം" else "en"
         
-        # Enhanced AI responses based on keywords
-        user_lower = user_input.lower()
-        
-        # Rice farming responses
-        if any(word in user_lower for word in ['rice', 'paddy', 'നെല്ല്', 'വിത്ത്']):
-            if lang_code == "ml":
-                response = "നെല്ല് കൃഷിക്ക് ജൂൺ-ജൂലൈ മാസങ്ങളാണ് ഏറ്റവും നല്ല സമയം. നല്ല വിത്ത് ഉപയോഗിച്ച് 20x15 സെ.മീ അകലത്തിൽ നടുക. വളം ആവശ്യത്തിന് ചേർക്കുക. ജലനിർമാണം ശ്രദ്ധിക്കുക."
-            else:
-                response = "For rice cultivation in Kerala, the best planting time is June-July. Use quality seeds with 20x15 cm spacing. Apply balanced fertilizer as per soil test recommendations. Maintain proper water management."
-        
-        # Coconut farming responses
-        elif any(word in user_lower for word in ['coconut', 'തെങ്ങ്', 'നാളികേരം']):
-            if lang_code == "ml":
-                response = "തെങ്ങ് കൃഷിക്ക് മഴക്കാലമാണ് നല്ല സമയം. ഏഴ് മീറ്റർ അകലത്തിൽ നടുക. വാർഷികം 50 കിലോ ജൈവവളം ചേർക്കുക. ശരിയായ വാരിനീക്കൽ ഉറപ്പാക്കുക."
-            else:
-                response = "For coconut farming, monsoon season is ideal. Plant with 7-meter spacing. Apply 50kg organic manure annually. Ensure proper drainage and regular weeding."
-        
-        # Pepper farming responses
-        elif any(word in user_lower for word in ['pepper', 'കുരുമുളക്', 'മരിച്ച']):
-            if lang_code == "ml":
-                response = "കുരുമുളക് കൃഷിക്ക് മേയ്-ജൂൺ മാസങ്ങളാണ് നല്ല സമയം. ജീവിത സ്റ്റാൻഡേർഡ് ഉപയോഗിക്കുക. വാർഷികം 10 കിലോ ജൈവവളം ചേർക്കുക. നല്ല വാരിനീക്കലും നിഴൽ മാനേജ്മെന്റും ഉറപ്പാക്കുക."
-            else:
-                response = "For pepper cultivation, May-June is the best season. Use live standards like silver oak. Apply 10kg organic manure per vine annually. Ensure good drainage and shade management (50-60%)."
-        
-        # Disease management responses
-        elif any(word in user_lower for word in ['disease', 'pest', 'രോഗം', 'കീടം']):
-            if lang_code == "ml":
-                response = "രോഗങ്ങൾ തടയാൻ വയലിൽ വൃത്തിയും ശുചിത്വവും പാലിക്കുക. രോഗബാധിത ചെടികൾ നീക്കം ചെയ്യുക. സംയോജിത കീടനിയന്ത്രണം പാലിക്കുക. ആവശ്യമെങ്കിൽ കാർഷിക വിദഗ്ധനെ സമീപിക്കുക."
-            else:
-                response = "To prevent diseases, maintain field hygiene and remove infected plants. Use integrated pest management practices. Regular monitoring is essential. Consult agricultural experts when needed."
-        
-        # Weather-related responses
-        elif any(word in user_lower for word in ['weather', 'rain', 'monsoon', 'കാലാവസ്ഥ', 'മഴ']):
-            if lang_code == "ml":
-                response = "കേരള കർഷകർക്കുള്ള കാലാവസ്ഥ ഉപദേശം: ദൈനംദിന കാലാവസ്ഥ പ്രവചനം നിരീക്ഷിക്കുക. മഴ പ്രവചനത്തെ അടിസ്ഥാനമാക്കി പ്രവർത്തനങ്ങൾ ആസൂത്രണം ചെയ്യുക. മഴക്കാലത്ത് ഇൻപുട്ടുകൾക്ക് മൂടിയ സംഭരണം ഉപയോഗിക്കുക."
-            else:
-                response = "Weather advisory for Kerala farmers: Monitor daily weather forecasts. Plan activities based on rainfall predictions. Use covered storage for inputs during monsoon. Ensure proper field drainage during heavy rains."
-        
-        # Government schemes responses
-        elif any(word in user_lower for word in ['scheme', 'schemes', 'subsidy', 'government', 'pm-kisan', 'pm kisan', 'pmkisan', 'pm-fasal', 'pm fasal', 'kisan credit', 'കേന്ദ്ര', 'സർക്കാർ', 'സബ്സിഡി', 'സ്കീം']):
-            if lang_code == 'ml':
-                response = (
-                    "സർക്കാർ സ്കീമുകളുടെ ചുരുക്കം:\n"
-                    "• PM-KISAN: വർഷത്തിൽ ₹6,000 നേരിട്ട് കർഷകരുടെ അക്കൗണ്ടിൽ.\n"
-                    "• PM Fasal Bima Yojana: വിള ഇൻഷുറൻസ് കുറഞ്ഞ പ്രീമിയത്തിൽ.\n"
-                    "• Kisan Credit Card (KCC): കുറഞ്ഞ പലിശയിൽ പ്രവർത്തി വായ്പ.\n"
-                    "• കേരള സർക്കാരിന്റെ സബ്സിഡികൾ: ഡ്രിപ്പ്, പോളിഹൗസ്, യന്ത്രങ്ങൾ മുതലായവ.\n"
-                    "അപേക്ഷ: Krishi Office / https://pmkisan.gov.in/ / https://keralaagriculture.gov.in/"
-                )
-            else:
-                response = (
-                    "Key government schemes:\n"
-                    "• PM-KISAN: ₹6,000 per year (DBT).\n"
-                    "• PM Fasal Bima Yojana: Low premium crop insurance.\n"
-                    "• Kisan Credit Card (KCC): Subsidized working capital.\n"
-                    "• Kerala subsidies: Drip irrigation, polyhouse, machinery support.\n"
-                    "Apply: Local Krishi office / https://pmkisan.gov.in/ / https://keralaagriculture.gov.in/"
-                )
-
-        # General farming advice
-        else:
-            if lang_code == "ml":
-                response = "നിങ്ങളുടെ ചോദ്യം മനസ്സിലായി. കൃഷിയുമായി ബന്ധപ്പെട്ട കൂടുതൽ വിവരങ്ങൾക്ക് പ്രാദേശിക കാർഷിക ഓഫീസറെ സമീപിക്കുക. കൃഷി സഖി എപ്പോഴും നിങ്ങളുടെ സഹായത്തിന് ഉണ്ട്!"
-            else:
-                response = "I understand your question. For specific farming advice in your area, I recommend consulting with local agricultural extension officers or experts. Krishi Sakhi is always here to help you!"
+        response = classify_and_reply(user_input, lang_code)
         
         # Add AI response
-        st.session_state.chat_history.append({"role": "assistant", "content": response})
+        reply_message = _chat_message("assistant", response)
+        st.session_state.chat_history.append(reply_message)
 
-        # Speak the reply if enabled and render audio
+        # Show the new turn in place instead of rerunning the whole script
+        with chat_container:
+            st.markdown(
+                user_message["html"] + reply_message["html"],
+                unsafe_allow_html=True
+            )
+
+        # Speak the reply if enabled
         try:
-            if 'voice_assistant' in st.session_state and st.session_state.get('speak_replies'):
+            if st.session_state.get('speak_replies'):
                 lang_code = 'ml' if st.session_state.language == 'ml' else 'en'
-                ok, audio_bytes, mime = st.session_state.voice_assistant.speak_text(response, language=lang_code)
+                ok, audio_bytes, mime = speak(response, lang_code)
                 if ok and audio_bytes:
-                    st.audio(audio_bytes, format=mime)
+                    st.session_state['pending_audio'] = {'bytes': audio_bytes, 'mime': mime}
+        except Exception:
+            pass
+
+    # Voice and typed replies both queue their audio here; play it once
+    if st.session_state.get('pending_audio'):
+        audio_payload = st.session_state.pop('pending_audio')
+        try:
+            st.audio(audio_payload.get('bytes'), format=audio_payload.get('mime'))
         except Exception:
             pass
-        st.rerun()
     
     # Quick questions
     st.subheader("💡 Quick Questions")
-    quick_questions = [
-        "What is the best time to plant rice?",
-        "How to control pests in coconut?",
-        "Fertilizer schedule for pepper?",
-        "Weather suitable for harvesting?",
-        "How to prevent diseases in crops?",
-        "Best irrigation methods for Kerala?"
-    ]
-    
-    if chat_language == "മലയാളം":
-        quick_questions = [
-            "നെല്ല് നടുന്നതിന് ഏറ്റവും നല്ല സമയം?",
-            "തെങ്ങിലെ കീടങ്ങളെ എങ്ങനെ നിയന്ത്രിക്കാം?",
-            "കുരുമുളകിന് വളം എപ്പോൾ ചേർക്കാം?",
-            "വിളവെടുപ്പിന് അനുകൂലമായ കാലാവസ്ഥ?",
-            "വിളകളിലെ രോഗങ്ങൾ എങ്ങനെ തടയാം?",
-            "കേരളത്തിന് ഏറ്റവും നല്ല ജലസേചന മാർഗ്ഗങ്ങൾ?"
-        ]
+    quick_questions = L["chat_quick_questions"]
     
     cols = st.columns(2)
     for i, question in enumerate(quick_questions):
         with cols[i % 2]:
             if st.button(question, key=f"q_{i}"):
-                st.session_state.chat_history.append({"role": "user", "content": question})
+                st.session_state.chat_history.append(_chat_message("user", question))
                 # Add mock response
                 response = "Great question! Let me help you with detailed information about this topic."
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
+                st.session_state.chat_history.append(_chat_message("assistant", response))
                 st.rerun()
 
+@st.fragment
 def show_knowledge_base():
     """Show knowledge base"""
-    if st.session_state.language == "ml":
-        st.header("📚 അറിവ് ശേഖരം")
-        search_placeholder = "വിളകൾ, രോഗങ്ങൾ, സ്കീമുകൾ തിരയുക..."
-    else:
-        st.header("📚 Knowledge Base")
-        search_placeholder = "Search for crops, diseases, schemes..."
+    L = _page_labels(st.session_state.language)
+    st.header(L["kb_header"])
     
     # Search
-    search_query = st.text_input("🔍 Search articles", placeholder=search_placeholder)
+    search_query = st.text_input("🔍 Search articles", placeholder=L["kb_search_placeholder"])
     
     # Categories
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if st.session_state.language == "ml":
-            button_text = "🌾 വിളകൾ"
-        else:
-            button_text = "🌾 Crops"
-        if st.button(button_text, use_container_width=True):
+        if st.button(L["kb_crops"], use_container_width=True):
             st.session_state.kb_category = "crops"
     
     with col2:
-        if st.session_state.language == "ml":
-            button_text = "🐛 രോഗങ്ങൾ & കീടങ്ങൾ"
-        else:
-            button_text = "🐛 Diseases & Pests"
-        if st.button(button_text, use_container_width=True):
+        if st.button(L["kb_diseases"], use_container_width=True):
             st.session_state.kb_category = "diseases"
     
     with col3:
-        if st.session_state.language == "ml":
-            button_text = "🏛️ സർക്കാർ സ്കീമുകൾ"
-        else:
-            button_text = "🏛️ Government Schemes"
-        if st.button(button_text, use_container_width=True):
+        if st.button(L["kb_schemes"], use_container_width=True):
             st.session_state.kb_category = "schemes"
     
     st.markdown("---")
@@ -1194,185 +1632,265 @@ def show_knowledge_base():
     elif st.session_state.kb_category == "schemes":
         show_scheme_articles()
 
+# Knowledge base crop guides
+_CROP_ARTICLES = (
+    {
+        "name": "Rice (നെല്ല്)",
+        "description": "Complete guide to rice cultivation in Kerala",
+        "seasons": "Kharif, Rabi, Summer",
+        "yield": "4-6 tons/hectare"
+    },
+    {
+        "name": "Coconut (തെങ്ങ്)",
+        "description": "Coconut farming practices and management",
+        "seasons": "Year-round",
+        "yield": "80-150 nuts/palm/year"
+    },
+    {
+        "name": "Black Pepper (കുരുമുളക്)",
+        "description": "Spice cultivation in Kerala conditions",
+        "seasons": "May-June planting",
+        "yield": "2-5 kg/vine"
+    }
+)
+
 def show_crop_articles():
     """Show crop-related articles"""
+    t = translations_for(st.session_state.language)
     st.subheader("🌾 Crop Cultivation Guides")
     
-    crops = [
-        {
-            "name": "Rice (നെല്ല്)",
-            "description": "Complete guide to rice cultivation in Kerala",
-            "seasons": "Kharif, Rabi, Summer",
-            "yield": "4-6 tons/hectare"
-        },
-        {
-            "name": "Coconut (തെങ്ങ്)",
-            "description": "Coconut farming practices and management",
-            "seasons": "Year-round",
-            "yield": "80-150 nuts/palm/year"
-        },
-        {
-            "name": "Black Pepper (കുരുമുളക്)",
-            "description": "Spice cultivation in Kerala conditions",
-            "seasons": "May-June planting",
-            "yield": "2-5 kg/vine"
-        }
-    ]
-    
-    for crop in crops:
+    for crop in _CROP_ARTICLES:
         with st.expander(f"📖 {crop['name']}"):
             col1, col2 = st.columns(2)
             with col1:
-                st.write(f"**{get_translation('description', st.session_state.language)}:** {crop['description']}")
-                st.write(f"**{get_translation('farming_advisory', st.session_state.language)}:** {crop['seasons']}")
+                st.write(f"**{t['description']}:** {crop['description']}")
+                st.write(f"**{t['farming_advisory']}:** {crop['seasons']}")
             with col2:
-                st.write(f"**{get_translation('harvest_time', st.session_state.language)}:** {crop['yield']}")
-                if st.button(f"📖 {get_translation('read_full_guide', st.session_state.language)}", key=f"crop_{crop['name']}"):
-                    # Speak the crop guide in selected language
-                    if 'voice_assistant' in st.session_state:
-                        lang_code = 'ml' if st.session_state.language == 'ml' else 'en'
-                        text = f"{crop['name']}. {crop['description']}. {crop['seasons']}. {crop['yield']}"
-                        ok, audio_bytes, mime = st.session_state.voice_assistant.speak_text(text, language=lang_code)
-                        if ok and audio_bytes:
-                            st.audio(audio_bytes, format=mime)
+                st.write(f"**{t['harvest_time']}:** {crop['yield']}")
+                # Speak the crop guide in selected language
+                lang_code = 'ml' if st.session_state.language == 'ml' else 'en'
+                text = f"{crop['name']}. {crop['description']}. {crop['seasons']}. {crop['yield']}"
+                _guide_audio_button(f"📖 {t['read_full_guide']}", f"crop_{crop['name']}", text, lang_code)
+
+# Knowledge base disease guides
+_DISEASE_ARTICLES = (
+    {
+        "name": "Rice Blast Disease",
+        "crops": "Rice",
+        "symptoms": "Diamond-shaped lesions on leaves",
+        "treatment": "Fungicide application"
+    },
+    {
+        "name": "Coconut Leaf Rot",
+        "crops": "Coconut",
+        "symptoms": "Yellow to brown leaf spots",
+        "treatment": "Copper fungicide spray"
+    }
+)
 
 def show_disease_articles():
     """Show disease-related articles"""
+    t = translations_for(st.session_state.language)
     st.subheader("🐛 Disease & Pest Management")
     
-    diseases = [
-        {
-            "name": "Rice Blast Disease",
-            "crops": "Rice",
-            "symptoms": "Diamond-shaped lesions on leaves",
-            "treatment": "Fungicide application"
-        },
-        {
-            "name": "Coconut Leaf Rot",
-            "crops": "Coconut",
-            "symptoms": "Yellow to brown leaf spots",
-            "treatment": "Copper fungicide spray"
-        }
-    ]
-    
-    for disease in diseases:
+    for disease in _DISEASE_ARTICLES:
         with st.expander(f"🔬 {disease['name']}"):
             col1, col2 = st.columns(2)
             with col1:
-                st.write(f"**{get_translation('label_crop', st.session_state.language)}:** {disease['crops']}")
-                st.write(f"**{get_translation('symptoms_label', st.session_state.language)}:** {disease['symptoms']}")
+                st.write(f"**{t['label_crop']}:** {disease['crops']}")
+                st.write(f"**{t['symptoms_label']}:** {disease['symptoms']}")
             with col2:
-                st.write(f"**{get_translation('treatment_label', st.session_state.language)}:** {disease['treatment']}")
-                if st.button(f"📖 {get_translation('read_full_guide', st.session_state.language)}", key=f"disease_{disease['name']}"):
-                    if 'voice_assistant' in st.session_state:
-                        lang_code = 'ml' if st.session_state.language == 'ml' else 'en'
-                        text = f"{disease['name']}. {disease['symptoms']}. {disease['treatment']}"
-                        ok, audio_bytes, mime = st.session_state.voice_assistant.speak_text(text, language=lang_code)
-                        if ok and audio_bytes:
-                            st.audio(audio_bytes, format=mime)
+                st.write(f"**{t['treatment_label']}:** {disease['treatment']}")
+                lang_code = 'ml' if st.session_state.language == 'ml' else 'en'
+                text = f"{disease['name']}. {disease['symptoms']}. {disease['treatment']}"
+                _guide_audio_button(f"📖 {t['read_full_guide']}", f"disease_{disease['name']}", text, lang_code)
+
+# Knowledge base government schemes
+_SCHEME_ARTICLES = (
+    {
+        "name": "Kisan Credit Card",
+        "description": "Credit facility for farmers",
+        "eligibility": "All farmers with cultivable land",
+        "benefits": "Low interest loans"
+    },
+    {
+        "name": "PM-KISAN Scheme",
+        "description": "Income support scheme",
+        "eligibility": "Small and marginal farmers",
+        "benefits": "₹6,000 per year"
+    }
+)
 
 def show_scheme_articles():
     """Show government scheme articles"""
+    t = translations_for(st.session_state.language)
     st.subheader("🏛️ Government Schemes for Farmers")
     
-    schemes = [
-        {
-            "name": "Kisan Credit Card",
-            "description": "Credit facility for farmers",
-            "eligibility": "All farmers with cultivable land",
-            "benefits": "Low interest loans"
-        },
-        {
-            "name": "PM-KISAN Scheme",
-            "description": "Income support scheme",
-            "eligibility": "Small and marginal farmers",
-            "benefits": "₹6,000 per year"
-        }
-    ]
-    
-    for scheme in schemes:
+    for scheme in _SCHEME_ARTICLES:
         with st.expander(f"💰 {scheme['name']}"):
-            st.write(f"**{get_translation('description', st.session_state.language)}:** {scheme['description']}")
-            st.write(f"**Eligibility:** {scheme['eligibility']}")
-            st.write(f"**Benefits:** {scheme['benefits']}")
+            st.markdown(
+                f"**{t['description']}:** {scheme['description']}  \n"
+                f"**Eligibility:** {scheme['eligibility']}  \n"
+                f"**Benefits:** {scheme['benefits']}"
+            )
             st.button(f"Apply Now", key=f"scheme_{scheme['name']}")
 
+# Mock regional statistics for the community charts
+_DISEASE_CHART_DATA = {
+    "Disease": ("Blast Disease", "Brown Spot", "Leaf Rot", "Anthracnose"),
+    "Reports": (15, 8, 12, 5)
+}
+_CROP_CHART_DATA = {
+    "Crop": ("Rice", "Coconut", "Pepper", "Cardamom", "Others"),
+    "Farmers": (150, 120, 80, 45, 60)
+}
+
+@st.cache_data(show_spinner=False)
+def _disease_reports_pie(language):
+    """Build the community page's disease distribution pie chart"""
+    import plotly.express as px
+    fig = px.pie(_DISEASE_CHART_DATA, values="Reports", names="Disease",
+                 title=get_translation('disease_reports_title', language))
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _farmers_by_crop_bar(language):
+    """Build the community page's farmers-per-crop bar chart"""
+    import plotly.express as px
+    return px.bar(_CROP_CHART_DATA, x="Crop", y="Farmers", title=get_translation('farmers_by_crop', language),
+                  color="Farmers", color_continuous_scale="Greens")
+
+# Mock community alerts, with the border color for their type
+_COMMUNITY_ALERTS = (
+    {
+        "type": "disease",
+        "color": "#FF5722",
+        "title": "Blast Disease Alert - Kottayam",
+        "description": "Multiple reports of blast disease in rice crops",
+        "affected_farms": 12,
+        "date": "2024-01-15"
+    },
+    {
+        "type": "pest",
+        "color": "#FF9800",
+        "title": "Brown Planthopper - Alappuzha",
+        "description": "Increased hopper activity reported",
+        "affected_farms": 8,
+        "date": "2024-01-14"
+    }
+)
+_ALERT_TPL = """
+        <div style="border-left: 4px solid {color}; padding: 1rem; margin: 1rem 0; background: #FFF3E0;">
+            <h4>🚨 {title}</h4>
+            <p>{description}</p>
+            <p><strong>{affected_farms_label}:</strong> {affected_farms} | <strong>{date_label}:</strong> {date}</p>
+        </div>
+        """
+
+@st.fragment
 def show_community_page():
     """Show community page"""
-    st.header(f"👥 {get_translation('community_dashboard', st.session_state.language)}")
+    t = translations_for(st.session_state.language)
+    st.header(f"👥 {t['community_dashboard']}")
     
     # Community alerts
-    st.subheader(f"⚠️ {get_translation('community_alerts', st.session_state.language)}")
-    
-    alerts = [
-        {
-            "type": "disease",
-            "title": "Blast Disease Alert - Kottayam",
-            "description": "Multiple reports of blast disease in rice crops",
-            "affected_farms": 12,
-            "date": "2024-01-15"
-        },
-        {
-            "type": "pest",
-            "title": "Brown Planthopper - Alappuzha",
-            "description": "Increased hopper activity reported",
-            "affected_farms": 8,
-            "date": "2024-01-14"
-        }
-    ]
+    st.subheader(f"⚠️ {t['community_alerts']}")
     
-    for alert in alerts:
-        alert_color = "#FF5722" if alert['type'] == "disease" else "#FF9800"
-        st.markdown(f"""
-        <div style=\"border-left: 4px solid {alert_color}; padding: 1rem; margin: 1rem 0; background: #FFF3E0;\">
-            <h4>🚨 {alert['title']}</h4>
-            <p>{alert['description']}</p>
-            <p><strong>{get_translation('affected_farms', st.session_state.language)}:</strong> {alert['affected_farms']} | <strong>{get_translation('date', st.session_state.language)}:</strong> {alert['date']}</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # All alerts in one markdown element
+    labels = {"affected_farms_label": t['affected_farms'], "date_label": t['date']}
+    st.markdown(
+        "".join(_ALERT_TPL.format_map({**alert, **labels}) for alert in _COMMUNITY_ALERTS),
+        unsafe_allow_html=True
+    )
     
     st.markdown("---")
     
     # Regional statistics
-    st.subheader(f"📊 {get_translation('regional_stats', st.session_state.language)}")
+    st.subheader(f"📊 {t['regional_stats']}")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Disease distribution
-        disease_data = {
-            "Disease": ["Blast Disease", "Brown Spot", "Leaf Rot", "Anthracnose"],
-            "Reports": [15, 8, 12, 5]
-        }
-        title = get_translation('disease_reports_title', st.session_state.language)
-        fig = px.pie(disease_data, values="Reports", names="Disease", title=title)
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig, width='stretch')
+        st.plotly_chart(_disease_reports_pie(st.session_state.language), width='stretch')
     
     with col2:
         # Crop distribution
-        crop_data = {
-            "Crop": ["Rice", "Coconut", "Pepper", "Cardamom", "Others"],
-            "Farmers": [150, 120, 80, 45, 60]
-        }
-        title = get_translation('farmers_by_crop', st.session_state.language)
-        fig = px.bar(crop_data, x="Crop", y="Farmers", title=title,
-                    color="Farmers", color_continuous_scale="Greens")
-        st.plotly_chart(fig, width='stretch')
+        st.plotly_chart(_farmers_by_crop_bar(st.session_state.language), width='stretch')
     
     # Discussion forum (placeholder)
-    st.subheader(f"💬 {get_translation('discussion_forum', st.session_state.language)}")
-    st.info(f"🚧 {get_translation('forum_placeholder', st.session_state.language)}")
+    st.subheader(f"💬 {t['discussion_forum']}")
+    st.info(f"🚧 {t['forum_placeholder']}")
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _activity_trend_line(start, end):
+    """Build the reports page's daily activities chart for the selected period"""
+    import plotly.express as px
+    days = (end - start).days + 1 if end >= start else 30
+    dates = np.datetime64(start, 'D') + np.arange(days).astype('timedelta64[D]')
+    # Seeded by the period so the mock series holds still across reruns
+    activity_counts = np.random.default_rng((start.toordinal(), end.toordinal())).integers(0, 6, days)
+    
+    fig = px.line(x=dates, y=activity_counts, title="Daily Activities")
+    fig.update_xaxes(title="Date")
+    fig.update_yaxes(title="Number of Activities")
+    return fig
+
+# Mock cost breakdown for the reports page
+_COST_CATEGORIES = ("Seeds", "Fertilizer", "Pesticides", "Labor", "Equipment")
+_COST_AMOUNTS = (4500, 8900, 3200, 6800, 2200)
+
+@st.cache_data(show_spinner=False)
+def _cost_pie():
+    """Build the reports page's cost distribution pie chart"""
+    import plotly.express as px
+    return px.pie(values=list(_COST_AMOUNTS), names=list(_COST_CATEGORIES), title="Cost Distribution")
+
+# Rows encoded per CSV export chunk
+CSV_CHUNK_ROWS = 1000
+
+def _csv_bytes(df, chunk_rows=CSV_CHUNK_ROWS):
+    """Encode a DataFrame as UTF-8 CSV a chunk of rows at a time.
 
+    Writing straight into one bytes buffer avoids holding the whole CSV as
+    text and again as its encoded copy.
+    """
+    buffer = io.BytesIO()
+    # Always one pass, so an empty frame still gets its header row
+    for start in range(0, max(len(df), 1), chunk_rows):
+        df.iloc[start:start + chunk_rows].to_csv(buffer, index=False, header=start == 0, encoding="utf-8")
+    return buffer.getvalue()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _report_frame(day):
+    """Build the detailed activity report ending on day, with its CSV export"""
+    import pandas as pd
+    # Mock data for table
+    report_data = {
+        "Date": pd.date_range(end=day, periods=10)[::-1].strftime('%Y-%m-%d'),
+        "Farm": ["Green Valley"] * 10,
+        "Activity": ["Sowing", "Watering", "Fertilizing"] * 3 + ["Weeding"],
+        "Crop": ["Rice", "Coconut", "Pepper"] * 3 + ["Rice"],
+        "Cost": [500, 200, 800, 450, 300, 600, 750, 400, 350, 250]
+    }
+    df = pd.DataFrame(report_data)
+    return df, _csv_bytes(df)
+
+@st.fragment
 def show_reports_page():
     """Show reports and analytics page"""
+    now = datetime.now()
     st.header("📈 Reports & Analytics")
     
     # Time period selection
+    # A form so picking both ends of the range reruns once, on Apply
     col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
-        date_range = st.date_input("Select Period", 
-            [datetime.now() - timedelta(days=90), datetime.now()])
+        with st.form("report_period"):
+            date_range = st.date_input("Select Period", 
+                [now - timedelta(days=90), now])
+            st.form_submit_button("Apply")
     
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -1394,51 +1912,51 @@ def show_reports_page():
     with col1:
         # Activity trends
         st.subheader("📅 Activity Trends")
-        dates = pd.date_range(start=datetime.now() - timedelta(days=30), periods=30)
-        activity_counts = [random.randint(0, 5) for _ in range(30)]
-        
-        fig = px.line(x=dates, y=activity_counts, title="Daily Activities")
-        fig.update_xaxes(title="Date")
-        fig.update_yaxes(title="Number of Activities")
-        st.plotly_chart(fig, width='stretch')
+        # The picker returns a single date while the second end is being chosen
+        if len(date_range) == 2:
+            period_start, period_end = date_range
+        else:
+            period_start, period_end = now.date() - timedelta(days=29), now.date()
+        st.plotly_chart(_activity_trend_line(period_start, period_end), width='stretch')
     
     with col2:
         # Cost analysis
         st.subheader("💰 Cost Analysis")
-        categories = ["Seeds", "Fertilizer", "Pesticides", "Labor", "Equipment"]
-        costs = [4500, 8900, 3200, 6800, 2200]
-        
-        fig = px.pie(values=costs, names=categories, title="Cost Distribution")
-        st.plotly_chart(fig, width='stretch')
+        st.plotly_chart(_cost_pie(), width='stretch')
     
     # Detailed table
     st.subheader("📋 Detailed Activity Report")
     
-    # Mock data for table
-    report_data = {
-        "Date": [datetime.now() - timedelta(days=i) for i in range(10)],
-        "Farm": ["Green Valley"] * 10,
-        "Activity": ["Sowing", "Watering", "Fertilizing"] * 3 + ["Weeding"],
-        "Crop": ["Rice", "Coconut", "Pepper"] * 3 + ["Rice"],
-        "Cost": [500, 200, 800, 450, 300, 600, 750, 400, 350, 250]
-    }
-    
-    df = pd.DataFrame(report_data)
-    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-    
+    df, csv = _report_frame(now.date())
     st.dataframe(df, width='stretch')
     
-    # Export functionality
-    if st.button("📥 Export Report (CSV)"):
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name="farming_report.csv",
-            mime="text/csv"
-        )
+    # Export functionality; the CSV is already built, so offer it directly
+    st.download_button(
+        label="📥 Export Report (CSV)",
+        data=csv,
+        file_name="farming_report.csv",
+        mime="text/csv"
+    )
 
 # Sidebar navigation
+_MENU_ITEMS = (
+    ("dashboard", "🏠 Dashboard", "ഡാഷ്ബോർഡ്"),
+    ("farms", "🏡 My Farms", "എന്റെ കൃഷിയിടങ്ങൾ"),
+    ("activities", "📅 Activities", "പ്രവർത്തനങ്ങൾ"),
+    ("disease_detection", "🔬 Disease Detection", "രോഗ നിർണയം"),
+    ("weather", "🌤️ Weather", "കാലാവസ്ഥ"),
+    ("ai_chat", "🤖 AI Assistant", "AI സഹായി"),
+    ("knowledge", "📚 Knowledge Base", "അറിവ് ശേഖരം"),
+    ("community", "👥 Community", "കമ്മ്യൂണിറ്റി"),
+    ("reports", "📈 Reports", "റിപ്പോർട്ടുകൾ")
+)
+_MENU_PAGE_IDS = tuple(page_id for page_id, _, _ in _MENU_ITEMS)
+# Page id -> menu label per language, resolved once at import
+_MENU_LABELS = {
+    "en": {page_id: en_label for page_id, en_label, _ in _MENU_ITEMS},
+    "ml": {page_id: ml_label for page_id, _, ml_label in _MENU_ITEMS}
+}
+
 def show_sidebar():
     """Show sidebar navigation"""
     st.sidebar.markdown("## 🌾 Krishi Sakhi")
@@ -1462,62 +1980,52 @@ def show_sidebar():
         
         st.sidebar.markdown("---")
         
-        # Navigation menu
-        menu_items = [
-            ("dashboard", "🏠 Dashboard", "ഡാഷ്ബോർഡ്"),
-            ("farms", "🏡 My Farms", "എന്റെ കൃഷിയിടങ്ങൾ"),
-            ("activities", "📅 Activities", "പ്രവർത്തനങ്ങൾ"),
-            ("disease_detection", "🔬 Disease Detection", "രോഗ നിർണയം"),
-            ("weather", "🌤️ Weather", "കാലാവസ്ഥ"),
-            ("ai_chat", "🤖 AI Assistant", "AI സഹായി"),
-            ("knowledge", "📚 Knowledge Base", "അറിവ് ശേഖരം"),
-            ("community", "👥 Community", "കമ്മ്യൂണിറ്റി"),
-            ("reports", "📈 Reports", "റിപ്പോർട്ടുകൾ")
-        ]
-        
-        for page_id, en_label, ml_label in menu_items:
-            label = ml_label if st.session_state.language == "ml" else en_label
-            if st.sidebar.button(label, key=page_id, use_container_width=True):
-                st.session_state.current_page = page_id
-                st.rerun()
+        # Navigation menu: one radio widget; picking a page reruns by itself
+        menu_labels = _MENU_LABELS.get(st.session_state.language, _MENU_LABELS["en"])
+        current = st.session_state.current_page
+        st.session_state.current_page = st.sidebar.radio(
+            "Navigate",
+            _MENU_PAGE_IDS,
+            index=_MENU_PAGE_IDS.index(current) if current in menu_labels else 0,
+            format_func=menu_labels.__getitem__,
+            label_visibility="collapsed"
+        )
         
         st.sidebar.markdown("---")
         
         if st.sidebar.button("🔓 Logout", use_container_width=True):
+            # The token is still needed to post anything left in the batch
+            flush_pending_activities()
             st.session_state.authenticated = False
             st.session_state.access_token = None
             st.session_state.farmer_data = None
             st.rerun()
 
 # Main application
+_ROUTES = {
+    "dashboard": show_dashboard,
+    "farms": show_farms_page,
+    "activities": show_activities_page,
+    "disease_detection": show_disease_detection,
+    "weather": show_weather_page,
+    "ai_chat": show_ai_chat,
+    "knowledge": show_knowledge_base,
+    "community": show_community_page,
+    "reports": show_reports_page
+}
+
 def main():
     """Main application function"""
+    # Fragment reruns skip main(), so this runs on navigation, login/logout and
+    # reloads: a queued activity is never left behind by switching pages
+    flush_pending_activities()
     show_sidebar()
     
     if not st.session_state.authenticated:
         show_login_page()
     else:
         # Route to appropriate page
-        if st.session_state.current_page == "dashboard":
-            show_dashboard()
-        elif st.session_state.current_page == "farms":
-            show_farms_page()
-        elif st.session_state.current_page == "activities":
-            show_activities_page()
-        elif st.session_state.current_page == "disease_detection":
-            show_disease_detection()
-        elif st.session_state.current_page == "weather":
-            show_weather_page()
-        elif st.session_state.current_page == "ai_chat":
-            show_ai_chat()
-        elif st.session_state.current_page == "knowledge":
-            show_knowledge_base()
-        elif st.session_state.current_page == "community":
-            show_community_page()
-        elif st.session_state.current_page == "reports":
-            show_reports_page()
-        else:
-            show_dashboard()
+        _ROUTES.get(st.session_state.current_page, show_dashboard)()
 
 if __name__ == "__main__":
     main()
@@ -3,96 +3,106 @@ Crop image samples for Krishi Sakhi
 Provides sample data for crop diseases and treatments
 """
 
+from types import MappingProxyType
+
 # Sample crop disease information
-CROP_DISEASES = {
+CROP_DISEASES = MappingProxyType({
     "Rice": {
         "Blast Disease": {
-            "symptoms": [
+            "symptoms": (
                 "Diamond-shaped lesions on leaves",
                 "Grayish-white centers with dark borders",
                 "Neck rot causing panicle breakage"
-            ],
-            "treatment": [
+            ),
+            "treatment": (
                 "Apply Tricyclazole fungicide",
                 "Use resistant varieties",
                 "Improve field drainage"
-            ],
-            "prevention": [
+            ),
+            "prevention": (
                 "Avoid excessive nitrogen application",
                 "Maintain proper water management",
                 "Use disease-free seeds"
-            ]
+            )
         },
         "Brown Spot": {
-            "symptoms": [
+            "symptoms": (
                 "Small brown spots on leaves",
                 "Circular to oval lesions",
                 "Seedling blight in severe cases"
-            ],
-            "treatment": [
+            ),
+            "treatment": (
                 "Apply Mancozeb fungicide",
                 "Remove infected plant debris",
                 "Improve soil fertility"
-            ],
-            "prevention": [
+            ),
+            "prevention": (
                 "Use certified seeds",
                 "Maintain balanced nutrition",
                 "Avoid water stress"
-            ]
+            )
         }
     },
     "Coconut": {
         "Leaf Rot": {
-            "symptoms": [
+            "symptoms": (
                 "Yellow to brown leaf spots",
                 "Wilting of affected leaves",
                 "Premature leaf fall"
-            ],
-            "treatment": [
+            ),
+            "treatment": (
                 "Apply Copper fungicide",
                 "Remove affected leaves",
                 "Improve air circulation"
-            ],
-            "prevention": [
+            ),
+            "prevention": (
                 "Avoid overhead irrigation",
                 "Maintain proper spacing",
                 "Regular sanitation"
-            ]
+            )
         }
     },
     "Pepper": {
         "Anthracnose": {
-            "symptoms": [
+            "symptoms": (
                 "Dark sunken lesions on fruits",
                 "Leaf spots with yellow halos",
                 "Stem cankers"
-            ],
-            "treatment": [
+            ),
+            "treatment": (
                 "Apply Carbendazim fungicide",
                 "Prune affected parts",
                 "Improve ventilation"
-            ],
-            "prevention": [
+            ),
+            "prevention": (
                 "Use resistant varieties",
                 "Avoid water splash",
                 "Regular field inspection"
-            ]
+            )
         }
     }
+})
+
+# Flat lookup tables built once from CROP_DISEASES
+_DISEASE_INFO = {
+    (crop, disease): info for crop, diseases in CROP_DISEASES.items() for disease, info in diseases.items()
 }
+_CROPS = tuple(CROP_DISEASES)
+_DISEASES_BY_CROP = {crop: tuple(diseases) for crop, diseases in CROP_DISEASES.items()}
+_DEFAULT_DISEASE_INFO = MappingProxyType({
+    "symptoms": ("Consult agricultural expert",),
+    "treatment": ("Seek professional advice",),
+    "prevention": ("Regular monitoring",)
+})
 
 def get_disease_info(crop, disease):
     """Get disease information for specific crop and disease"""
-    return CROP_DISEASES.get(crop, {}).get(disease, {
-        "symptoms": ["Consult agricultural expert"],
-        "treatment": ["Seek professional advice"],
-        "prevention": ["Regular monitoring"]
-    })
+    return _DISEASE_INFO.get((crop, disease), _DEFAULT_DISEASE_INFO)
 
 def get_available_crops():
-    """Get list of available crops"""
-    return list(CROP_DISEASES.keys())
+    """Get tuple of available crops"""
+    return _CROPS
 
 def get_crop_diseases(crop):
-    """Get diseases for specific crop"""
-    return list(CROP_DISEASES.get(crop, {}).keys())
\ No newline at end of file
+    """Get tuple of diseases for specific crop"""
+    return _DISEASES_BY_CROP.get(crop, ())
@@ -3,45 +3,292 @@ Krishi Sakhi Backend - FastAPI Application
 AI-Powered Farming Assistant for Kerala Farmers
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 import uvicorn
 from typing import List, Optional
 import sqlite3
+import queue
+import threading
 import json
 import os
-from datetime import datetime, timedelta, timezone
+import shutil
+import tempfile
 import hashlib
+import hmac
+import time
+from collections import OrderedDict
 import jwt
 from pydantic import BaseModel
 import asyncio
+import functools
+
+try:
+    import orjson  # noqa: F401 -- ORJSONResponse needs it at render time
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
 
 # Import our modules
 from models.database import init_db, get_db_connection
-from services.ai_service import AIService
+from services.ai_service import AIService, CHAT_ERROR_BODIES
 from services.weather_service import WeatherService
-from utils.translations import get_translation
+from utils.translations import get_translation, GOVERNMENT_SCHEMES, get_government_schemes_bytes, json_bytes
+from sample_data import load_sample_data
 
 # Initialize services
 ai_service = AIService()
 weather_service = WeatherService()
 security = HTTPBearer()
 
+# Applied to every connection. WAL lets reads run alongside a write and, with
+# synchronous=NORMAL, commits no longer fsync the main database file each time.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Match the predicates of the farm, activity, dashboard and community queries
+SQLITE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_farms_farmer ON farms(farmer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_activities_farm_date ON activities(farm_id, date DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_dd_created_farm ON disease_detections(created_at, farm_id)",
+    # Plain, not UNIQUE: older databases may already hold duplicate phones or emails
+    "CREATE INDEX IF NOT EXISTS idx_farmers_phone ON farmers(phone)",
+    "CREATE INDEX IF NOT EXISTS idx_farmers_email ON farmers(email)",
+)
+
+def ensure_indexes():
+    """Create the query indexes and let SQLite refresh stale planner statistics"""
+    conn = get_db_connection()
+    try:
+        for statement in SQLITE_INDEXES:
+            conn.execute(statement)
+        conn.commit()
+        # Only analyzes tables whose statistics are missing or out of date
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+# Daily per-location disease counts, kept current by a trigger so community
+# alerts read a small rollup instead of re-aggregating every detection
+SQLITE_ROLLUPS = (
+    """
+    CREATE TABLE IF NOT EXISTS disease_alerts_daily (
+        day TEXT NOT NULL,
+        location TEXT,
+        crop_name TEXT,
+        disease_name TEXT,
+        occurrences INTEGER NOT NULL DEFAULT 0,
+        confidence REAL,
+        last_seen TIMESTAMP,
+        UNIQUE (day, location, crop_name, disease_name)
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_dd_insert AFTER INSERT ON disease_detections
+    BEGIN
+        INSERT INTO disease_alerts_daily (day, location, crop_name, disease_name,
+                                          occurrences, confidence, last_seen)
+        SELECT date(NEW.created_at), f.location, NEW.crop_name, NEW.disease_name,
+               1, NEW.confidence, NEW.created_at
+        FROM farms f WHERE f.id = NEW.farm_id
+        ON CONFLICT (day, location, crop_name, disease_name) DO UPDATE SET
+            occurrences = occurrences + 1,
+            confidence = excluded.confidence,
+            last_seen = excluded.last_seen;
+    END
+    """,
+    # Backfill detections recorded before the rollup existed
+    """
+    INSERT INTO disease_alerts_daily (day, location, crop_name, disease_name,
+                                      occurrences, confidence, last_seen)
+    SELECT date(dd.created_at), f.location, dd.crop_name, dd.disease_name,
+           COUNT(*), dd.confidence, MAX(dd.created_at)
+    FROM disease_detections dd
+    JOIN farms f ON dd.farm_id = f.id
+    WHERE NOT EXISTS (SELECT 1 FROM disease_alerts_daily)
+    GROUP BY date(dd.created_at), f.location, dd.crop_name, dd.disease_name
+    """,
+)
+
+def ensure_rollups():
+    """Create the alert rollup table and its trigger, filling it on first run"""
+    conn = get_db_connection()
+    try:
+        with conn:
+            for statement in SQLITE_ROLLUPS:
+                conn.execute(statement)
+    finally:
+        conn.close()
+
+def seed_sample_data():
+    """Load the demo data into a fresh database"""
+    conn = get_db_connection()
+    try:
+        load_sample_data(conn)
+    finally:
+        conn.close()
+
+# Prepared statements kept per connection
+SQLITE_STATEMENT_CACHE = 256
+
+# Pooled read connections; writes share one connection
+DB_POOL_SIZE = 10
+
+class ConnectionPool:
+    """Long-lived SQLite connections shared by all requests.
+    
+    Reads check out one of several pooled connections. Writes go through a
+    single connection behind a lock, since SQLite allows one writer at a time
+    even in WAL mode.
+    """
+    
+    def __init__(self, size: int = DB_POOL_SIZE):
+        self._size = size
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+    
+    def open(self):
+        # get_db_connection knows where the database lives; reuse its file and
+        # row factory, but open connections that any worker thread may use
+        template = get_db_connection()
+        path = template.execute("PRAGMA database_list").fetchone()[2]
+        row_factory = template.row_factory
+        template.close()
+        
+        def connect():
+            conn = sqlite3.connect(path, check_same_thread=False,
+                                   cached_statements=SQLITE_STATEMENT_CACHE)
+            conn.row_factory = row_factory
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
+            return conn
+        
+        for _ in range(self._size):
+            self._readers.put(connect())
+        self._writer = connect()
+    
+    def close(self):
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    @contextmanager
+    def reader(self):
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    @contextmanager
+    def writer(self):
+        with self._write_lock:
+            try:
+                yield self._writer
+            finally:
+                # Never hand the next request a half-finished transaction
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+
+db_pool = ConnectionPool()
+
+def get_conn():
+    """Dependency: a pooled connection for reads"""
+    with db_pool.reader() as conn:
+        yield conn
+
+def get_write_conn():
+    """Dependency: the shared write connection, held for the whole request"""
+    with db_pool.writer() as conn:
+        yield conn
+
+# Endpoints that only touch the database are plain `def`, which FastAPI runs in
+# its threadpool. Async endpoints that also await other services hand their
+# blocking sqlite3 work to db_run so the event loop keeps serving requests.
+async def db_run(fn, *args):
+    return await asyncio.to_thread(fn, *args)
+
+def _farm_owner(farm_id: int) -> Optional[int]:
+    with db_pool.reader() as conn:
+        row = conn.execute(SQL_FARM_OWNER, (farm_id,)).fetchone()
+    return row[0] if row else None
+
+def _store_detection(detection: "DiseaseDetection", result: dict):
+    with db_pool.writer() as conn:
+        conn.execute(SQL_INSERT_DETECTION, (detection.farm_id, detection.crop_name, result['disease'], result['confidence'],
+                                            to_json_column(result['symptoms']), to_json_column(result['treatment']), detection.image_path))
+        conn.commit()
+    # A new detection can raise or change a community alert
+    _community_alerts_json.cache_clear()
+
+def ttl_cache(ttl: float, maxsize: int = 128):
+    """Memoize a function for ttl seconds, keeping at most maxsize results (LRU).
+    
+    The wrapper gains cache_clear() to drop everything and invalidate(*args)
+    to drop a single entry.
+    """
+    def decorator(fn):
+        entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        lock = threading.Lock()
+        
+        @functools.wraps(fn)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(args)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(args)
+                    return entry[1]
+            value = fn(*args)
+            with lock:
+                entries[args] = (now + ttl, value)
+                entries.move_to_end(args)
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return value
+        
+        def cache_clear():
+            with lock:
+                entries.clear()
+        
+        def invalidate(*args):
+            with lock:
+                entries.pop(args, None)
+        
+        wrapper.cache_clear = cache_clear
+        wrapper.invalidate = invalidate
+        return wrapper
+    return decorator
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     init_db()
+    ensure_indexes()
+    ensure_rollups()
+    seed_sample_data()
+    db_pool.open()
     yield
     # Shutdown
-    pass
+    db_pool.close()
 
 app = FastAPI(
     title="Krishi Sakhi API",
     description="AI-Powered Farming Assistant for Kerala Farmers",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 # CORS middleware
@@ -94,78 +341,232 @@ class ChatMessage(BaseModel):
     language: str = "en"
     farmer_id: Optional[int] = None
 
+# SQL statements. Kept as module constants so each handler passes the same
+# string object and the connection's statement cache reuses the prepared plan
+SQL_FARMER_EXISTS = "SELECT id FROM farmers WHERE phone = ? OR email = ?"
+
+SQL_INSERT_FARMER = """
+    INSERT INTO farmers (name, phone, email, password_hash, location, language)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SQL_FARMER_CREDENTIALS = """
+    SELECT id, password_hash FROM farmers WHERE phone = ?
+"""
+
+SQL_FARMER_BY_PHONE = "SELECT id FROM farmers WHERE phone = ?"
+
+SQL_FARMER_PROFILE = """
+    SELECT id, name, phone, email, location, language, created_at
+    FROM farmers WHERE id = ?
+"""
+
+SQL_INSERT_FARM = """
+    INSERT INTO farms (farmer_id, name, location, land_size, soil_type, irrigation_type, crop_types)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# List endpoints have SQLite build the whole JSON response body, so no
+# per-row Python objects are created or re-serialized
+SQL_FARMER_FARMS = """
+    SELECT json_group_array(json_object(
+        'id', id, 'name', name, 'location', location, 'land_size', land_size,
+        'soil_type', soil_type, 'irrigation_type', irrigation_type,
+        'crop_types', json(COALESCE(NULLIF(crop_types, ''), '[]')), 'created_at', created_at))
+    FROM farms WHERE farmer_id = ?
+"""
+
+SQL_FARM_OWNER = "SELECT farmer_id FROM farms WHERE id = ?"
+
+SQL_INSERT_ACTIVITY = """
+    INSERT INTO activities (farm_id, activity_type, description, date, crop_name, quantity, cost, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Inserts nothing unless the farm belongs to the farmer given by the last parameter
+SQL_INSERT_OWNED_ACTIVITY = """
+    INSERT INTO activities (farm_id, activity_type, description, date, crop_name, quantity, cost, notes)
+    SELECT ?, ?, ?, ?, ?, ?, ?, ?
+    WHERE EXISTS (SELECT 1 FROM farms WHERE id = ? AND farmer_id = ?)
+"""
+
+_ACTIVITIES_JSON = """
+    SELECT json_group_array(json_object(
+        'id', id, 'activity_type', activity_type, 'description', description, 'date', date,
+        'crop_name', crop_name, 'quantity', quantity, 'cost', cost, 'notes', notes,
+        'farm_name', farm_name))
+    FROM (
+        SELECT a.id, a.activity_type, a.description, a.date, a.crop_name, 
+               a.quantity, a.cost, a.notes, f.name as farm_name
+        FROM activities a
+        JOIN farms f ON a.farm_id = f.id
+        WHERE {where}
+        ORDER BY a.date DESC
+    )
+"""
+
+# Ownership flag and the activities in one round trip, so a farm the caller
+# doesn't own still gets a 403 rather than an empty list
+SQL_FARM_ACTIVITIES = f"""
+    SELECT EXISTS (SELECT 1 FROM farms WHERE id = :farm_id AND farmer_id = :farmer_id),
+           ({_ACTIVITIES_JSON.format(where="a.farm_id = :farm_id AND f.farmer_id = :farmer_id")})
+"""
+
+SQL_FARMER_ACTIVITIES = _ACTIVITIES_JSON.format(where="f.farmer_id = ?")
+
+SQL_INSERT_DETECTION = """
+    INSERT INTO disease_detections (farm_id, crop_name, disease_name, confidence, 
+                                  symptoms, treatment, image_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Reads the disease_alerts_daily rollup; confidence comes from the latest detection
+_ALERTS_JSON = """
+    SELECT json_group_array(json_object(
+        'disease', disease_name, 'confidence', confidence, 'crop', crop_name,
+        'location', location, 'date', created_at, 'occurrences', occurrences))
+    FROM (
+        SELECT disease_name, confidence, crop_name, location,
+               MAX(last_seen) as created_at, SUM(occurrences) as occurrences
+        FROM disease_alerts_daily
+        WHERE {where}day >= date('now', '-30 days')
+        GROUP BY disease_name, crop_name, location
+        HAVING SUM(occurrences) >= 2
+        ORDER BY occurrences DESC, created_at DESC
+    )
+"""
+
+SQL_LOCAL_ALERTS = _ALERTS_JSON.format(where="location LIKE ? AND ")
+
+SQL_RECENT_ALERTS = _ALERTS_JSON.format(where="")
+
+def to_json_column(value) -> str:
+    """Compact JSON text for list columns; SQLite's json() reads it back without Python"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+def json_rows_response(body: Optional[str]) -> Response:
+    """Pass a JSON array built by SQLite straight through as the response"""
+    return Response(content=body or "[]", media_type="application/json")
+
 # JWT utilities
-SECRET_KEY = "krishi-sakhi-secret-key-change-in-production"
+SECRET_KEY = os.getenv("KRISHI_SAKHI_SECRET_KEY", "krishi-sakhi-secret-key-change-in-production")
 ALGORITHM = "HS256"
 
+# Decoded tokens, so verify_token skips the signature check and base64 decode
+# for tokens it has already seen. Entries are dropped once the token expires.
+TOKEN_CACHE_SIZE = 4096
+
+class _TokenCache:
+    """LRU of token -> (farmer_id, exp timestamp)"""
+    
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, token: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            farmer_id, exp = entry
+            if exp <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return farmer_id
+    
+    def put(self, token: str, farmer_id: int, exp: float):
+        with self._lock:
+            self._entries[token] = (farmer_id, exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+_token_cache = _TokenCache()
+
+ACCESS_TOKEN_LIFETIME = 30 * 86400  # seconds
+
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=30)
-    to_encode.update({"exp": expire})
+    # Plain epoch seconds; PyJWT would otherwise convert a datetime per token
+    now = int(time.time())
+    to_encode.update({"iat": now, "exp": now + ACCESS_TOKEN_LIFETIME})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    farmer_id = _token_cache.get(token)
+    if farmer_id is not None:
+        return farmer_id
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         farmer_id_str = payload.get("sub")
         if farmer_id_str is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         farmer_id = int(farmer_id_str)
+        _token_cache.put(token, farmer_id, payload["exp"])
         return farmer_id
-    except (jwt.PyJWTError, ValueError) as e:
+    except (jwt.PyJWTError, ValueError, KeyError) as e:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+# scrypt from the standard library; stored as "scrypt$<salt>$<hash>" in hex
+SCRYPT_PARAMS = {"n": 2 ** 14, "r": 8, "p": 1}
+
 def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, **SCRYPT_PARAMS)
+    return f"scrypt${salt.hex()}${digest.hex()}"
+
+def verify_password(password: str, password_hash: str) -> bool:
+    password_bytes = password.encode()
+    if password_hash.startswith("scrypt$"):
+        # A malformed stored hash is a failed login, not a server error
+        try:
+            _, salt, expected = password_hash.split("$")
+            salt, expected = bytes.fromhex(salt), bytes.fromhex(expected)
+        except ValueError:
+            return False
+        digest = hashlib.scrypt(password_bytes, salt=salt, **SCRYPT_PARAMS)
+        return hmac.compare_digest(digest, expected)
+    # Accounts created before the switch still hold an unsalted SHA-256;
+    # hashlib already uses OpenSSL's hardware-accelerated implementation
+    legacy = hashlib.sha256(password_bytes).hexdigest()
+    return hmac.compare_digest(legacy, password_hash)
 
 # Auth endpoints
 @app.post("/api/auth/register")
-async def register(farmer: FarmerCreate):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Check if farmer exists
-    cursor.execute("SELECT id FROM farmers WHERE phone = ? OR email = ?", 
-                   (farmer.phone, farmer.email))
-    if cursor.fetchone():
-        conn.close()
-        raise HTTPException(status_code=400, detail="Farmer already exists")
-    
-    # Create farmer
+def register(farmer: FarmerCreate):
+    # Hash before taking the write connection so other writes don't wait on scrypt
     hashed_password = hash_password(farmer.password)
-    cursor.execute("""
-        INSERT INTO farmers (name, phone, email, password_hash, location, language)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (farmer.name, farmer.phone, farmer.email, hashed_password, 
-          farmer.location, farmer.language))
     
-    farmer_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with db_pool.writer() as conn:
+        cursor = conn.cursor()
+        
+        # Check if farmer exists
+        cursor.execute(SQL_FARMER_EXISTS, (farmer.phone, farmer.email))
+        if cursor.fetchone():
+            raise HTTPException(status_code=400, detail="Farmer already exists")
+        
+        # Create farmer
+        cursor.execute(SQL_INSERT_FARMER, (farmer.name, farmer.phone, farmer.email, hashed_password, 
+                                           farmer.location, farmer.language))
+        
+        farmer_id = cursor.lastrowid
+        conn.commit()
     
     token = create_access_token({"sub": str(farmer_id)})
     return {"access_token": token, "token_type": "bearer", "farmer_id": farmer_id}
 
 @app.post("/api/auth/login")
-async def login(credentials: FarmerLogin):
-    conn = get_db_connection()
+def login(credentials: FarmerLogin, conn: sqlite3.Connection = Depends(get_conn)):
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT id, password_hash FROM farmers WHERE phone = ?
-    """, (credentials.phone,))
+    cursor.execute(SQL_FARMER_CREDENTIALS, (credentials.phone,))
     
     farmer = cursor.fetchone()
-    conn.close()
-    
-    if not farmer or hash_password(credentials.password) != farmer[1]:
-        # For demo purposes, allow any password
-        cursor = get_db_connection().cursor()
-        cursor.execute("SELECT id FROM farmers WHERE phone = ?", (credentials.phone,))
-        demo_farmer = cursor.fetchone()
-        if demo_farmer:
-            token = create_access_token({"sub": str(demo_farmer[0])})
-            return {"access_token": token, "token_type": "bearer", "farmer_id": demo_farmer[0]}
+    
+    if not farmer or not verify_password(credentials.password, farmer[1]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_access_token({"sub": str(farmer[0])})
@@ -173,43 +574,33 @@ async def login(credentials: FarmerLogin):
 
 # Demo login endpoint
 @app.post("/api/auth/demo-login")
-async def demo_login():
-    conn = get_db_connection()
+def demo_login(conn: sqlite3.Connection = Depends(get_write_conn)):
     cursor = conn.cursor()
     
     # Create demo farmer if not exists
-    cursor.execute("SELECT id FROM farmers WHERE phone = ?", ("+919876543210",))
+    cursor.execute(SQL_FARMER_BY_PHONE, ("+919876543210",))
     farmer = cursor.fetchone()
     
     if not farmer:
-        cursor.execute("""
-            INSERT INTO farmers (name, phone, email, password_hash, location, language)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, ("Demo Farmer", "+919876543210", "demo@krishisakhi.com", 
-              hash_password("demo123"), "Kottayam", "en"))
+        cursor.execute(SQL_INSERT_FARMER, ("Demo Farmer", "+919876543210", "demo@krishisakhi.com", 
+                                           hash_password("demo123"), "Kottayam", "en"))
         farmer_id = cursor.lastrowid
     else:
         farmer_id = farmer[0]
     
     conn.commit()
-    conn.close()
     
     token = create_access_token({"sub": str(farmer_id)})
     return {"access_token": token, "token_type": "bearer", "farmer_id": farmer_id}
 
 # Farmer endpoints
 @app.get("/api/farmers/profile")
-async def get_profile(farmer_id: int = Depends(verify_token)):
-    conn = get_db_connection()
+def get_profile(farmer_id: int = Depends(verify_token), conn: sqlite3.Connection = Depends(get_conn)):
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT id, name, phone, email, location, language, created_at
-        FROM farmers WHERE id = ?
-    """, (farmer_id,))
+    cursor.execute(SQL_FARMER_PROFILE, (farmer_id,))
     
     farmer = cursor.fetchone()
-    conn.close()
     
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
@@ -226,154 +617,121 @@ async def get_profile(farmer_id: int = Depends(verify_token)):
 
 # Farm endpoints
 @app.post("/api/farms")
-async def create_farm(farm: FarmCreate, farmer_id: int = Depends(verify_token)):
-    conn = get_db_connection()
+def create_farm(farm: FarmCreate, farmer_id: int = Depends(verify_token),
+                conn: sqlite3.Connection = Depends(get_write_conn)):
     cursor = conn.cursor()
     
-    cursor.execute("""
-        INSERT INTO farms (farmer_id, name, location, land_size, soil_type, irrigation_type, crop_types)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (farmer_id, farm.name, farm.location, farm.land_size, 
-          farm.soil_type, farm.irrigation_type, json.dumps(farm.crop_types)))
+    cursor.execute(SQL_INSERT_FARM, (farmer_id, farm.name, farm.location, farm.land_size, 
+                                     farm.soil_type, farm.irrigation_type, to_json_column(farm.crop_types)))
     
     farm_id = cursor.lastrowid
     conn.commit()
-    conn.close()
     
     return {"farm_id": farm_id, "message": "Farm created successfully"}
 
 @app.get("/api/farms")
-async def get_farms(farmer_id: int = Depends(verify_token)):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT id, name, location, land_size, soil_type, irrigation_type, crop_types, created_at
-        FROM farms WHERE farmer_id = ?
-    """, (farmer_id,))
-    
-    farms = cursor.fetchall()
-    conn.close()
-    
-    return [{
-        "id": farm[0],
-        "name": farm[1],
-        "location": farm[2],
-        "land_size": farm[3],
-        "soil_type": farm[4],
-        "irrigation_type": farm[5],
-        "crop_types": json.loads(farm[6]) if farm[6] else [],
-        "created_at": farm[7]
-    } for farm in farms]
+def get_farms(farmer_id: int = Depends(verify_token), conn: sqlite3.Connection = Depends(get_conn)):
+    return json_rows_response(conn.execute(SQL_FARMER_FARMS, (farmer_id,)).fetchone()[0])
 
 # Activity endpoints
 @app.post("/api/activities")
-async def create_activity(activity: ActivityCreate, farmer_id: int = Depends(verify_token)):
-    conn = get_db_connection()
+def create_activity(activity: ActivityCreate, farmer_id: int = Depends(verify_token),
+                    conn: sqlite3.Connection = Depends(get_write_conn)):
     cursor = conn.cursor()
     
-    # Verify farm belongs to farmer
-    cursor.execute("SELECT farmer_id FROM farms WHERE id = ?", (activity.farm_id,))
-    farm = cursor.fetchone()
-    if not farm or farm[0] != farmer_id:
-        conn.close()
+    # Ownership is checked by the insert itself
+    cursor.execute(SQL_INSERT_OWNED_ACTIVITY, (activity.farm_id, activity.activity_type, activity.description, 
+                                               activity.date, activity.crop_name, activity.quantity, activity.cost, activity.notes,
+                                               activity.farm_id, farmer_id))
+    if cursor.rowcount == 0:
         raise HTTPException(status_code=403, detail="Farm not found or access denied")
     
-    cursor.execute("""
-        INSERT INTO activities (farm_id, activity_type, description, date, crop_name, quantity, cost, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (activity.farm_id, activity.activity_type, activity.description, 
-          activity.date, activity.crop_name, activity.quantity, activity.cost, activity.notes))
-    
     activity_id = cursor.lastrowid
     conn.commit()
-    conn.close()
     
     return {"activity_id": activity_id, "message": "Activity recorded successfully"}
 
-@app.get("/api/activities")
-async def get_activities(farmer_id: int = Depends(verify_token), farm_id: Optional[int] = None):
-    conn = get_db_connection()
+@app.post("/api/activities/bulk")
+def create_activities_bulk(activities: List[ActivityCreate], farmer_id: int = Depends(verify_token),
+                           conn: sqlite3.Connection = Depends(get_write_conn)):
+    if not activities:
+        return {"activity_ids": [], "message": "No activities to record"}
+    
     cursor = conn.cursor()
     
+    # Verify every farm belongs to farmer with one query
+    farm_ids = {activity.farm_id for activity in activities}
+    placeholders = ",".join("?" * len(farm_ids))
+    cursor.execute(f"SELECT id FROM farms WHERE farmer_id = ? AND id IN ({placeholders})",
+                   (farmer_id, *farm_ids))
+    if len(cursor.fetchall()) != len(farm_ids):
+        raise HTTPException(status_code=403, detail="Farm not found or access denied")
+    
+    # One transaction for the whole batch
+    activity_ids = []
+    for activity in activities:
+        cursor.execute(SQL_INSERT_ACTIVITY, (activity.farm_id, activity.activity_type, activity.description, 
+                                             activity.date, activity.crop_name, activity.quantity, activity.cost, activity.notes))
+        activity_ids.append(cursor.lastrowid)
+    
+    conn.commit()
+    
+    return {"activity_ids": activity_ids, "message": f"{len(activity_ids)} activities recorded successfully"}
+
+@app.get("/api/activities")
+def get_activities(farmer_id: int = Depends(verify_token), farm_id: Optional[int] = None,
+                   conn: sqlite3.Connection = Depends(get_conn)):
     if farm_id:
-        # Verify farm belongs to farmer
-        cursor.execute("SELECT farmer_id FROM farms WHERE id = ?", (farm_id,))
-        farm = cursor.fetchone()
-        if not farm or farm[0] != farmer_id:
-            conn.close()
+        owned, activities = conn.execute(
+            SQL_FARM_ACTIVITIES, {"farm_id": farm_id, "farmer_id": farmer_id}).fetchone()
+        if not owned:
             raise HTTPException(status_code=403, detail="Farm not found or access denied")
-        
-        cursor.execute("""
-            SELECT a.id, a.activity_type, a.description, a.date, a.crop_name, 
-                   a.quantity, a.cost, a.notes, f.name as farm_name
-            FROM activities a
-            JOIN farms f ON a.farm_id = f.id
-            WHERE a.farm_id = ?
-            ORDER BY a.date DESC
-        """, (farm_id,))
     else:
-        cursor.execute("""
-            SELECT a.id, a.activity_type, a.description, a.date, a.crop_name, 
-                   a.quantity, a.cost, a.notes, f.name as farm_name
-            FROM activities a
-            JOIN farms f ON a.farm_id = f.id
-            WHERE f.farmer_id = ?
-            ORDER BY a.date DESC
-        """, (farmer_id,))
-    
-    activities = cursor.fetchall()
-    conn.close()
-    
-    return [{
-        "id": activity[0],
-        "activity_type": activity[1],
-        "description": activity[2],
-        "date": activity[3],
-        "crop_name": activity[4],
-        "quantity": activity[5],
-        "cost": activity[6],
-        "notes": activity[7],
-        "farm_name": activity[8]
-    } for activity in activities]
+        activities = conn.execute(SQL_FARMER_ACTIVITIES, (farmer_id,)).fetchone()[0]
+    
+    return json_rows_response(activities)
 
 # AI endpoints
 @app.post("/api/ai/detect-disease")
 async def detect_disease(detection: DiseaseDetection, farmer_id: int = Depends(verify_token)):
     try:
-        # Verify farm belongs to farmer
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT farmer_id FROM farms WHERE id = ?", (detection.farm_id,))
-        farm = cursor.fetchone()
-        if not farm or farm[0] != farmer_id:
-            conn.close()
+        # Verify farm belongs to farmer; connections are not held across the model run
+        if await db_run(_farm_owner, detection.farm_id) != farmer_id:
             raise HTTPException(status_code=403, detail="Farm not found or access denied")
-        conn.close()
         
         result = await ai_service.detect_disease(detection.image_path, detection.crop_name)
         
-        # Store detection result
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO disease_detections (farm_id, crop_name, disease_name, confidence, 
-                                          symptoms, treatment, image_path)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (detection.farm_id, detection.crop_name, result['disease'], result['confidence'],
-              json.dumps(result['symptoms']), json.dumps(result['treatment']), detection.image_path))
-        
-        conn.commit()
-        conn.close()
+        # Store detection result; rejected non-plant photos never reach the alert rollup
+        if result.get("plant_detected", True):
+            await db_run(_store_detection, detection, result)
         
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ai/detect-disease/upload")
+async def detect_disease_upload(file: UploadFile = File(...), crop_name: str = Form(...),
+                                farmer_id: int = Depends(verify_token)):
+    try:
+        # Spool the raw multipart bytes to a temp file for the classifier
+        suffix = os.path.splitext(file.filename or "")[1] or ".jpg"
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+            await asyncio.to_thread(shutil.copyfileobj, file.file, tmp)
+        try:
+            return await ai_service.detect_disease(tmp.name, crop_name)
+        finally:
+            os.remove(tmp.name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/ai/chat")
 async def ai_chat(message: ChatMessage):
     try:
         response = await ai_service.chat_response(message.message, message.language)
+        # Error replies have a pre-encoded body; send it as-is
+        error_body = CHAT_ERROR_BODIES.get((message.language, response))
+        if error_body is not None:
+            return Response(content=error_body, media_type="application/json")
         return {"response": response, "language": message.language}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -393,181 +751,161 @@ async def get_weather(location: str, farmer_id: int = Depends(verify_token)):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Knowledge base endpoints
-@app.get("/api/knowledge/crops")
-async def get_crops_info(language: str = "en"):
-    # Sample crop data for Kerala
-    crops_data = {
-        "en": {
-            "Rice": {
-                "description": "Staple food crop of Kerala",
-                "seasons": "Kharif, Rabi, Summer",
-                "yield": "4-6 tons/hectare",
-                "varieties": ["Jyothi", "Uma", "Thriveni", "JGL 1798"]
-            },
-            "Coconut": {
-                "description": "Primary plantation crop",
-                "seasons": "Year-round",
-                "yield": "80-150 nuts/palm/year",
-                "varieties": ["West Coast Tall", "Chandra Kalpa", "Kera Chandra"]
-            },
-            "Black Pepper": {
-                "description": "King of spices",
-                "seasons": "May-June planting",
-                "yield": "2-5 kg/vine",
-                "varieties": ["Panniyur-1", "Subhakara", "Pournami"]
-            }
+# Sample crop data for Kerala
+CROPS_INFO = {
+    "en": {
+        "Rice": {
+            "description": "Staple food crop of Kerala",
+            "seasons": "Kharif, Rabi, Summer",
+            "yield": "4-6 tons/hectare",
+            "varieties": ["Jyothi", "Uma", "Thriveni", "JGL 1798"]
         },
-        "ml": {
-            "നെല്ല്": {
-                "description": "കേരളത്തിന്റെ പ്രധാന ഭക്ഷ്യവിള",
-                "seasons": "ഖരിഫ്, റബി, സമ്മർ",
-                "yield": "4-6 ടൺ/ഹെക്ടർ",
-                "varieties": ["ജ്യോതി", "ഉമ", "ത്രിവേണി", "JGL 1798"]
-            },
-            "തെങ്ങ്": {
-                "description": "പ്രാഥമിക തോട്ടവിള",
-                "seasons": "വർഷം മുഴുവൻ",
-                "yield": "80-150 കായ്/തെങ്ങ്/വർഷം",
-                "varieties": ["വെസ്റ്റ് കോസ്റ്റ് ടാൾ", "ചന്ദ്ര കൽപ", "കേര ചന്ദ്ര"]
-            },
-            "കുരുമുളക്": {
-                "description": "മസാലകളുടെ രാജാവ്",
-                "seasons": "മേയ്-ജൂൺ നടീൽ",
-                "yield": "2-5 കിലോ/വൈൻ",
-                "varieties": ["പന്നിയൂർ-1", "സുഭാകര", "പൗർണ്ണമി"]
-            }
+        "Coconut": {
+            "description": "Primary plantation crop",
+            "seasons": "Year-round",
+            "yield": "80-150 nuts/palm/year",
+            "varieties": ["West Coast Tall", "Chandra Kalpa", "Kera Chandra"]
+        },
+        "Black Pepper": {
+            "description": "King of spices",
+            "seasons": "May-June planting",
+            "yield": "2-5 kg/vine",
+            "varieties": ["Panniyur-1", "Subhakara", "Pournami"]
+        }
+    },
+    "ml": {
+        "നെല്ല്": {
+            "description": "കേരളത്തിന്റെ പ്രധാന ഭക്ഷ്യവിള",
+            "seasons": "ഖരിഫ്, റബി, സമ്മർ",
+            "yield": "4-6 ടൺ/ഹെക്ടർ",
+            "varieties": ["ജ്യോതി", "ഉമ", "ത്രിവേണി", "JGL 1798"]
+        },
+        "തെങ്ങ്": {
+            "description": "പ്രാഥമിക തോട്ടവിള",
+            "seasons": "വർഷം മുഴുവൻ",
+            "yield": "80-150 കായ്/തെങ്ങ്/വർഷം",
+            "varieties": ["വെസ്റ്റ് കോസ്റ്റ് ടാൾ", "ചന്ദ്ര കൽപ", "കേര ചന്ദ്ര"]
+        },
+        "കുരുമുളക്": {
+            "description": "മസാലകളുടെ രാജാവ്",
+            "seasons": "മേയ്-ജൂൺ നടീൽ",
+            "yield": "2-5 കിലോ/വൈൻ",
+            "varieties": ["പന്നിയൂർ-1", "സുഭാകര", "പൗർണ്ണമി"]
         }
     }
-    return crops_data.get(language, crops_data.get("en", {}))
-
-@app.get("/api/knowledge/diseases")
-async def get_diseases_info(language: str = "en"):
-    # Sample disease data
-    diseases_data = {
-        "en": {
-            "Rice Blast": {
-                "crop": "Rice",
-                "symptoms": ["Diamond-shaped lesions", "White to gray centers", "Neck rot"],
-                "treatment": ["Tricyclazole fungicide", "Resistant varieties", "Proper drainage"],
-                "prevention": ["Avoid excessive nitrogen", "Water management", "Disease-free seeds"]
-            },
-            "Coconut Leaf Rot": {
-                "crop": "Coconut",
-                "symptoms": ["Yellow to brown spots", "Wilting leaves", "Premature fall"],
-                "treatment": ["Copper fungicide", "Remove affected leaves", "Air circulation"],
-                "prevention": ["Avoid overhead irrigation", "Proper spacing", "Regular sanitation"]
-            }
+}
+
+# Sample disease data
+DISEASES_INFO = {
+    "en": {
+        "Rice Blast": {
+            "crop": "Rice",
+            "symptoms": ["Diamond-shaped lesions", "White to gray centers", "Neck rot"],
+            "treatment": ["Tricyclazole fungicide", "Resistant varieties", "Proper drainage"],
+            "prevention": ["Avoid excessive nitrogen", "Water management", "Disease-free seeds"]
+        },
+        "Coconut Leaf Rot": {
+            "crop": "Coconut",
+            "symptoms": ["Yellow to brown spots", "Wilting leaves", "Premature fall"],
+            "treatment": ["Copper fungicide", "Remove affected leaves", "Air circulation"],
+            "prevention": ["Avoid overhead irrigation", "Proper spacing", "Regular sanitation"]
+        }
+    },
+    "ml": {
+        "നെല്ല് ബ്ലാസ്റ്റ്": {
+            "crop": "നെല്ല്",
+            "symptoms": ["ഡയമണ്ട് ആകൃതിയിലുള്ള പരുക്കുകൾ", "വെളുത്ത മുതൽ ചാര നിറത്തിലുള്ള കേന്ദ്രം", "കഴുത്ത് ക്ഷയം"],
+            "treatment": ["ട്രൈസൈക്ലാസോൾ കീടനാശിനി", "പ്രതിരോധ ഇനങ്ങൾ", "നല്ല വാരിനീക്കൽ"],
+            "prevention": ["അമിത നൈട്രജൻ ഒഴിവാക്കുക", "ജല മാനേജ്മെന്റ്", "രോഗരഹിത വിത്തുകൾ"]
         },
-        "ml": {
-            "നെല്ല് ബ്ലാസ്റ്റ്": {
-                "crop": "നെല്ല്",
-                "symptoms": ["ഡയമണ്ട് ആകൃതിയിലുള്ള പരുക്കുകൾ", "വെളുത്ത മുതൽ ചാര നിറത്തിലുള്ള കേന്ദ്രം", "കഴുത്ത് ക്ഷയം"],
-                "treatment": ["ട്രൈസൈക്ലാസോൾ കീടനാശിനി", "പ്രതിരോധ ഇനങ്ങൾ", "നല്ല വാരിനീക്കൽ"],
-                "prevention": ["അമിത നൈട്രജൻ ഒഴിവാക്കുക", "ജല മാനേജ്മെന്റ്", "രോഗരഹിത വിത്തുകൾ"]
-            },
-            "തെങ്ങ് ഇല ക്ഷയം": {
-                "crop": "തെങ്ങ്",
-                "symptoms": ["മഞ്ഞ മുതൽ തവിട്ട് നിറത്തിലുള്ള പരുക്കുകൾ", "വാടിയ ഇലകൾ", "അകാല ഇലപൊഴിയൽ"],
-                "treatment": ["കോപ്പർ കീടനാശിനി", "ബാധിത ഇലകൾ നീക്കം ചെയ്യുക", "വായു സഞ്ചാരം"],
-                "prevention": ["മുകളിൽ നിന്നുള്ള നീരാവി ഒഴിവാക്കുക", "ശരിയായ അകലം", "നിരന്തര ശുചിത്വം"]
-            }
+        "തെങ്ങ് ഇല ക്ഷയം": {
+            "crop": "തെങ്ങ്",
+            "symptoms": ["മഞ്ഞ മുതൽ തവിട്ട് നിറത്തിലുള്ള പരുക്കുകൾ", "വാടിയ ഇലകൾ", "അകാല ഇലപൊഴിയൽ"],
+            "treatment": ["കോപ്പർ കീടനാശിനി", "ബാധിത ഇലകൾ നീക്കം ചെയ്യുക", "വായു സഞ്ചാരം"],
+            "prevention": ["മുകളിൽ നിന്നുള്ള നീരാവി ഒഴിവാക്കുക", "ശരിയായ അകലം", "നിരന്തര ശുചിത്വം"]
         }
     }
-    return diseases_data.get(language, diseases_data.get("en", {}))
+}
+
+# The knowledge base never changes while the server runs, so each language's
+# response body and ETag are built once and served as raw bytes
+KNOWLEDGE_CACHE_CONTROL = "public, max-age=86400"
+
+def _with_etags(bodies_by_language: dict) -> dict:
+    return {language: (body, f'"{hashlib.md5(body).hexdigest()}"')
+            for language, body in bodies_by_language.items()}
+
+_CROPS_JSON = _with_etags({language: json_bytes(data) for language, data in CROPS_INFO.items()})
+_DISEASES_JSON = _with_etags({language: json_bytes(data) for language, data in DISEASES_INFO.items()})
+_SCHEMES_JSON = _with_etags({language: get_government_schemes_bytes(language) for language in GOVERNMENT_SCHEMES})
+
+def _cached_json(request: Request, payloads: dict, language: str) -> Response:
+    body, etag = payloads.get(language, payloads["en"])
+    headers = {"ETag": etag, "Cache-Control": KNOWLEDGE_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/knowledge/crops")
+async def get_crops_info(request: Request, language: str = "en"):
+    return _cached_json(request, _CROPS_JSON, language)
+
+@app.get("/api/knowledge/diseases")
+async def get_diseases_info(request: Request, language: str = "en"):
+    return _cached_json(request, _DISEASES_JSON, language)
 
 @app.get("/api/knowledge/schemes")
-async def get_government_schemes(language: str = "en"):
-    from utils.translations import get_government_schemes
-    return get_government_schemes(language)
+async def get_government_schemes(request: Request, language: str = "en"):
+    return _cached_json(request, _SCHEMES_JSON, language)
 
 # Community endpoints
+# Alerts change only when a detection is stored, which clears this cache;
+# the TTL bounds staleness as detections age out of the 30-day window
+COMMUNITY_ALERTS_TTL = 300
+
+@ttl_cache(ttl=COMMUNITY_ALERTS_TTL, maxsize=64)
+def _community_alerts_json(location: Optional[str]) -> Optional[str]:
+    with db_pool.reader() as conn:
+        if location:
+            return conn.execute(SQL_LOCAL_ALERTS, (f"%{location}%",)).fetchone()[0]
+        return conn.execute(SQL_RECENT_ALERTS).fetchone()[0]
+
 @app.get("/api/community/alerts")
-async def get_community_alerts(location: Optional[str] = None, language: str = "en"):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    if location:
-        cursor.execute("""
-            SELECT dd.disease_name, dd.confidence, dd.crop_name, f.location, 
-                   dd.created_at, COUNT(*) as occurrences
-            FROM disease_detections dd
-            JOIN farms f ON dd.farm_id = f.id
-            WHERE f.location LIKE ? AND dd.created_at >= date('now', '-30 days')
-            GROUP BY dd.disease_name, dd.crop_name, f.location
-            HAVING COUNT(*) >= 2
-            ORDER BY occurrences DESC, dd.created_at DESC
-        """, (f"%{location}%",))
-    else:
-        cursor.execute("""
-            SELECT dd.disease_name, dd.confidence, dd.crop_name, f.location, 
-                   dd.created_at, COUNT(*) as occurrences
-            FROM disease_detections dd
-            JOIN farms f ON dd.farm_id = f.id
-            WHERE dd.created_at >= date('now', '-30 days')
-            GROUP BY dd.disease_name, dd.crop_name, f.location
-            HAVING COUNT(*) >= 2
-            ORDER BY occurrences DESC, dd.created_at DESC
-        """)
-    
-    alerts = cursor.fetchall()
-    conn.close()
-    
-    return [{
-        "disease": alert[0],
-        "confidence": alert[1],
-        "crop": alert[2],
-        "location": alert[3],
-        "date": alert[4],
-        "occurrences": alert[5]
-    } for alert in alerts]
+def get_community_alerts(location: Optional[str] = None, language: str = "en"):
+    return json_rows_response(_community_alerts_json(location))
 
 # Analytics endpoints
-@app.get("/api/analytics/dashboard")
-async def get_dashboard_analytics(farmer_id: int = Depends(verify_token)):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get farm count
-    cursor.execute("SELECT COUNT(*) FROM farms WHERE farmer_id = ?", (farmer_id,))
-    farm_count = cursor.fetchone()[0]
-    
-    # Get recent activities count
-    cursor.execute("""
-        SELECT COUNT(*) FROM activities a
-        JOIN farms f ON a.farm_id = f.id
-        WHERE f.farmer_id = ? AND a.date >= date('now', '-30 days')
-    """, (farmer_id,))
-    recent_activities = cursor.fetchone()[0]
-    
-    # Get total cost this month
-    cursor.execute("""
-        SELECT COALESCE(SUM(a.cost), 0) FROM activities a
-        JOIN farms f ON a.farm_id = f.id
-        WHERE f.farmer_id = ? AND a.date >= date('now', 'start of month')
-    """, (farmer_id,))
-    monthly_cost = cursor.fetchone()[0]
-    
-    # Get activity types distribution
-    cursor.execute("""
-        SELECT a.activity_type, COUNT(*) FROM activities a
-        JOIN farms f ON a.farm_id = f.id
-        WHERE f.farmer_id = ? AND a.date >= date('now', '-30 days')
-        GROUP BY a.activity_type
-    """, (farmer_id,))
-    activity_types = dict(cursor.fetchall())
-    
-    # Get monthly costs trend
-    cursor.execute("""
-        SELECT strftime('%Y-%m', a.date) as month, COALESCE(SUM(a.cost), 0) as total_cost
+SQL_DASHBOARD = """
+    WITH acts AS (
+        SELECT a.activity_type, a.date, a.cost
         FROM activities a
         JOIN farms f ON a.farm_id = f.id
-        WHERE f.farmer_id = ? AND a.date >= date('now', '-12 months')
-        GROUP BY month
-        ORDER BY month
-    """, (farmer_id,))
-    monthly_trends = [{"month": row[0], "cost": row[1]} for row in cursor.fetchall()]
-    
-    conn.close()
+        WHERE f.farmer_id = :farmer_id AND a.date >= date('now', '-12 months')
+    )
+    SELECT
+        (SELECT COUNT(*) FROM farms WHERE farmer_id = :farmer_id),
+        (SELECT COUNT(*) FROM acts WHERE date >= date('now', '-30 days')),
+        (SELECT COALESCE(SUM(cost), 0) FROM acts WHERE date >= date('now', 'start of month')),
+        (SELECT json_group_object(activity_type, n) FROM (
+            SELECT activity_type, COUNT(*) AS n FROM acts
+            WHERE date >= date('now', '-30 days')
+            GROUP BY activity_type)),
+        (SELECT json_group_array(json_object('month', month, 'cost', total_cost)) FROM (
+            SELECT strftime('%Y-%m', date) AS month, COALESCE(SUM(cost), 0) AS total_cost
+            FROM acts
+            GROUP BY month
+            ORDER BY month))
+"""
+
+@app.get("/api/analytics/dashboard")
+def get_dashboard_analytics(farmer_id: int = Depends(verify_token),
+                            conn: sqlite3.Connection = Depends(get_conn)):
+    # One statement: the farmer's last year of activities is joined once and
+    # every figure is aggregated from it, the grouped ones as JSON
+    farm_count, recent_activities, monthly_cost, activity_types, monthly_trends = conn.execute(
+        SQL_DASHBOARD, {"farmer_id": farmer_id}).fetchone()
+    activity_types = json.loads(activity_types)
+    monthly_trends = json.loads(monthly_trends)
     
     return {
         "farm_count": farm_count,
@@ -578,4 +916,7 @@ async def get_dashboard_analytics(farmer_id: int = Depends(verify_token)):
     }
 
 if __name__ == "__main__":
+    # uvicorn picks uvloop and httptools when uvicorn[standard] installed them.
+    # Each worker process loads its own models, so the worker count is left
+    # to WEB_CONCURRENCY (uvicorn's default) rather than one per core.
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -4,7 +4,8 @@ Contains mock data for farmers, farms, activities, and other entities
 """
 
 from datetime import datetime, timedelta
-import random
+import json
+import numpy as np
 
 # Sample farmer data
 SAMPLE_FARMERS = [
@@ -118,31 +119,66 @@ KNOWLEDGE_BASE = {
     }
 }
 
+SAMPLE_ACTIVITY_COUNT = 20
+
+ACTIVITY_TYPES = (
+    "Sowing", "Transplanting", "Watering", "Fertilizing",
+    "Weeding", "Pest Control", "Harvesting", "Pruning"
+)
+
+SAMPLE_CROPS = ("Rice", "Coconut", "Pepper", "Cardamom", "Banana")
+
+ACTIVITY_COLUMNS = ("farm_id", "activity_type", "description", "date",
+                    "crop_name", "quantity", "cost", "notes")
+
+def _sample_activity_rows(n: int = SAMPLE_ACTIVITY_COUNT) -> list:
+    """Draw every random field for n activities at once, as rows in ACTIVITY_COLUMNS order"""
+    rng = np.random.default_rng()
+    today = datetime.now()
+    columns = {
+        "farm_id": rng.integers(1, 3, size=n).tolist(),
+        "activity_type": rng.choice(ACTIVITY_TYPES, size=n).tolist(),
+        "description": [f"Regular {t.lower()} activity"
+                        for t in rng.choice(ACTIVITY_TYPES, size=n).tolist()],
+        "date": [(today - timedelta(days=d)).strftime("%Y-%m-%d")
+                 for d in rng.integers(0, 31, size=n).tolist()],
+        "crop_name": rng.choice(SAMPLE_CROPS, size=n).tolist(),
+        "quantity": np.round(rng.uniform(1, 10, size=n), 1).tolist(),
+        "cost": np.round(rng.uniform(100, 2000, size=n), 2).tolist(),
+        "notes": ["Activity completed successfully"] * n,
+    }
+    return list(zip(*(columns[c] for c in ACTIVITY_COLUMNS)))
+
 def get_sample_activities():
     """Generate sample activities for demo"""
-    activities = []
-    activity_types = [
-        "Sowing", "Transplanting", "Watering", "Fertilizing", 
-        "Weeding", "Pest Control", "Harvesting", "Pruning"
-    ]
-    
-    crops = ["Rice", "Coconut", "Pepper", "Cardamom", "Banana"]
+    return [{"id": i + 1, **dict(zip(ACTIVITY_COLUMNS, row))}
+            for i, row in enumerate(_sample_activity_rows())]
+
+def load_sample_data(conn):
+    """Seed an empty database with the sample farmers, farms and activities.
     
-    for i in range(20):
-        date = datetime.now() - timedelta(days=random.randint(0, 30))
-        activities.append({
-            "id": i + 1,
-            "farm_id": random.randint(1, 2),
-            "activity_type": random.choice(activity_types),
-            "description": f"Regular {random.choice(activity_types).lower()} activity",
-            "date": date.strftime("%Y-%m-%d"),
-            "crop_name": random.choice(crops),
-            "quantity": round(random.uniform(1, 10), 1),
-            "cost": round(random.uniform(100, 2000), 2),
-            "notes": "Activity completed successfully"
-        })
+    Does nothing once any farmer exists. All rows go in with executemany inside
+    a single transaction, so the load costs one commit rather than one per row.
+    """
+    if conn.execute("SELECT COUNT(*) FROM farmers").fetchone()[0]:
+        return
     
-    return activities
+    with conn:
+        conn.executemany("""
+            INSERT INTO farmers (id, name, phone, email, password_hash, location, language)
+            VALUES (?, ?, ?, ?, '', ?, ?)
+        """, [(f["id"], f["name"], f["phone"], f["email"], f["location"], f["language"])
+              for f in SAMPLE_FARMERS])
+        conn.executemany("""
+            INSERT INTO farms (id, farmer_id, name, location, land_size, soil_type, irrigation_type, crop_types)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(f["id"], f["farmer_id"], f["name"], f["location"], f["land_size"],
+               f["soil_type"], f["irrigation_type"], json.dumps(f["crop_types"], separators=(",", ":"), ensure_ascii=False))
+              for f in SAMPLE_FARMS])
+        conn.executemany(f"""
+            INSERT INTO activities ({", ".join(ACTIVITY_COLUMNS)})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, _sample_activity_rows())
 
 def get_sample_data():
     """Get all sample data"""
@@ -3,6 +3,14 @@ Translation utilities for Krishi Sakhi
 Provides bilingual support for English and Malayalam
 """
 
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Translation dictionary for key terms
 TRANSLATIONS = {
     "en": {
@@ -26,7 +34,6 @@ TRANSLATIONS = {
         "crop": "Crop",
         "disease": "Disease",
         "pest": "Pest",
-        "weather": "Weather",
         "soil": "Soil",
         "irrigation": "Irrigation",
         "fertilizer": "Fertilizer",
@@ -69,7 +76,6 @@ TRANSLATIONS = {
         "crop": "വിള",
         "disease": "രോഗം",
         "pest": "കീടം",
-        "weather": "കാലാവസ്ഥ",
         "soil": "മണ്ണ്",
         "irrigation": "ജലസേചനം",
         "fertilizer": "വളം",
@@ -92,9 +98,19 @@ TRANSLATIONS = {
     }
 }
 
+# (language, key) -> text, so a lookup is a single hash probe
+_FLAT_TRANSLATIONS = {
+    (language, key): text
+    for language, texts in TRANSLATIONS.items()
+    for key, text in texts.items()
+}
+
 def get_translation(key: str, language: str = "en") -> str:
     """Get translation for a key in specified language"""
-    return TRANSLATIONS.get(language, {}).get(key, TRANSLATIONS["en"].get(key, key))
+    text = _FLAT_TRANSLATIONS.get((language, key))
+    if text is None:
+        text = _FLAT_TRANSLATIONS.get(("en", key), key)
+    return text
 
 def get_all_translations(language: str = "en") -> dict:
     """Get all translations for a language"""
@@ -139,4 +155,17 @@ GOVERNMENT_SCHEMES = {
 
 def get_government_schemes(language: str = "en") -> dict:
     """Get government schemes in specified language"""
-    return GOVERNMENT_SCHEMES.get(language, GOVERNMENT_SCHEMES["en"])
\ No newline at end of file
+    return GOVERNMENT_SCHEMES.get(language, GOVERNMENT_SCHEMES["en"])
+
+def json_bytes(data) -> bytes:
+    """Encode data as a UTF-8 JSON body, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+# Schemes are static, so each language's JSON body is encoded once at import
+_SCHEMES_JSON = {language: json_bytes(schemes) for language, schemes in GOVERNMENT_SCHEMES.items()}
+
+def get_government_schemes_bytes(language: str = "en") -> bytes:
+    """Get government schemes in specified language as an encoded JSON body"""
+    return _SCHEMES_JSON.get(language, _SCHEMES_JSON["en"])
@@ -4,15 +4,86 @@ Provides voice recognition and text-to-speech functionality
 """
 
 import streamlit as st
+import functools
+import re
 import time
 import random
-from io import BytesIO
 try:
     from gtts import gTTS  # Google TTS supports 'en' and 'ml'
     GTTS_AVAILABLE = True
 except Exception:
     GTTS_AVAILABLE = False
 
+try:
+    import ahocorasick  # pyahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Navigation phrases by page, in priority order: when a command mentions
+# several pages, the earliest one listed here wins
+NAVIGATION_PHRASES = (
+    ("dashboard", ("dashboard", "home", "ഡാഷ്ബോർഡ്")),
+    ("farms", ("farms", "farm", "കൃഷിയിടം")),
+    ("weather", ("weather", "കാലാവസ്ഥ")),
+    ("disease_detection", ("disease", "രോഗം")),
+    ("ai_chat", ("chat", "assistant", "സഹായി")),
+)
+
+def _build_command_matcher():
+    """Compile all navigation phrases into one matcher returning the highest-priority page index.
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, otherwise a
+    single compiled regex; either way the command is scanned once.
+    """
+    phrase_priority = {}
+    for priority, (_, phrases) in enumerate(NAVIGATION_PHRASES):
+        for phrase in phrases:
+            phrase_priority.setdefault(phrase, priority)
+    
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for phrase, priority in phrase_priority.items():
+            automaton.add_word(phrase, priority)
+        automaton.make_automaton()
+        
+        def match(text: str):
+            return min((priority for _, priority in automaton.iter(text)), default=None)
+    else:
+        # Lookahead so overlapping phrases are all reported
+        alternation = "|".join(map(re.escape, sorted(phrase_priority, key=len, reverse=True)))
+        pattern = re.compile(f"(?=({alternation}))")
+        
+        def match(text: str):
+            return min((phrase_priority[m.group(1)] for m in pattern.finditer(text)), default=None)
+    
+    return match
+
+_match_navigation = _build_command_matcher()
+
+# Recognized speech returned by the mock listener
+_MOCK_PHRASES = (
+    "What is the best time to plant rice?",
+    "How to control pests in coconut?",
+    "Show me the weather forecast",
+    "What fertilizer should I use for pepper?",
+    "നെല്ല് എങ്ങനെ നടാം?",
+    "കാലാവസ്ഥ കാണിക്കുക"
+)
+
+def _simulate_delay(seconds):
+    """Mimic device latency, except in headless test runs"""
+    if not st.session_state.get("test_mode"):
+        time.sleep(seconds)
+
+# Synthesized clips kept in memory; page prompts and greetings repeat often
+TTS_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=TTS_CACHE_SIZE)
+def _synthesize(text: str, lang_code: str) -> bytes:
+    """MP3 bytes for text, collected from gTTS's chunk stream"""
+    return b"".join(gTTS(text=text, lang=lang_code).stream())
+
 # Mock voice assistant since actual voice libraries may not be available
 class VoiceAssistant:
     def __init__(self):
@@ -26,20 +97,11 @@ class VoiceAssistant:
             
         # Simulate listening
         self.is_listening = True
-        time.sleep(1)
+        _simulate_delay(1)
         self.is_listening = False
         
         # Return mock recognized speech
-        mock_phrases = [
-            "What is the best time to plant rice?",
-            "How to control pests in coconut?",
-            "Show me the weather forecast",
-            "What fertilizer should I use for pepper?",
-            "നെല്ല് എങ്ങനെ നടാം?",
-            "കാലാവസ്ഥ കാണിക്കുക"
-        ]
-        
-        return random.choice(mock_phrases)
+        return _MOCK_PHRASES[random.randrange(len(_MOCK_PHRASES))]
     
     def speak_text(self, text, language="en"):
         """Text-to-speech. Returns (success, audio_bytes or None, format)."""
@@ -47,16 +109,13 @@ class VoiceAssistant:
         try:
             if GTTS_AVAILABLE:
                 lang_code = "ml" if language == "ml" else "en"
-                tts = gTTS(text=text, lang=lang_code)
-                buf = BytesIO()
-                tts.write_to_fp(buf)
-                buf.seek(0)
+                audio = _synthesize(text, lang_code)
                 self.is_speaking = False
-                return True, buf.read(), "audio/mp3"
+                return True, audio, "audio/mp3"
             else:
                 # Fallback mock
                 st.info(f"🔊 Speaking: {text}")
-                time.sleep(1.5)
+                _simulate_delay(1.5)
                 self.is_speaking = False
                 return True, None, None
         except Exception:
@@ -69,18 +128,8 @@ class VoiceAssistant:
     
     def process_voice_command(self, command):
         """Process voice command and return action"""
-        command_lower = command.lower()
-        
         # Navigation commands
-        if any(phrase in command_lower for phrase in ['dashboard', 'home', 'ഡാഷ്ബോർഡ്']):
-            return {"action": "navigate", "page": "dashboard"}
-        elif any(phrase in command_lower for phrase in ['farms', 'farm', 'കൃഷിയിടം']):
-            return {"action": "navigate", "page": "farms"}
-        elif any(phrase in command_lower for phrase in ['weather', 'കാലാവസ്ഥ']):
-            return {"action": "navigate", "page": "weather"}
-        elif any(phrase in command_lower for phrase in ['disease', 'രോഗം']):
-            return {"action": "navigate", "page": "disease_detection"}
-        elif any(phrase in command_lower for phrase in ['chat', 'assistant', 'സഹായി']):
-            return {"action": "navigate", "page": "ai_chat"}
-        else:
-            return {"action": "chat", "query": command}
\ No newline at end of file
+        priority = _match_navigation(command.lower())
+        if priority is not None:
+            return {"action": "navigate", "page": NAVIGATION_PHRASES[priority][0]}
+        return {"action": "chat", "query": command}
\ No newline at end of file
@@ -4,17 +4,256 @@ Provides weather forecasts and farming advisories for Kerala
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import bisect
+import calendar
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import random
+import functools
+import os
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+# Forecasts are reused for this long per location (matches OpenWeatherMap's
+# 10-minute update interval), keeping at most FORECAST_CACHE_SIZE locations
+FORECAST_TTL_SECONDS = 600
+FORECAST_CACHE_SIZE = 256
+# Free-text locations resolved to district coordinates, remembered per service
+COORDINATES_CACHE_SIZE = 64
+
+# Live forecasts need OPENWEATHER_API_KEY; without it the service stays on mock data
+DEMO_API_KEY = "demo-api-key"
+OWM_TIMEOUT_SECONDS = 10
+# Transient OpenWeatherMap failures are retried with backoff; Retry-After is honoured on 429/503
+OWM_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+# OpenWeatherMap condition group -> icon
+_OWM_ICONS = {
+    "Clear": "☀️",
+    "Clouds": "⛅",
+    "Drizzle": "🌦️",
+    "Rain": "🌧️",
+    "Thunderstorm": "⛈️",
+}
+
+# Mock forecast: Kerala's typical baseline, and the per-day random ranges for
+# (temperature variation, humidity variation, rain chance %, wind speed km/h)
+FORECAST_DAYS = 5
+BASE_TEMP = 28
+BASE_HUMIDITY = 75
+_VARIATION_LOW = (-3, -10, 0, 5)
+_VARIATION_HIGH = (5, 15, 100, 15)
+
+_RNG = np.random.default_rng()
+
+# Weekday names indexed by date.weekday(), built once instead of strftime("%A") per row
+_DAY_NAMES = tuple(calendar.day_name)
+
+# (description, icon) by rain chance band: <=30, <=60, <=80, above 80 percent;
+# the last entry replaces the first band on hot days (temperature variation > 2)
+_RAIN_THRESHOLDS = (30, 60, 80)
+_WEATHER_CONDITIONS = (
+    ("Partly cloudy", "🌤️"),
+    ("Partly cloudy with possible showers", "⛅"),
+    ("Light to moderate rain", "🌦️"),
+    ("Heavy rain expected", "🌧️"),
+    ("Hot and sunny", "☀️"),
+)
+_HOT_AND_SUNNY = len(_WEATHER_CONDITIONS) - 1
+
+# Alerts cover the next ALERT_DAYS days; each column is (threshold, message) for
+# rainfall (mm), max temperature (°C) and wind speed (km/h), in that order
+ALERT_DAYS = 3
+_ALERT_THRESHOLDS = np.array([5, 35, 20])
+_ALERT_MESSAGES = (
+    "Heavy rainfall expected on {day} ({value}mm)",
+    "High temperature alert for {day} ({value}°C)",
+    "Strong winds expected on {day} ({value} km/h)",
+)
+
+# Advisory entries and activity lists are shared, read-only constants;
+# callers must not mutate them
+_ADVISORY_HEAVY_RAIN = MappingProxyType({
+    "type": "rainfall",
+    "priority": "high",
+    "message": "Heavy rainfall expected. Ensure proper drainage and postpone spray applications.",
+    "malayalam": "കനത്ത മഴ പ്രതീക്ഷിക്കുന്നു. നല്ല നീർവാർച്ച ഉറപ്പാക്കുകയും സ്പ്രേ പ്രയോഗം മാറ്റിവയ്ക്കുകയും ചെയ്യുക."
+})
+
+_ADVISORY_LOW_RAIN = MappingProxyType({
+    "type": "drought",
+    "priority": "medium",
+    "message": "Low rainfall expected. Plan for irrigation and water conservation.",
+    "malayalam": "കുറഞ്ഞ മഴ പ്രതീക്ഷിക്കുന്നു. ജലസേചനവും ജലസംരക്ഷണവും ആസൂത്രണം ചെയ്യുക."
+})
+
+_ADVISORY_HEAT = MappingProxyType({
+    "type": "heat",
+    "priority": "high",
+    "message": "High temperatures expected. Increase irrigation frequency and provide shade for sensitive crops.",
+    "malayalam": "ഉയർന്ന താപനില പ്രതീക്ഷിക്കുന്നു. ജലസേചന ആവൃത്തി വർധിപ്പിച്ച് സെൻസിറ്റീവ് വിളകൾക്ക് തണൽ നൽകുക."
+})
+
+_ADVISORY_HUMIDITY = MappingProxyType({
+    "type": "humidity",
+    "priority": "medium",
+    "message": "High humidity may increase disease risk. Monitor crops closely and ensure good air circulation.",
+    "malayalam": "ഉയർന്ന ആർദ്രത രോഗസാധ്യത വർധിപ്പിക്കും. വിളകൾ സൂക്ഷ്മമായി നിരീക്ഷിച്ച് നല്ല വായു സഞ്ചാരം ഉറപ്പാക്കുക."
+})
+
+_ADVISORY_RICE = MappingProxyType({
+    "type": "rice",
+    "priority": "medium",
+    "message": "Good conditions for rice transplanting. Ensure fields are properly leveled.",
+    "malayalam": "നെല്ല് നടീലിന് അനുകൂല സാഹചര്യം. വയലുകൾ ശരിയായി നിരപ്പാക്കിയിട്ടുണ്ടെന്ന് ഉറപ്പാക്കുക."
+})
+
+_ADVISORY_COCONUT = MappingProxyType({
+    "type": "coconut",
+    "priority": "high",
+    "message": "Strong winds may damage coconut palms. Secure loose fronds and harvest mature nuts.",
+    "malayalam": "ശക്തമായ കാറ്റ് തെങ്ങുകൾക്ക് കേടുപാടുകൾ വരുത്തിയേക്കാം. അയഞ്ഞ ഇലകൾ ബന്ധിച്ച് പഴുത്ത കായ്കൾ പറിക്കുക."
+})
+
+_DRY_WEATHER_ACTIVITIES = (
+    "Land preparation",
+    "Fertilizer application",
+    "Pesticide spraying",
+    "Harvesting",
+)
+
+_RAINY_WEATHER_ACTIVITIES = (
+    "Transplanting rice",
+    "Planting rain-fed crops",
+    "Nursery management",
+)
+
+_AVOID_IN_HEAVY_RAIN = (
+    "Pesticide/fertilizer spraying",
+    "Harvesting",
+    "Field operations with heavy machinery",
+)
+
+_AVOID_IN_STRONG_WIND = (
+    "Spraying operations",
+    "Tree climbing",
+    "Drone operations",
+)
+
+# Today's rainfall (mm) is banded at the thresholds the advisory rules test:
+# -1 below 2, 0 up to 5, 1 up to 10, 2 above 10
+_TODAY_RAIN_THRESHOLDS = (5, 10)
+
+def _bisect_rainfall(rainfall: float) -> int:
+    if rainfall < 2:
+        return -1
+    return bisect.bisect_left(_TODAY_RAIN_THRESHOLDS, rainfall)
+
+@functools.lru_cache(maxsize=None)
+def _advisory_plan(rain_level: int, hot: bool, humid: bool, rain_band: int,
+                   mild_today: bool, windy_today: bool) -> tuple:
+    """(advisories, best activities, activities to avoid) for one combination of conditions.
+    
+    rain_level is 1 for heavy and -1 for low rain over the next 3 days; rain_band
+    is today's band from _bisect_rainfall. The domain is small, so every
+    combination is built at most once.
+    """
+    advisories = []
+    
+    # Rainfall advisory
+    if rain_level > 0:
+        advisories.append(_ADVISORY_HEAVY_RAIN)
+    elif rain_level < 0:
+        advisories.append(_ADVISORY_LOW_RAIN)
+    
+    # Temperature advisory
+    if hot:
+        advisories.append(_ADVISORY_HEAT)
+    
+    # Humidity advisory
+    if humid:
+        advisories.append(_ADVISORY_HUMIDITY)
+    
+    # Crop-specific advisories: rice when today is wet, coconut when windy
+    if rain_band >= 2:
+        advisories.append(_ADVISORY_RICE)
+    if windy_today:
+        advisories.append(_ADVISORY_COCONUT)
+    
+    best = []
+    if rain_band < 0 and mild_today:
+        best.extend(_DRY_WEATHER_ACTIVITIES)
+    if rain_band >= 1:
+        best.extend(_RAINY_WEATHER_ACTIVITIES)
+    
+    avoid = []
+    if rain_band >= 2:
+        avoid.extend(_AVOID_IN_HEAVY_RAIN)
+    if windy_today:
+        avoid.extend(_AVOID_IN_STRONG_WIND)
+    
+    return tuple(advisories), tuple(best), tuple(avoid)
+
+# Common and former names for Kerala districts
+DISTRICT_ALIASES = {
+    "trivandrum": "thiruvananthapuram",
+    "quilon": "kollam",
+    "alleppey": "alappuzha",
+    "kochi": "ernakulam",
+    "cochin": "ernakulam",
+    "trichur": "thrissur",
+    "palghat": "palakkad",
+    "calicut": "kozhikode",
+    "cannanore": "kannur",
+}
+
+@dataclass(slots=True, frozen=True)
+class DailyForecast:
+    """One day of forecast, flattened; converted to the nested API shape by to_dict"""
+    date: str
+    day: str
+    temp_max: int
+    temp_min: int
+    temp_avg: int
+    humidity: int
+    rainfall: float
+    wind_speed: float
+    description: str
+    icon: str
+    
+    def to_dict(self) -> Dict:
+        return {
+            "date": self.date,
+            "day": self.day,
+            "temperature": {
+                "max": self.temp_max,
+                "min": self.temp_min,
+                "avg": self.temp_avg
+            },
+            "humidity": self.humidity,
+            "rainfall": self.rainfall,
+            "wind_speed": self.wind_speed,
+            "description": self.description,
+            "icon": self.icon
+        }
+
 
 class WeatherService:
     def __init__(self):
         """Initialize weather service"""
-        # Using OpenWeatherMap API (demo mode)
-        self.api_key = "demo-api-key"
-        self.base_url = "http://api.openweathermap.org/data/2.5"
+        # Using OpenWeatherMap API (demo mode unless a key is configured)
+        self.api_key = os.getenv("OPENWEATHER_API_KEY", DEMO_API_KEY)
+        self.base_url = "https://api.openweathermap.org/data/2.5"
+        # Keep-alive session shared by all OpenWeatherMap calls
+        self._http = requests.Session()
+        self._http.headers["Accept-Encoding"] = "gzip, deflate"
+        self._http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=OWM_RETRY))
         
         # Kerala districts for location mapping
         self.kerala_districts = {
@@ -33,226 +272,218 @@ class WeatherService:
             "kannur": {"lat": 11.8745, "lon": 75.3704},
             "kasaragod": {"lat": 12.4996, "lon": 74.9869}
         }
+        # District and alias names -> coordinates
+        self._district_lookup = dict(self.kerala_districts)
+        self._district_lookup.update(
+            (alias, self.kerala_districts[district]) for alias, district in DISTRICT_ALIASES.items()
+        )
+        # One alternation over every name, longest first, so free text is scanned once
+        self._district_pattern = re.compile("|".join(
+            re.escape(name) for name in sorted(self._district_lookup, key=len, reverse=True)
+        ))
+        # Normalized location -> (expiry on the monotonic clock, tuple of DailyForecast rows)
+        self._forecast_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # Normalized free-text location -> coordinates, oldest entry evicted first
+        self._coordinates_cache: Dict[str, Dict] = {}
         
     async def get_weather_forecast(self, location: str) -> Dict:
-        """Get 5-day weather forecast for location"""
+        """Get 5-day weather forecast for location.
+        
+        Forecast rows are cached per location for FORECAST_TTL_SECONDS; each
+        call builds a fresh response from them, so callers may modify it.
+        """
+        key = location.strip().lower()
+        now = time.monotonic()
+        cached = self._forecast_cache.get(key)
+        if cached is not None and cached[0] > now:
+            self._forecast_cache.move_to_end(key)
+            return self._weather_payload(location, cached[1])
+        
         try:
-            # For demo, return mock data
-            return self._get_mock_weather_data(location)
+            if self.api_key == DEMO_API_KEY:
+                # For demo, return mock data
+                forecasts = self._get_mock_forecasts()
+            else:
+                forecasts = await self._get_live_forecasts(location)
             
         except Exception as e:
             print(f"Weather API error: {str(e)}")
-            return self._get_mock_weather_data(location)
-    
-    def _get_coordinates(self, location: str) -> Dict:
-        """Get coordinates for location"""
-        location_lower = location.lower()
-        
-        # Check if it's a Kerala district
-        for district, coords in self.kerala_districts.items():
-            if district in location_lower:
-                return coords
+            # Not cached, so the next request retries the live API
+            return self._weather_payload(location, self._get_mock_forecasts())
         
-        # Default to Kochi if location not found
-        return self.kerala_districts["ernakulam"]
+        self._forecast_cache[key] = (now + FORECAST_TTL_SECONDS, tuple(forecasts))
+        self._forecast_cache.move_to_end(key)
+        while len(self._forecast_cache) > FORECAST_CACHE_SIZE:
+            self._forecast_cache.popitem(last=False)
+        return self._weather_payload(location, forecasts)
     
-    def _get_mock_weather_data(self, location: str) -> Dict:
-        """Generate mock weather data for demo"""
-        # Kerala typical weather patterns
-        base_temp = 28
-        base_humidity = 75
+    def _fetch(self, endpoint: str, params: Dict) -> Dict:
+        response = self._http.get(f"{self.base_url}/{endpoint}", params=params, timeout=OWM_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _get_live_forecasts(self, location: str) -> List[DailyForecast]:
+        """Fetch current conditions and the 5-day forecast from OpenWeatherMap"""
+        coords = self._get_coordinates(location)
+        params = {"lat": coords["lat"], "lon": coords["lon"], "appid": self.api_key, "units": "metric"}
         
-        forecasts = []
-        for i in range(5):
-            date = datetime.now() + timedelta(days=i)
-            
-            # Simulate weather variation
-            temp_variation = random.uniform(-3, 5)
-            humidity_variation = random.uniform(-10, 15)
-            rain_chance = random.uniform(0, 100)
-            
-            forecasts.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "day": date.strftime("%A"),
-                "temperature": {
-                    "max": round(base_temp + temp_variation + 2),
-                    "min": round(base_temp + temp_variation - 2),
-                    "avg": round(base_temp + temp_variation)
-                },
-                "humidity": round(max(50, min(95, base_humidity + humidity_variation))),
-                "rainfall": round(rain_chance / 10, 1) if rain_chance > 60 else 0,
-                "wind_speed": round(random.uniform(5, 15), 1),
-                "description": self._get_weather_description(rain_chance, temp_variation),
-                "icon": self._get_weather_icon(rain_chance, temp_variation)
-            })
+        # Both calls are in flight at once, so the wait is the slower of the two
+        current, forecast = await asyncio.gather(
+            asyncio.to_thread(self._fetch, "weather", params),
+            asyncio.to_thread(self._fetch, "forecast", params),
+        )
         
+        forecasts = self._daily_forecasts(forecast["list"])
+        forecasts[0] = replace(
+            forecasts[0],
+            humidity=current["main"]["humidity"],
+            wind_speed=round(current["wind"]["speed"] * 3.6, 1),
+            description=current["weather"][0]["description"].capitalize(),
+            icon=_OWM_ICONS.get(current["weather"][0]["main"], "🌤️"),
+        )
+        return forecasts
+    
+    def _weather_payload(self, location: str, forecasts: Sequence[DailyForecast]) -> Dict:
+        """Build the API response; rows become dicts only here"""
+        rows = [f.to_dict() for f in forecasts]
         return {
             "location": location,
-            "current": forecasts[0],
-            "forecast": forecasts,
+            "current": rows[0],
+            "forecast": rows,
             "alerts": self._get_weather_alerts(forecasts)
         }
     
-    def _get_weather_description(self, rain_chance: float, temp_variation: float) -> str:
-        """Get weather description based on conditions"""
-        if rain_chance > 80:
-            return "Heavy rain expected"
-        elif rain_chance > 60:
-            return "Light to moderate rain"
-        elif rain_chance > 30:
-            return "Partly cloudy with possible showers"
-        elif temp_variation > 2:
-            return "Hot and sunny"
-        else:
-            return "Partly cloudy"
-    
-    def _get_weather_icon(self, rain_chance: float, temp_variation: float) -> str:
-        """Get weather icon based on conditions"""
-        if rain_chance > 80:
-            return "🌧️"
-        elif rain_chance > 60:
-            return "🌦️"
-        elif rain_chance > 30:
-            return "⛅"
-        elif temp_variation > 2:
-            return "☀️"
-        else:
-            return "🌤️"
-    
-    def _get_weather_alerts(self, forecasts: List[Dict]) -> List[str]:
-        """Generate weather alerts"""
-        alerts = []
-        
-        for forecast in forecasts[:3]:  # Check next 3 days
-            if forecast["rainfall"] > 5:
-                alerts.append(f"Heavy rainfall expected on {forecast['day']} ({forecast['rainfall']}mm)")
-            
-            if forecast["temperature"]["max"] > 35:
-                alerts.append(f"High temperature alert for {forecast['day']} ({forecast['temperature']['max']}°C)")
-            
-            if forecast["wind_speed"] > 20:
-                alerts.append(f"Strong winds expected on {forecast['day']} ({forecast['wind_speed']} km/h)")
+    def _daily_forecasts(self, entries: List[Dict]) -> List[DailyForecast]:
+        """Fold OpenWeatherMap's 3-hourly entries into per-day rows in the mock data's shape"""
+        days: Dict[str, List[Dict]] = {}
+        for entry in entries:
+            days.setdefault(entry["dt_txt"][:10], []).append(entry)
         
-        return alerts
+        forecasts = []
+        for day, day_entries in list(days.items())[:FORECAST_DAYS]:
+            temps = [e["main"]["temp"] for e in day_entries]
+            condition = Counter(e["weather"][0]["main"] for e in day_entries).most_common(1)[0][0]
+            description = Counter(e["weather"][0]["description"] for e in day_entries).most_common(1)[0][0]
+            forecasts.append(DailyForecast(
+                date=day,
+                day=_DAY_NAMES[date.fromisoformat(day).weekday()],
+                temp_max=round(max(e["main"]["temp_max"] for e in day_entries)),
+                temp_min=round(min(e["main"]["temp_min"] for e in day_entries)),
+                temp_avg=round(sum(temps) / len(temps)),
+                humidity=round(sum(e["main"]["humidity"] for e in day_entries) / len(day_entries)),
+                rainfall=round(sum(e.get("rain", {}).get("3h", 0) for e in day_entries), 1),
+                wind_speed=round(max(e["wind"]["speed"] for e in day_entries) * 3.6, 1),
+                description=description.capitalize(),
+                icon=_OWM_ICONS.get(condition, "🌤️")
+            ))
+        return forecasts
     
-    async def get_farming_advisory(self, weather_data: Dict, location: str) -> Dict:
-        """Generate farming advisory based on weather"""
-        current_weather = weather_data["current"]
-        forecast = weather_data["forecast"]
-        
-        advisories = []
-        
-        # Rainfall advisory
-        total_rain = sum([f["rainfall"] for f in forecast[:3]])
-        if total_rain > 15:
-            advisories.append({
-                "type": "rainfall",
-                "priority": "high",
-                "message": "Heavy rainfall expected. Ensure proper drainage and postpone spray applications.",
-                "malayalam": "കനത്ത മഴ പ്രതീക്ഷിക്കുന്നു. നല്ല നീർവാർച്ച ഉറപ്പാക്കുകയും സ്പ്രേ പ്രയോഗം മാറ്റിവയ്ക്കുകയും ചെയ്യുക."
-            })
-        elif total_rain < 2:
-            advisories.append({
-                "type": "drought",
-                "priority": "medium",
-                "message": "Low rainfall expected. Plan for irrigation and water conservation.",
-                "malayalam": "കുറഞ്ഞ മഴ പ്രതീക്ഷിക്കുന്നു. ജലസേചനവും ജലസംരക്ഷണവും ആസൂത്രണം ചെയ്യുക."
-            })
-        
-        # Temperature advisory
-        max_temp = max([f["temperature"]["max"] for f in forecast[:3]])
-        if max_temp > 35:
-            advisories.append({
-                "type": "heat",
-                "priority": "high",
-                "message": "High temperatures expected. Increase irrigation frequency and provide shade for sensitive crops.",
-                "malayalam": "ഉയർന്ന താപനില പ്രതീക്ഷിക്കുന്നു. ജലസേചന ആവൃത്തി വർധിപ്പിച്ച് സെൻസിറ്റീവ് വിളകൾക്ക് തണൽ നൽകുക."
-            })
+    def _get_coordinates(self, location: str) -> Dict:
+        """Get coordinates for location"""
+        location_lower = location.strip().lower()
         
-        # Humidity advisory
-        avg_humidity = sum([f["humidity"] for f in forecast[:3]]) / 3
-        if avg_humidity > 85:
-            advisories.append({
-                "type": "humidity",
-                "priority": "medium",
-                "message": "High humidity may increase disease risk. Monitor crops closely and ensure good air circulation.",
-                "malayalam": "ഉയർന്ന ആർദ്രത രോഗസാധ്യത വർധിപ്പിക്കും. വിളകൾ സൂക്ഷ്മമായി നിരീക്ഷിച്ച് നല്ല വായു സഞ്ചാരം ഉറപ്പാക്കുക."
-            })
+        # Exact district or alias name
+        coords = self._district_lookup.get(location_lower)
+        if coords is not None:
+            return coords
         
-        # Crop-specific advisories
-        crop_advisories = self._get_crop_specific_advisory(weather_data)
-        advisories.extend(crop_advisories)
+        coords = self._coordinates_cache.get(location_lower)
+        if coords is not None:
+            return coords
         
-        return {
-            "advisories": advisories,
-            "best_activities": self._get_recommended_activities(weather_data),
-            "avoid_activities": self._get_activities_to_avoid(weather_data)
-        }
+        # Free text that mentions a district, e.g. "Kottayam, Kerala";
+        # default to Kochi if no district is found
+        match = self._district_pattern.search(location_lower)
+        coords = self._district_lookup[match.group()] if match else self.kerala_districts["ernakulam"]
+        if len(self._coordinates_cache) >= COORDINATES_CACHE_SIZE:
+            del self._coordinates_cache[next(iter(self._coordinates_cache))]
+        self._coordinates_cache[location_lower] = coords
+        return coords
     
-    def _get_crop_specific_advisory(self, weather_data: Dict) -> List[Dict]:
-        """Get crop-specific weather advisories"""
-        advisories = []
-        current = weather_data["current"]
+    def _get_mock_forecasts(self) -> List[DailyForecast]:
+        """Generate mock forecast rows for demo"""
+        # Simulate weather variation: every random value for every day in one draw
+        variations = _RNG.uniform(_VARIATION_LOW, _VARIATION_HIGH, size=(FORECAST_DAYS, 4))
+        temp_variation, humidity_variation, rain_chance, wind = variations.T
         
-        # Rice advisory
-        if current["rainfall"] > 10:
-            advisories.append({
-                "type": "rice",
-                "priority": "medium",
-                "message": "Good conditions for rice transplanting. Ensure fields are properly leveled.",
-                "malayalam": "നെല്ല് നടീലിന് അനുകൂല സാഹചര്യം. വയലുകൾ ശരിയായി നിരപ്പാക്കിയിട്ടുണ്ടെന്ന് ഉറപ്പാക്കുക."
-            })
+        temp_avg = BASE_TEMP + temp_variation
+        temp_max = np.rint(temp_avg + 2).astype(int).tolist()
+        temp_min = np.rint(temp_avg - 2).astype(int).tolist()
+        temp_avg_rounded = np.rint(temp_avg).astype(int).tolist()
+        humidity = np.rint(np.clip(BASE_HUMIDITY + humidity_variation, 50, 95)).astype(int).tolist()
+        rainfall = np.where(rain_chance > 60, np.round(rain_chance / 10, 1), 0).tolist()
+        wind_speed = np.round(wind, 1).tolist()
+        conditions = self._classify_weather(rain_chance, temp_variation)
         
-        # Coconut advisory
-        if current["wind_speed"] > 20:
-            advisories.append({
-                "type": "coconut",
-                "priority": "high",
-                "message": "Strong winds may damage coconut palms. Secure loose fronds and harvest mature nuts.",
-                "malayalam": "ശക്തമായ കാറ്റ് തെങ്ങുകൾക്ക് കേടുപാടുകൾ വരുത്തിയേക്കാം. അയഞ്ഞ ഇലകൾ ബന്ധിച്ച് പഴുത്ത കായ്കൾ പറിക്കുക."
-            })
+        today = date.today()
+        forecasts = []
+        for i in range(FORECAST_DAYS):
+            day = today + timedelta(days=i)
+            forecasts.append(DailyForecast(
+                date=day.isoformat(),
+                day=_DAY_NAMES[day.weekday()],
+                temp_max=temp_max[i],
+                temp_min=temp_min[i],
+                temp_avg=temp_avg_rounded[i],
+                humidity=humidity[i],
+                rainfall=rainfall[i],
+                wind_speed=wind_speed[i],
+                description=conditions[i][0],
+                icon=conditions[i][1]
+            ))
         
-        return advisories
+        return forecasts
     
-    def _get_recommended_activities(self, weather_data: Dict) -> List[str]:
-        """Get recommended farming activities based on weather"""
-        activities = []
-        current = weather_data["current"]
-        
-        if current["rainfall"] < 2 and current["temperature"]["max"] < 32:
-            activities.extend([
-                "Land preparation",
-                "Fertilizer application",
-                "Pesticide spraying",
-                "Harvesting"
-            ])
-        
-        if current["rainfall"] > 5:
-            activities.extend([
-                "Transplanting rice",
-                "Planting rain-fed crops",
-                "Nursery management"
-            ])
+    def _classify_weather(self, rain_chance: np.ndarray, temp_variation: np.ndarray) -> List[tuple]:
+        """Get the (description, icon) for each day's conditions"""
+        # Band index = how many thresholds the rain chance strictly exceeds
+        bands = np.searchsorted(_RAIN_THRESHOLDS, rain_chance, side="left")
+        bands = np.where((bands == 0) & (temp_variation > 2), _HOT_AND_SUNNY, bands)
+        return [_WEATHER_CONDITIONS[band] for band in bands.tolist()]
+    
+    def _get_weather_alerts(self, forecasts: Sequence[DailyForecast]) -> List[str]:
+        """Generate weather alerts"""
+        days = forecasts[:ALERT_DAYS]
+        values = [(f.rainfall, f.temp_max, f.wind_speed) for f in days]
+        if not values:
+            return []
         
-        return activities
+        # One (day, kind) mask for every threshold; argwhere walks it day by day,
+        # keeping the alerts in date order
+        exceeded = np.array(values) > _ALERT_THRESHOLDS
+        return [
+            _ALERT_MESSAGES[kind].format(day=days[i].day, value=values[i][kind])
+            for i, kind in np.argwhere(exceeded).tolist()
+        ]
     
-    def _get_activities_to_avoid(self, weather_data: Dict) -> List[str]:
-        """Get activities to avoid based on weather"""
-        avoid = []
-        current = weather_data["current"]
+    async def get_farming_advisory(self, weather_data: Dict, location: str) -> Dict:
+        """Generate farming advisory based on weather"""
+        current_weather = weather_data["current"]
+        forecast = weather_data["forecast"]
         
-        if current["rainfall"] > 10:
-            avoid.extend([
-                "Pesticide/fertilizer spraying",
-                "Harvesting",
-                "Field operations with heavy machinery"
-            ])
+        # Rainfall, peak temperature and humidity over the next 3 days in one pass
+        total_rain = 0.0
+        max_temp = float("-inf")
+        total_humidity = 0.0
+        for f in forecast[:3]:
+            total_rain += f["rainfall"]
+            max_temp = max(max_temp, f["temperature"]["max"])
+            total_humidity += f["humidity"]
         
-        if current["wind_speed"] > 20:
-            avoid.extend([
-                "Spraying operations",
-                "Tree climbing",
-                "Drone operations"
-            ])
+        # The advisory depends only on which thresholds are crossed, so it is
+        # looked up by that combination instead of being rebuilt every call
+        rain_level = 1 if total_rain > 15 else (-1 if total_rain < 2 else 0)
+        advisories, best_activities, avoid_activities = _advisory_plan(
+            rain_level,
+            max_temp > 35,
+            total_humidity / 3 > 85,
+            _bisect_rainfall(current_weather["rainfall"]),
+            current_weather["temperature"]["max"] < 32,
+            current_weather["wind_speed"] > 20,
+        )
         
-        return avoid
\ No newline at end of file
+        return {
+            "advisories": list(advisories),
+            "best_activities": list(best_activities),
+            "avoid_activities": list(avoid_activities)
+        }
\ No newline at end of file